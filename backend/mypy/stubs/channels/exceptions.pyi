@@ -0,0 +1,5 @@
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+class StopConsumer(Exception): ...
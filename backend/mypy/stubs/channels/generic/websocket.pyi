@@ -2,7 +2,7 @@
 #
 # SPDX-License-Identifier: AGPL-3.0-or-later
 
-from typing import Optional
+from typing import Any, Optional
 
 from ..consumer import SyncConsumer
 
@@ -12,6 +12,10 @@ class WebsocketConsumer(SyncConsumer):
     def close(self, code: Optional[int] = None) -> None: ...
 
 class JsonWebsocketConsumer(WebsocketConsumer):
+    @classmethod
+    def decode_json(cls, text_data: str) -> Any: ...
+    @classmethod
+    def encode_json(cls, content: object) -> str: ...
     def send_json(
         self, content: object, close: Optional[bool] = False
     ) -> None: ...
@@ -18,5 +18,8 @@ class WebsocketCommunicator:
     async def receive_json_from(self) -> JsonData: ...
     async def receive_nothing(self) -> bool: ...
 
+    # From asgiref.testing.ApplicationCommunicator.send_input
+    async def send_input(self, message: dict[str, Any]) -> None: ...
+
     # From agiref.testing.ApplicationCommuniactor.receive_output
     async def receive_output(self, timeout: int = 1) -> dict[str, Any]: ...
@@ -66,6 +66,7 @@ class Throttled(APIException):
     extra_detail_singular: str
     extra_detail_plural: str
     default_code: str
+    wait: Optional[int]
 
     def __init__(
         self,
@@ -2,8 +2,19 @@
 #
 # SPDX-License-Identifier: AGPL-3.0-or-later
 
+from collections.abc import Mapping
+from typing import Any, Optional
+
 class BaseParser: ...
-class JSONParser: ...
+
+class JSONParser(BaseParser):
+    def parse(
+        self,
+        stream: Any,
+        media_type: Optional[str] = None,
+        parser_context: Optional[Mapping[str, Any]] = None,
+    ) -> Any: ...
+
 class FormParser: ...
 class MultiPartParser: ...
 class FileUploadParser: ...
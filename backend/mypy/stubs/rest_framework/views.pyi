@@ -3,8 +3,9 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 
 from collections.abc import Sequence
-from typing import Type, Union
+from typing import Any, Type, Union
 
+from django.http import HttpRequest
 from django.views import View
 
 from rest_framework.permissions import BasePermission
@@ -18,3 +19,15 @@ def exception_handler(
 class APIView(View):
     request: Request
     permission_classes: Sequence[Type[BasePermission]]
+    headers: dict[str, str]
+    response: Response
+    @property
+    def default_response_headers(self) -> dict[str, str]: ...
+    def initialize_request(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Request: ...
+    def initial(self, request: Request, *args: Any, **kwargs: Any) -> None: ...
+    def handle_exception(self, exc: Exception) -> Response: ...
+    def finalize_response(
+        self, request: Request, response: Response, *args: Any, **kwargs: Any
+    ) -> Response: ...
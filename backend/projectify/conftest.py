@@ -14,6 +14,7 @@ import pytest
 from faker import Faker
 from rest_framework.test import APIClient
 
+from projectify.lib.pytest_query_budget import QueryBudgetPlugin
 from projectify.user import models as user_models
 from projectify.user.services.internal import (
     user_create,
@@ -25,6 +26,11 @@ from projectify.user.services.user_invite import (
 )
 
 
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the query budget plugin."""
+    config.pluginmanager.register(QueryBudgetPlugin(), "query_budget")
+
+
 @pytest.fixture
 def password(faker: Faker) -> str:
     """Set default password."""
@@ -10,6 +10,8 @@ have validated permissions themselves.
 
 import logging
 
+from projectify.workspace.services.signals import workspace_version_bump
+
 from ..models import Customer
 from ..types import CustomerSubscriptionStatus
 
@@ -27,6 +29,7 @@ def customer_activate_subscription(
     customer.subscription_status = CustomerSubscriptionStatus.ACTIVE
     customer.seats = seats
     customer.save()
+    workspace_version_bump(workspace_id=customer.workspace_id)
 
 
 def customer_update_seats(*, customer: Customer, seats: int) -> None:
@@ -41,6 +44,7 @@ def customer_update_seats(*, customer: Customer, seats: int) -> None:
         return None
     customer.seats = seats
     customer.save()
+    workspace_version_bump(workspace_id=customer.workspace_id)
     logger.info("Customer %s updated to %d seats", customer, seats)
 
 
@@ -48,3 +52,4 @@ def customer_cancel_subscription(*, customer: Customer) -> None:
     """Cancel a customer's subscription."""
     customer.subscription_status = CustomerSubscriptionStatus.CANCELLED
     customer.save()
+    workspace_version_bump(workspace_id=customer.workspace_id)
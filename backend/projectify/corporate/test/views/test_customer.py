@@ -54,7 +54,8 @@ class TestWorkspaceCustomerRetrieve:
         django_assert_num_queries: DjangoAssertNumQueries,
     ) -> None:
         """Test as authenticated user."""
-        with django_assert_num_queries(4):
+        # Gone down from 4 -> 3, since the session is read from the cache
+        with django_assert_num_queries(3):
             response = user_client.get(resource_url)
             assert response.status_code == 200, response.content
 
@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Time code paths and compare results across commits.
+
+Used by the benchmark management command. Results are plain dicts, so that
+they can be dumped to and loaded from JSON.
+"""
+
+import statistics
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Any, Optional, TypedDict
+
+from django.db import connection
+
+
+class CaseResult(TypedDict):
+    """Timings for a single benchmark case, in milliseconds."""
+
+    iterations: int
+    queries: int
+    min_ms: float
+    median_ms: float
+    p95_ms: float
+    max_ms: float
+    mean_ms: float
+
+
+class Regression(TypedDict):
+    """A case that got slower compared to a baseline."""
+
+    case: str
+    baseline_ms: float
+    current_ms: float
+    change_pct: float
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct-th percentile using nearest rank."""
+    if not samples:
+        raise ValueError("Need at least one sample")
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class QueryCounter:
+    """Count queries without the overhead of a debug cursor."""
+
+    count = 0
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: Mapping[str, Any],
+    ) -> Any:
+        """Count and execute."""
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count the queries run inside this context."""
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+def summarize(samples: list[float], queries: int) -> CaseResult:
+    """Summarize timing samples given in seconds."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "iterations": len(ms),
+        "queries": queries,
+        "min_ms": min(ms),
+        "median_ms": statistics.median(ms),
+        "p95_ms": percentile(ms, 95),
+        "max_ms": max(ms),
+        "mean_ms": statistics.fmean(ms),
+    }
+
+
+def run_case(
+    fn: Callable[[], object],
+    *,
+    iterations: int,
+    warmup: int = 1,
+    around: Optional[Callable[[], AbstractContextManager[object]]] = None,
+) -> CaseResult:
+    """
+    Run fn repeatedly and summarize how long it took.
+
+    around is entered for every single iteration, but is not timed. Use it to
+    wrap state changing benchmarks in a transaction that is rolled back.
+
+    The query count is taken from the last iteration.
+    """
+    wrap = around or nullcontext
+    for _ in range(warmup):
+        with wrap():
+            fn()
+    samples: list[float] = []
+    queries = 0
+    for _ in range(iterations):
+        with wrap():
+            with count_queries() as counter:
+                start = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - start)
+            queries = counter.count
+    return summarize(samples, queries)
+
+
+def compare(
+    baseline: Mapping[str, CaseResult],
+    current: Mapping[str, CaseResult],
+    *,
+    threshold_pct: float,
+) -> list[Regression]:
+    """Return cases whose median got slower by more than threshold_pct."""
+    regressions: list[Regression] = []
+    for case, result in current.items():
+        before = baseline.get(case)
+        if before is None or before["median_ms"] == 0:
+            continue
+        change_pct = (
+            (result["median_ms"] - before["median_ms"])
+            / before["median_ms"]
+            * 100
+        )
+        if change_pct > threshold_pct:
+            regressions.append(
+                {
+                    "case": case,
+                    "baseline_ms": before["median_ms"],
+                    "current_ms": result["median_ms"],
+                    "change_pct": change_pct,
+                }
+            )
+    return regressions
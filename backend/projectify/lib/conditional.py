@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Conditional GET helpers.
+
+Views compute an ETag cheaply before doing any expensive work, answer with
+304 Not Modified if the client already has that version, and otherwise add
+the ETag to their response.
+"""
+
+from typing import TypeVar
+
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from rest_framework import status
+from rest_framework.response import Response
+
+R = TypeVar("R", bound=HttpResponseBase)
+
+
+def etag_matches(request: HttpRequest, etag: str) -> bool:
+    """Return True if If-None-Match contains etag, using weak comparison."""
+    header = request.headers.get("If-None-Match")
+    if header is None:
+        return False
+    etags = parse_etags(header)
+    if "*" in etags:
+        return True
+    return etag.removeprefix("W/") in (e.removeprefix("W/") for e in etags)
+
+
+def with_etag(response: R, etag: str) -> R:
+    """Add etag to response and make clients revalidate every time."""
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    """Return a 304 Not Modified response for etag."""
+    return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
@@ -32,6 +32,7 @@ from rest_framework.serializers import as_serializer_error
 from rest_framework.views import exception_handler as drf_exception_handler
 
 from projectify.lib.settings import get_settings
+from projectify.user.exceptions import PasswordHashingOverloaded
 
 logger = logging.getLogger(__name__)
 
@@ -210,6 +211,20 @@ class InternalServerErrorSerializer(serializers.Serializer):
     code = serializers.ChoiceField(choices=[500], source="status_code")
 
 
+def throttled_response(exception: drf_exceptions.Throttled) -> Response:
+    """Return a 429 response, telling when to retry if we know."""
+    serialized = TooManyRequestsSerializer(exception).data
+    # Like DRF, tell clients when to try again, if we know
+    headers = (
+        {"Retry-After": str(int(exception.wait))} if exception.wait else None
+    )
+    return Response(
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        data=serialized,
+        headers=headers,
+    )
+
+
 # TODO find out what ctx is
 def exception_handler(
     exception: HandledException, ctx: object
@@ -256,9 +271,12 @@ def exception_handler(
             serialized = NotFoundSerializer(exception).data
             return Response(status=status.HTTP_404_NOT_FOUND, data=serialized)
         case drf_exceptions.Throttled():
-            serialized = TooManyRequestsSerializer(exception).data
-            return Response(
-                status=status.HTTP_429_TOO_MANY_REQUESTS, data=serialized
+            return throttled_response(exception)
+        case PasswordHashingOverloaded():
+            # Raised while logging in, signing up or changing passwords
+            logger.warning("Password hashing overloaded: %s", exception)
+            return throttled_response(
+                drf_exceptions.Throttled(wait=exception.retry_after)
             )
         case drf_exceptions.APIException():
             serialized = InternalServerErrorSerializer(exception).data
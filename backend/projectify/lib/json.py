@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Fast JSON encoding and decoding.
+
+Uses orjson. Output matches DRF's JSONRenderer with its default settings,
+so that clients can't tell the difference:
+
+- Compact separators and no ASCII escaping
+- datetime, Decimal, lazy translation strings and everything else that
+  orjson doesn't handle itself are encoded by DRF's JSONEncoder
+- U+2028 and U+2029 are escaped
+
+orjson writes NaN and infinity as null, whereas DRF refuses to encode them.
+Values that orjson can't encode, such as integers beyond 64 bit, are encoded
+with the standard library instead.
+"""
+
+import codecs
+import json
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from django.conf import settings
+
+import orjson
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+# Encode datetimes like DRF does, which truncates to milliseconds
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_encoder = JSONEncoder()
+
+
+def escape_line_terminators(data: bytes) -> bytes:
+    """Escape characters that are valid JSON, but not valid JavaScript."""
+    return data.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+        b"\xe2\x80\xa9", b"\\u2029"
+    )
+
+
+def dumps_stdlib(data: object) -> bytes:
+    """Encode data with the standard library json module."""
+    ret = json.dumps(
+        data,
+        cls=JSONEncoder,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    )
+    return escape_line_terminators(ret.encode())
+
+
+def dumps(data: object) -> bytes:
+    """Encode data as UTF-8 JSON."""
+    try:
+        ret = orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+    except orjson.JSONEncodeError:
+        return dumps_stdlib(data)
+    return escape_line_terminators(ret)
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON."""
+    return orjson.loads(data)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """Render JSON with dumps."""
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        """Render data, unless indentation or other options are needed."""
+        if data is None:
+            return b""
+        indent = self.get_indent(
+            accepted_media_type or "", renderer_context or {}
+        )
+        if indent is not None or self.ensure_ascii or not self.compact:
+            rendered: bytes = super().render(
+                data, accepted_media_type, renderer_context
+            )
+            return rendered
+        return dumps(data)
+
+
+class JSONParser(parsers.JSONParser):
+    """Parse JSON with loads."""
+
+    renderer_class = JSONRenderer
+
+    def parse(
+        self,
+        stream: Any,
+        media_type: Optional[str] = None,
+        parser_context: Optional[Mapping[str, Any]] = None,
+    ) -> Any:
+        """Parse UTF-8 encoded JSON, and leave other encodings to DRF."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
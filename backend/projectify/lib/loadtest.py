@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Load test helpers.
+
+Used by the loadtest management command, which generates HTTP and
+websocket traffic against a running server.
+"""
+
+import argparse
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Literal, Optional, TypedDict, get_args
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+)
+from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+from django.utils.crypto import get_random_string
+from django.utils.module_loading import import_string
+
+from projectify.lib.benchmark import percentile
+from projectify.user.models import User
+
+Operation = Literal["read", "create", "move", "update"]
+OPERATIONS: tuple[Operation, ...] = get_args(Operation)
+
+
+class LatencySummary(TypedDict):
+    """Latency percentiles in milliseconds, None without samples."""
+
+    count: int
+    errors: int
+    p50_ms: Optional[float]
+    p90_ms: Optional[float]
+    p99_ms: Optional[float]
+    max_ms: Optional[float]
+
+
+class Throughput(TypedDict):
+    """Completed requests and delivered change events per second."""
+
+    requests_per_s: float
+    events_per_s: float
+
+
+class LoadTestReport(TypedDict):
+    """Everything measured during a load test."""
+
+    elapsed_s: float
+    http: dict[Operation, LatencySummary]
+    delivery: LatencySummary
+    throughput: Throughput
+
+
+def parse_mix(value: str) -> dict[Operation, int]:
+    """Parse an operation mix such as read=4,create=1,move=1,update=2."""
+    mix: dict[Operation, int] = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        operation = next((o for o in OPERATIONS if o == name), None)
+        if operation is None:
+            raise argparse.ArgumentTypeError(
+                f"Unknown operation {name!r}. "
+                f"Choose from {', '.join(OPERATIONS)}"
+            )
+        try:
+            mix[operation] = int(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Weight of {name} must be an integer, got {weight!r}"
+            ) from None
+        if mix[operation] < 0:
+            raise argparse.ArgumentTypeError(
+                f"Weight of {name} must not be negative"
+            )
+    if sum(mix.values()) == 0:
+        raise argparse.ArgumentTypeError("Need at least one positive weight")
+    return mix
+
+
+def summarize_latencies(samples: list[float], errors: int) -> LatencySummary:
+    """Summarize latencies given in seconds."""
+    if not samples:
+        return {
+            "count": 0,
+            "errors": errors,
+            "p50_ms": None,
+            "p90_ms": None,
+            "p99_ms": None,
+            "max_ms": None,
+        }
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def session_create(user: User) -> str:
+    """
+    Log user in by creating a session, and return the session key.
+
+    Works like django.test.Client.force_login. Logging in through the API
+    would be rate limited, since all clients share one IP address.
+    """
+    # Like force_login, use the first backend that can load users
+    backend = next(
+        path
+        for path in settings.AUTHENTICATION_BACKENDS
+        if hasattr(import_string(path), "get_user")
+    )
+    engine = import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = backend
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return str(session.session_key)
+
+
+def csrf_secret_create() -> str:
+    """
+    Return a CSRF secret for a client.
+
+    Sent as both the CSRF cookie and the X-CSRFToken header, this passes
+    DRF's CSRF check for session authenticated writes.
+    """
+    return get_random_string(CSRF_SECRET_LENGTH, CSRF_ALLOWED_CHARS)
+
+
+@dataclass
+class Recorder:
+    """
+    Collect samples while a load test runs.
+
+    Delivery latency is the time from sending the most recent write to a
+    resource until a client receives a change event for it. Changes to one
+    resource in quick succession may be coalesced into a single event, so
+    that event is attributed to the latest write.
+    """
+
+    start: float = field(default_factory=time.perf_counter)
+    http: defaultdict[Operation, list[float]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    errors: Counter[Operation] = field(default_factory=Counter)
+    delivery: list[float] = field(default_factory=list)
+    events: int = 0
+    writes: dict[tuple[str, str], float] = field(default_factory=dict)
+
+    def request_done(
+        self, operation: Operation, started: float, ok: bool
+    ) -> None:
+        """Record an HTTP request that started at started."""
+        if ok:
+            self.http[operation].append(time.perf_counter() - started)
+        else:
+            self.errors[operation] += 1
+
+    def write_sent(self, resource: str, uuid: str) -> None:
+        """Record that a write to a resource is being sent now."""
+        self.writes[resource, uuid] = time.perf_counter()
+
+    def event_received(self, resource: str, uuid: str) -> None:
+        """Record a change event received by a client."""
+        self.events += 1
+        sent = self.writes.get((resource, uuid))
+        if sent is not None:
+            self.delivery.append(time.perf_counter() - sent)
+
+    def report(self) -> LoadTestReport:
+        """Summarize everything recorded so far."""
+        elapsed = time.perf_counter() - self.start
+        requests = sum(map(len, self.http.values())) + self.errors.total()
+        return {
+            "elapsed_s": elapsed,
+            "http": {
+                operation: summarize_latencies(
+                    self.http[operation], self.errors[operation]
+                )
+                for operation in OPERATIONS
+                if operation in self.http or operation in self.errors
+            },
+            "delivery": summarize_latencies(self.delivery, 0),
+            "throughput": {
+                "requests_per_s": requests / elapsed,
+                "events_per_s": self.events / elapsed,
+            },
+        }
@@ -0,0 +1,512 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Collect per-route query and timing metrics.
+
+Every HTTP request and websocket event that is measured records how many
+SQL queries it ran, how much time was spent waiting for the database, how
+much time was spent inside DRF serializers and how long the whole thing
+took. Aggregates are kept in process memory and can be rendered in the
+Prometheus text exposition format.
+
+Aggregates are per process. With several workers, every worker reports its
+own numbers and the scraper has to sum them up.
+
+Websocket send queues, see projectify.workspace.consumers.ChangeConsumer,
+report how many events are waiting to be sent, how many were coalesced and
+how often a queue overflowed. Their subscriptions report how many there
+are and roughly how much memory they take up. Password hashes, see
+projectify.user.hashers, report how many are pending and how many were
+refused. These are counted regardless of INSTRUMENTATION, since they are
+cheap.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional
+
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from rest_framework import serializers
+
+from projectify.lib.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+Kind = Literal["http", "ws"]
+
+# Upper bounds in seconds for the request duration histogram
+BUCKETS: tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+@dataclass
+class Measurement:
+    """Counters for a single request or websocket event."""
+
+    correlation_id: str
+    queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+    # Nesting depth of serializer .data calls, to avoid double counting
+    serializer_depth: int = 0
+
+
+@dataclass
+class RouteStats:
+    """Aggregated counters for one route."""
+
+    count: int = 0
+    slow: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+    total_time: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+
+
+@dataclass
+class SendQueueStats:
+    """Counters for the send queues of all websocket connections."""
+
+    depth: int = 0
+    max_depth: int = 0
+    coalesced: int = 0
+    overflows: int = 0
+
+
+@dataclass
+class SubscriptionStats:
+    """Counters for the subscriptions of all websocket connections."""
+
+    count: int = 0
+    # Approximate, see ChangeConsumer.subscription_size
+    size: int = 0
+
+
+@dataclass
+class PasswordHashingStats:
+    """Counters for password hashes of this process."""
+
+    pending: int = 0
+    max_pending: int = 0
+    shed: int = 0
+
+
+_current: ContextVar[Optional[Measurement]] = ContextVar(
+    "projectify_measurement", default=None
+)
+_lock = threading.Lock()
+_registry: dict[tuple[Kind, str], RouteStats] = {}
+_send_queue = SendQueueStats()
+_subscriptions = SubscriptionStats()
+_password_hashing = PasswordHashingStats()
+
+
+def current_correlation_id() -> Optional[str]:
+    """Return the correlation id of the request being measured, if any."""
+    measurement = _current.get()
+    if measurement is None:
+        return None
+    return measurement.correlation_id
+
+
+def _execute_wrapper(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: Mapping[str, Any],
+) -> Any:
+    """Count a query and the time spent waiting for it."""
+    measurement = _current.get()
+    if measurement is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        measurement.queries += 1
+        measurement.db_time += time.perf_counter() - start
+
+
+_serializers_instrumented = False
+
+
+def instrument_serializers() -> None:
+    """
+    Time serializer .data access.
+
+    DRF computes the representation of a serializer lazily when .data is
+    first accessed. Nested serializers and ListSerializer call into the
+    same property, so only the outermost access is counted.
+    """
+    global _serializers_instrumented
+    if _serializers_instrumented:
+        return
+    _serializers_instrumented = True
+    original = getattr(serializers.BaseSerializer, "data")
+
+    assert isinstance(original, property)
+    assert original.fget
+
+    fget = original.fget
+
+    def data(self: serializers.BaseSerializer) -> Any:
+        measurement = _current.get()
+        if measurement is None:
+            return fget(self)
+        measurement.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            measurement.serializer_depth -= 1
+            if measurement.serializer_depth == 0:
+                measurement.serializer_time += time.perf_counter() - start
+
+    setattr(serializers.BaseSerializer, "data", property(data))
+
+
+def record(
+    kind: Kind, route: str, measurement: Measurement, total_time: float
+) -> None:
+    """Add a finished measurement to the aggregates."""
+    slow_ms = get_settings().SLOW_REQUEST_MS
+    slow = slow_ms is not None and total_time * 1000 >= slow_ms
+    with _lock:
+        stats = _registry.setdefault((kind, route), RouteStats())
+        stats.count += 1
+        stats.queries += measurement.queries
+        stats.db_time += measurement.db_time
+        stats.serializer_time += measurement.serializer_time
+        stats.total_time += total_time
+        for i, bound in enumerate(BUCKETS):
+            if total_time <= bound:
+                stats.buckets[i] += 1
+        if slow:
+            stats.slow += 1
+    if slow:
+        logger.warning(
+            "Slow %s %s [%s]: %.1f ms total, %d queries, %.1f ms db, "
+            "%.1f ms serializer",
+            kind,
+            route,
+            measurement.correlation_id,
+            total_time * 1000,
+            measurement.queries,
+            measurement.db_time * 1000,
+            measurement.serializer_time * 1000,
+        )
+
+
+@contextmanager
+def measure(
+    kind: Kind,
+    route: Callable[[], str],
+    correlation_id: Optional[str] = None,
+) -> Iterator[Measurement]:
+    """
+    Measure everything happening inside this context.
+
+    route is only evaluated after the block has finished, since for HTTP
+    requests we know the matched route only after URL resolution.
+    """
+    measurement = Measurement(
+        correlation_id=correlation_id or uuid.uuid4().hex
+    )
+    token = _current.set(measurement)
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(_execute_wrapper):
+            yield measurement
+    finally:
+        total_time = time.perf_counter() - start
+        _current.reset(token)
+        record(kind, route(), measurement, total_time)
+
+
+def _execute_wrapper_add() -> None:
+    connection.execute_wrappers.append(_execute_wrapper)
+
+
+def _execute_wrapper_remove() -> None:
+    connection.execute_wrappers.remove(_execute_wrapper)
+
+
+@asynccontextmanager
+async def ameasure(
+    kind: Kind,
+    route: Callable[[], str],
+    correlation_id: Optional[str] = None,
+) -> AsyncIterator[Measurement]:
+    """
+    Measure everything happening inside this context, asynchronously.
+
+    Like measure, but for async views. Their queries run in the thread that
+    sync_to_async picks for the request, which has its own connection, so
+    queries are counted on that connection.
+    """
+    measurement = Measurement(
+        correlation_id=correlation_id or uuid.uuid4().hex
+    )
+    token = _current.set(measurement)
+    start = time.perf_counter()
+    await sync_to_async(_execute_wrapper_add)()
+    try:
+        yield measurement
+    finally:
+        await sync_to_async(_execute_wrapper_remove)()
+        total_time = time.perf_counter() - start
+        _current.reset(token)
+        record(kind, route(), measurement, total_time)
+
+
+class InstrumentedConsumerMixin:
+    """Measure every event handled by a synchronous consumer."""
+
+    def get_metrics_route(self, message: Mapping[str, Any]) -> str:
+        """Return the route name a message is recorded under."""
+        return str(message["type"])
+
+    # Mirrors channels.consumer.SyncConsumer.dispatch
+    @database_sync_to_async
+    def dispatch(self, message: Mapping[str, Any]) -> None:
+        """Dispatch a message to its handler while measuring it."""
+        handler = getattr(self, message["type"].replace(".", "_"), None)
+        if handler is None:
+            raise ValueError(f"No handler for message type {message['type']}")
+        if not get_settings().INSTRUMENTATION:
+            handler(message)
+            return
+        instrument_serializers()
+        with measure("ws", lambda: self.get_metrics_route(message)):
+            handler(message)
+
+
+def send_queue_record(
+    *, depth: int = 0, coalesced: int = 0, overflows: int = 0
+) -> None:
+    """Add to the send queue counters, depth is a change in queue depth."""
+    with _lock:
+        _send_queue.depth += depth
+        _send_queue.max_depth = max(_send_queue.max_depth, _send_queue.depth)
+        _send_queue.coalesced += coalesced
+        _send_queue.overflows += overflows
+
+
+def send_queue_snapshot() -> SendQueueStats:
+    """Return a copy of the send queue counters."""
+    with _lock:
+        return SendQueueStats(
+            depth=_send_queue.depth,
+            max_depth=_send_queue.max_depth,
+            coalesced=_send_queue.coalesced,
+            overflows=_send_queue.overflows,
+        )
+
+
+def subscription_record(*, count: int, size: int) -> None:
+    """Add to the subscription counters, negative when unsubscribing."""
+    with _lock:
+        _subscriptions.count += count
+        _subscriptions.size += size
+
+
+def subscription_snapshot() -> SubscriptionStats:
+    """Return a copy of the subscription counters."""
+    with _lock:
+        return SubscriptionStats(
+            count=_subscriptions.count, size=_subscriptions.size
+        )
+
+
+def password_hashing_record(*, pending: int = 0, shed: int = 0) -> None:
+    """Add to the password hashing counters, pending is a change."""
+    with _lock:
+        _password_hashing.pending += pending
+        _password_hashing.max_pending = max(
+            _password_hashing.max_pending, _password_hashing.pending
+        )
+        _password_hashing.shed += shed
+
+
+def password_hashing_snapshot() -> PasswordHashingStats:
+    """Return a copy of the password hashing counters."""
+    with _lock:
+        return PasswordHashingStats(
+            pending=_password_hashing.pending,
+            max_pending=_password_hashing.max_pending,
+            shed=_password_hashing.shed,
+        )
+
+
+def reset() -> None:
+    """Clear all aggregates."""
+    global _send_queue, _subscriptions, _password_hashing
+    with _lock:
+        _registry.clear()
+        _send_queue = SendQueueStats()
+        _subscriptions = SubscriptionStats()
+        _password_hashing = PasswordHashingStats()
+
+
+def snapshot() -> dict[tuple[Kind, str], RouteStats]:
+    """Return a copy of the current aggregates."""
+    with _lock:
+        return {
+            key: RouteStats(
+                count=stats.count,
+                slow=stats.slow,
+                queries=stats.queries,
+                db_time=stats.db_time,
+                serializer_time=stats.serializer_time,
+                total_time=stats.total_time,
+                buckets=list(stats.buckets),
+            )
+            for key, stats in _registry.items()
+        }
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """Render the aggregates in the Prometheus text exposition format."""
+    stats = sorted(snapshot().items())
+    counters: tuple[tuple[str, str, Callable[[RouteStats], float]], ...] = (
+        (
+            "projectify_requests_total",
+            "Measured requests and websocket events",
+            lambda s: s.count,
+        ),
+        (
+            "projectify_slow_requests_total",
+            "Requests slower than SLOW_REQUEST_MS",
+            lambda s: s.slow,
+        ),
+        (
+            "projectify_queries_total",
+            "SQL queries executed",
+            lambda s: s.queries,
+        ),
+        (
+            "projectify_db_seconds_total",
+            "Time spent executing SQL queries",
+            lambda s: s.db_time,
+        ),
+        (
+            "projectify_serializer_seconds_total",
+            "Time spent serializing",
+            lambda s: s.serializer_time,
+        ),
+    )
+    lines: list[str] = []
+    for name, help, get in counters:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} counter")
+        for (kind, route), s in stats:
+            labels = f'kind="{kind}",route="{_escape(route)}"'
+            lines.append(f"{name}{{{labels}}} {get(s)}")
+    name = "projectify_request_duration_seconds"
+    lines.append(f"# HELP {name} Total time spent handling requests")
+    lines.append(f"# TYPE {name} histogram")
+    for (kind, route), s in stats:
+        labels = f'kind="{kind}",route="{_escape(route)}"'
+        for bound, n in zip(BUCKETS, s.buckets):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {n}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {s.count}')
+        lines.append(f"{name}_sum{{{labels}}} {s.total_time}")
+        lines.append(f"{name}_count{{{labels}}} {s.count}")
+    send_queue = send_queue_snapshot()
+    subscriptions = subscription_snapshot()
+    password_hashing = password_hashing_snapshot()
+    process_metrics: tuple[tuple[str, str, str, int], ...] = (
+        (
+            "projectify_ws_send_queue_depth",
+            "Events waiting in websocket send queues",
+            "gauge",
+            send_queue.depth,
+        ),
+        (
+            "projectify_ws_send_queue_max_depth",
+            "Most events ever waiting in websocket send queues",
+            "gauge",
+            send_queue.max_depth,
+        ),
+        (
+            "projectify_ws_send_queue_coalesced_total",
+            "Queued change events replaced by a newer one",
+            "counter",
+            send_queue.coalesced,
+        ),
+        (
+            "projectify_ws_send_queue_overflows_total",
+            "Send queues replaced by resync markers",
+            "counter",
+            send_queue.overflows,
+        ),
+        (
+            "projectify_ws_subscriptions",
+            "Resources websocket connections are subscribed to",
+            "gauge",
+            subscriptions.count,
+        ),
+        (
+            "projectify_ws_subscription_bytes",
+            "Approximate memory held by websocket subscriptions",
+            "gauge",
+            subscriptions.size,
+        ),
+        (
+            "projectify_password_hashing_pending",
+            "Password hashes queued or running",
+            "gauge",
+            password_hashing.pending,
+        ),
+        (
+            "projectify_password_hashing_max_pending",
+            "Most password hashes ever queued or running",
+            "gauge",
+            password_hashing.max_pending,
+        ),
+        (
+            "projectify_password_hashing_shed_total",
+            "Password hashes refused with a 429",
+            "counter",
+            password_hashing.shed,
+        ),
+    )
+    for name, help, type, value in process_metrics:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {type}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@require_GET
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Serve aggregates to a Prometheus scraper holding METRICS_TOKEN."""
+    token = get_settings().METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if token is None or not constant_time_compare(
+        authorization, f"Bearer {token}"
+    ):
+        return HttpResponse(status=403)
+    return HttpResponse(
+        render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
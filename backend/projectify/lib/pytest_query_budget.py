@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Pytest plugin checking that query counts stay within budget as data grows.
+
+The query_scaling fixture runs a view or service at two data sizes. A test
+fails if the query count at the larger size is higher than at the smaller
+size, which points at an N+1 problem in a selector or serializer, or if it
+exceeds the budget declared with projectify.lib.query_budget.query_budget.
+
+    def test_project_detail(query_scaling, rest_user_client, ...):
+        query_scaling(
+            ProjectReadUpdateDelete.get,
+            populate=lambda n: create_tasks(section, n),
+            run=lambda: rest_user_client.get(url),
+        )
+
+populate(n) must add n more rows of whatever the target scales with. The
+plugin is registered in projectify/conftest.py. A summary of all checked
+budgets is shown at the end of the test session.
+"""
+
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any, Protocol
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from projectify.lib.query_budget import budget_for, budgets
+
+SIZES = (1, 10)
+
+
+@dataclass(frozen=True)
+class ScalingResult:
+    """Query counts measured for a budget at two data sizes."""
+
+    name: str
+    max_queries: int
+    small_size: int
+    small_queries: int
+    large_size: int
+    large_queries: int
+
+
+class QueryScaling(Protocol):
+    """Type of the query_scaling fixture."""
+
+    def __call__(
+        self,
+        target: Callable[..., object],
+        *,
+        populate: Callable[[int], object],
+        run: Callable[[], object],
+        sizes: tuple[int, int] = SIZES,
+    ) -> ScalingResult:
+        """Check target's budget."""
+        ...
+
+
+def capture(run: Callable[[], object]) -> list[str]:
+    """Return the SQL of all queries run."""
+    with CaptureQueriesContext(connection) as context:
+        run()
+    return [query["sql"] for query in context.captured_queries]
+
+
+def describe_growth(small: list[str], large: list[str]) -> str:
+    """List queries that ran more often at the larger size."""
+    small_counts = Counter(small)
+    lines = [
+        f"  +{count - small_counts[sql]}x {sql}"
+        for sql, count in Counter(large).items()
+        if count > small_counts[sql]
+    ]
+    return "\n".join(lines)
+
+
+def check_scaling(
+    target: Callable[..., object],
+    *,
+    populate: Callable[[int], object],
+    run: Callable[[], object],
+    sizes: tuple[int, int] = SIZES,
+) -> ScalingResult:
+    """
+    Run target at two data sizes and compare query counts to its budget.
+
+    run is called once before measuring, so that one-off queries, for
+    example to fill the content type cache, are not counted.
+    """
+    budget = budget_for(target)
+    small_size, large_size = sizes
+    if not 0 < small_size < large_size:
+        raise ValueError(f"Invalid sizes {sizes}")
+
+    populate(small_size)
+    run()
+    small = capture(run)
+    populate(large_size - small_size)
+    large = capture(run)
+
+    result = ScalingResult(
+        name=budget.name,
+        max_queries=budget.max_queries,
+        small_size=small_size,
+        small_queries=len(small),
+        large_size=large_size,
+        large_queries=len(large),
+    )
+    if len(large) > len(small):
+        pytest.fail(
+            f"Query count for {budget.name} grows with N: "
+            f"{len(small)} queries for N={small_size}, "
+            f"{len(large)} queries for N={large_size}\n"
+            f"{describe_growth(small, large)}"
+        )
+    if len(large) > budget.max_queries:
+        pytest.fail(
+            f"{budget.name} ran {len(large)} queries, "
+            f"but its budget is {budget.max_queries}"
+        )
+    return result
+
+
+class QueryBudgetPlugin:
+    """Provide query_scaling and report results."""
+
+    results: dict[str, ScalingResult]
+
+    def __init__(self) -> None:
+        """Start without results."""
+        self.results = {}
+
+    @pytest.fixture
+    def query_scaling(self) -> QueryScaling:
+        """Check that a target stays within budget as data grows."""
+
+        def check(
+            target: Callable[..., object],
+            *,
+            populate: Callable[[int], object],
+            run: Callable[[], object],
+            sizes: tuple[int, int] = SIZES,
+        ) -> ScalingResult:
+            result = check_scaling(
+                target, populate=populate, run=run, sizes=sizes
+            )
+            self.results[result.name] = result
+            return result
+
+        return check
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Hand results of an xdist worker to the controller."""
+        workeroutput = getattr(session.config, "workeroutput", None)
+        if workeroutput is not None:
+            workeroutput["query_budgets"] = [
+                asdict(result) for result in self.results.values()
+            ]
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node: Any, error: object) -> None:
+        """Collect results from an xdist worker."""
+        del error
+        for result in node.workeroutput.get("query_budgets", []):
+            self.results[result["name"]] = ScalingResult(**result)
+
+    def pytest_terminal_summary(
+        self, terminalreporter: pytest.TerminalReporter
+    ) -> None:
+        """Show query counts of all checked budgets."""
+        if not self.results:
+            return
+        terminalreporter.write_sep("=", "query budgets")
+        for name, result in sorted(self.results.items()):
+            terminalreporter.write_line(
+                f"{name}: {result.small_queries} (N={result.small_size}), "
+                f"{result.large_queries} (N={result.large_size}) "
+                f"of {result.max_queries}"
+            )
+        unchecked = sorted(budgets().keys() - self.results.keys())
+        if unchecked:
+            terminalreporter.write_line(
+                f"Budgets without scaling test: {', '.join(unchecked)}"
+            )
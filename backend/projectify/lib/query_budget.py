@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Declare how many queries a view or service may run.
+
+A budget is a ceiling that must hold regardless of how much data is involved,
+for example a project detail view that runs at most 14 queries no matter how
+many tasks the project contains:
+
+    class ProjectReadUpdateDelete(APIView):
+        @query_budget(14)
+        def get(self, request: Request, project_uuid: UUID) -> Response:
+            ...
+
+Declaring a budget has no runtime cost, the decorated function is returned
+unchanged. Budgets are enforced in tests using the query_scaling fixture from
+projectify.lib.pytest_query_budget.
+"""
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import TypeVar
+
+T = TypeVar("T", bound=Callable[..., object])
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """The most queries a view or service may run."""
+
+    name: str
+    max_queries: int
+
+
+_budgets: dict[str, QueryBudget] = {}
+
+
+def budget_name(target: Callable[..., object]) -> str:
+    """Return the dotted name a budget is registered under."""
+    return f"{target.__module__}.{target.__qualname__}"
+
+
+def query_budget(max_queries: int) -> Callable[[T], T]:
+    """Register a query budget for the decorated function or method."""
+    if max_queries < 0:
+        raise ValueError("max_queries must not be negative")
+
+    def decorator(target: T) -> T:
+        name = budget_name(target)
+        _budgets[name] = QueryBudget(name=name, max_queries=max_queries)
+        return target
+
+    return decorator
+
+
+def budget_for(target: Callable[..., object]) -> QueryBudget:
+    """Return the budget declared for target."""
+    name = budget_name(target)
+    try:
+        return _budgets[name]
+    except KeyError:
+        raise LookupError(f"No query budget declared for {name}") from None
+
+
+def budgets() -> Mapping[str, QueryBudget]:
+    """Return all declared budgets by name."""
+    return dict(_budgets)
@@ -33,6 +33,6 @@ def populate_production_middleware(middleware: Sequence[str]) -> Iterable[str]:
         elif m == gzip_middleware:
             # Yield white noise *after* gzip
             yield m
-            yield "whitenoise.middleware.WhiteNoiseMiddleware"
+            yield "projectify.middleware.static_files"
         else:
             yield m
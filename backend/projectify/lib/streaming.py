@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Stream large responses.
+
+The encoders turn an iterator of records into an iterator of byte chunks.
+They buffer records until a chunk holds at least CHUNK_SIZE bytes, so that
+neither tiny writes nor the whole output end up in memory.
+
+We are served over ASGI, where Django reads a synchronous
+StreamingHttpResponse iterator into a list before sending any of it.
+aiter_sync hands out a blocking iterator chunk by chunk instead, reading
+each chunk in a worker thread.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+
+from projectify.lib.json import dumps
+
+# Collect at least this many bytes before yielding a chunk
+CHUNK_SIZE = 64 * 1024
+
+
+def encode_jsonl(records: Iterable[Any]) -> Iterator[bytes]:
+    """Encode records as JSON lines."""
+    buffer = bytearray()
+    for record in records:
+        buffer += dumps(record)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def encode_csv(
+    rows: Iterable[Mapping[str, Any]], columns: Iterable[str]
+) -> Iterator[bytes]:
+    """Encode rows as CSV with a header line."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns))
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _next_chunk(chunks: Iterator[bytes]) -> Optional[bytes]:
+    """Return the next chunk, or None when done."""
+    return next(chunks, None)
+
+
+async def aiter_sync(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Consume a blocking iterator from async code."""
+    # Database cursors are per thread, so all chunks are read in one thread
+    next_chunk = sync_to_async(_next_chunk, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks)) is not None:
+        yield chunk
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test benchmark module."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import pytest
+
+from projectify.lib.benchmark import (
+    CaseResult,
+    compare,
+    percentile,
+    run_case,
+    summarize,
+)
+from projectify.user.models import User
+
+
+def test_percentile() -> None:
+    """Test nearest rank percentiles."""
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 95) == 95
+    assert percentile(samples, 100) == 100
+    assert percentile([3.0], 95) == 3
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+def test_summarize() -> None:
+    """Test that seconds are converted to milliseconds."""
+    result = summarize([0.001, 0.003, 0.002], 4)
+    assert result == {
+        "iterations": 3,
+        "queries": 4,
+        "min_ms": pytest.approx(1),
+        "median_ms": pytest.approx(2),
+        "p95_ms": pytest.approx(3),
+        "max_ms": pytest.approx(3),
+        "mean_ms": pytest.approx(2),
+    }
+
+
+@pytest.mark.django_db
+def test_run_case(user: User) -> None:
+    """Test that queries are counted and around is entered every time."""
+    entered = 0
+
+    @contextmanager
+    def around() -> Iterator[None]:
+        nonlocal entered
+        entered += 1
+        yield
+
+    result = run_case(
+        lambda: list(User.objects.all()),
+        iterations=3,
+        warmup=2,
+        around=around,
+    )
+    assert entered == 5
+    assert result["iterations"] == 3
+    assert result["queries"] == 1
+
+
+def test_compare() -> None:
+    """Test that only slower medians beyond the threshold are reported."""
+
+    def result(median_ms: float) -> CaseResult:
+        return {
+            "iterations": 1,
+            "queries": 0,
+            "min_ms": median_ms,
+            "median_ms": median_ms,
+            "p95_ms": median_ms,
+            "max_ms": median_ms,
+            "mean_ms": median_ms,
+        }
+
+    baseline = {"same": result(10), "slower": result(10), "gone": result(1)}
+    current = {"same": result(11), "slower": result(13), "new": result(5)}
+    assert compare(baseline, current, threshold_pct=20) == [
+        {
+            "case": "slower",
+            "baseline_ms": 10,
+            "current_ms": 13,
+            "change_pct": pytest.approx(30),
+        }
+    ]
@@ -0,0 +1,27 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test conditional GET helpers."""
+
+from django.test import RequestFactory
+
+from projectify.lib.conditional import etag_matches, not_modified
+
+
+def test_etag_matches(rf: RequestFactory) -> None:
+    """Test If-None-Match parsing."""
+    etag = '"abc"'
+    assert not etag_matches(rf.get("/"), etag)
+    assert etag_matches(rf.get("/", HTTP_IF_NONE_MATCH='"abc"'), etag)
+    assert etag_matches(rf.get("/", HTTP_IF_NONE_MATCH='W/"abc"'), etag)
+    assert etag_matches(rf.get("/", HTTP_IF_NONE_MATCH='"x", "abc"'), etag)
+    assert etag_matches(rf.get("/", HTTP_IF_NONE_MATCH="*"), etag)
+    assert not etag_matches(rf.get("/", HTTP_IF_NONE_MATCH='"x"'), etag)
+
+
+def test_not_modified() -> None:
+    """Test that 304 responses carry the validator."""
+    response = not_modified('"abc"')
+    assert response.status_code == 304
+    assert response["ETag"] == '"abc"'
+    assert response["Cache-Control"] == "private, no-cache"
@@ -15,13 +15,15 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.test import APIRequestFactory
 
+from projectify.user.exceptions import PasswordHashingOverloaded
+
 
 @decorators.api_view()
 @decorators.permission_classes([permissions.AllowAny])
 def get(
     _: Request,
     code: Literal[400, 403, 404, 429],
-    typ: Literal["django", "drf"],
+    typ: Literal["django", "drf", "password_hashing"],
 ) -> Response:
     """Produce various errors."""
     match typ, code:
@@ -39,6 +41,8 @@ def get(
             raise dj_exceptions.PermissionDenied()
         case "django", 404:
             raise http.Http404()
+        case "password_hashing", 429:
+            raise PasswordHashingOverloaded()
         case _:
             raise ValueError(f"Can't raise code {code} for {typ}")
 
@@ -84,3 +88,9 @@ def test_errors(factory: APIRequestFactory) -> None:
         "status": "not_found",
         "code": 404,
     }
+    response = get(request, 429, "password_hashing")
+    assert response.data == {
+        "status": "throttled",
+        "code": 429,
+    }
+    assert response["Retry-After"] == "1"
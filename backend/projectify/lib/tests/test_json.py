@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test JSON encoding and decoding."""
+
+import io
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.utils.translation import gettext_lazy as _
+
+import pytest
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+
+from projectify.lib import json
+
+PAYLOAD = {
+    "uuid": uuid.UUID("2a9d3e6c-8c49-4d8e-9a54-1e0f1e1b7d2a"),
+    "created": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    "naive": datetime(2024, 1, 2, 3, 4, 5),
+    "amount": Decimal("1.50"),
+    "lazy": _("Could not find workspace with this UUID"),
+    "text": '日本語     "quoted"',
+    "nested": OrderedDict(list=[1, 2.5, None, True]),
+    1: "integer key",
+    "big": 2**70,
+}
+
+
+def test_dumps() -> None:
+    """Test that output is identical to DRF's JSONRenderer."""
+    expected = renderers.JSONRenderer().render(PAYLOAD)
+    assert json.dumps(PAYLOAD) == expected
+    assert json.JSONRenderer().render(PAYLOAD) == expected
+    assert json.JSONRenderer().render(None) == b""
+    assert json.dumps_stdlib(PAYLOAD) == expected
+
+
+def test_render_indent() -> None:
+    """Test that indented rendering is left to DRF."""
+    rendered = json.JSONRenderer().render(
+        {"a": 1}, "application/json; indent=4"
+    )
+    assert rendered == b'{\n    "a": 1\n}'
+
+
+def test_parse() -> None:
+    """Test parsing and parse errors."""
+    parser = json.JSONParser()
+    data = '{"title": "日本語"}'.encode()
+    assert parser.parse(io.BytesIO(data)) == {"title": "日本語"}
+    assert json.loads(data) == {"title": "日本語"}
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"title":'))
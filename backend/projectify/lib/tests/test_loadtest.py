@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test load test helpers."""
+
+import argparse
+
+from django.test import Client
+from django.urls import reverse
+
+import pytest
+
+from projectify.lib.loadtest import (
+    Recorder,
+    csrf_secret_create,
+    parse_mix,
+    session_create,
+    summarize_latencies,
+)
+from projectify.user.models import User
+
+
+def test_parse_mix() -> None:
+    """Test parsing operation weights."""
+    assert parse_mix("read=4, update=2") == {"read": 4, "update": 2}
+    for invalid in ("delete=1", "read=x", "read=-1", "read=0"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix(invalid)
+
+
+def test_summarize_latencies() -> None:
+    """Test that seconds are summarized in milliseconds."""
+    summary = summarize_latencies([0.001, 0.003, 0.002], 1)
+    assert summary == {
+        "count": 3,
+        "errors": 1,
+        "p50_ms": pytest.approx(2),
+        "p90_ms": pytest.approx(3),
+        "p99_ms": pytest.approx(3),
+        "max_ms": pytest.approx(3),
+    }
+    assert summarize_latencies([], 0)["p50_ms"] is None
+
+
+def test_recorder() -> None:
+    """Test that events are attributed to the latest write."""
+    recorder = Recorder()
+    recorder.event_received("task", "a")
+    assert recorder.delivery == []
+    recorder.write_sent("task", "a")
+    recorder.event_received("task", "a")
+    recorder.request_done("update", recorder.start, True)
+    recorder.request_done("create", recorder.start, False)
+    report = recorder.report()
+    assert report["delivery"]["count"] == 1
+    assert report["http"]["update"]["count"] == 1
+    assert report["http"]["create"]["errors"] == 1
+    assert "read" not in report["http"]
+    assert report["throughput"]["events_per_s"] > 0
+
+
+@pytest.mark.django_db
+def test_session_create(user: User) -> None:
+    """Test that the session authenticates the user."""
+    client = Client()
+    client.cookies["sessionid"] = session_create(user)
+    response = client.get(reverse("user:users:read"))
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
+    assert len(csrf_secret_create()) == 32
@@ -0,0 +1,140 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test metrics module."""
+
+from collections.abc import Iterator
+from typing import Any, cast
+
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from django.test.client import Client
+from django.urls import reverse
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from rest_framework import serializers
+
+from projectify.lib import metrics
+from projectify.middleware import instrumentation
+from projectify.user.models import User
+
+
+@pytest.fixture(autouse=True)
+def clean_registry() -> Iterator[None]:
+    """Start every test with empty aggregates."""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class UserSerializer(serializers.Serializer):
+    """Serialize a user."""
+
+    email = serializers.EmailField()
+
+
+@pytest.mark.django_db
+def test_measure(user: User) -> None:
+    """Test that queries and serializer time are counted."""
+    metrics.instrument_serializers()
+    with metrics.measure("http", lambda: "GET /test", "abc") as measurement:
+        assert metrics.current_correlation_id() == "abc"
+        users = list(User.objects.all())
+        UserSerializer(users, many=True).data
+    assert metrics.current_correlation_id() is None
+    assert measurement.queries == 1
+    assert measurement.serializer_time > 0
+    assert measurement.serializer_depth == 0
+    stats = metrics.snapshot()[("http", "GET /test")]
+    assert stats.count == 1
+    assert stats.queries == 1
+    assert stats.total_time >= stats.db_time
+
+
+@pytest.mark.django_db
+def test_slow_request(settings: Any, caplog: pytest.LogCaptureFixture) -> None:
+    """Test that slow requests are logged with their correlation id."""
+    settings.SLOW_REQUEST_MS = 0
+    with metrics.measure("ws", lambda: "change task", "corr-id"):
+        pass
+    assert metrics.snapshot()[("ws", "change task")].slow == 1
+    assert "corr-id" in caplog.text
+
+
+def test_render_prometheus() -> None:
+    """Test rendering aggregates."""
+    measurement = metrics.Measurement(correlation_id="x", queries=3)
+    metrics.record("http", 'GET /"quoted"', measurement, 0.02)
+    text = metrics.render_prometheus()
+    labels = 'kind="http",route="GET /\\"quoted\\""'
+    assert f"projectify_queries_total{{{labels}}} 3" in text
+    assert (
+        f'projectify_request_duration_seconds_bucket{{{labels},le="0.01"}} 0'
+        in text
+    )
+    assert (
+        f'projectify_request_duration_seconds_bucket{{{labels},le="0.025"}} 1'
+        in text
+    )
+    assert f"projectify_request_duration_seconds_count{{{labels}}} 1" in text
+
+
+def test_render_send_queue() -> None:
+    """Test rendering send queue counters."""
+    metrics.reset()
+    metrics.send_queue_record(depth=3)
+    metrics.send_queue_record(depth=-1, coalesced=2, overflows=1)
+    text = metrics.render_prometheus()
+    assert "projectify_ws_send_queue_depth 2" in text
+    assert "projectify_ws_send_queue_max_depth 3" in text
+    assert "projectify_ws_send_queue_coalesced_total 2" in text
+    assert "projectify_ws_send_queue_overflows_total 1" in text
+
+
+def test_metrics_view(settings: Any, rf: RequestFactory) -> None:
+    """Test that the metrics view requires the token."""
+    settings.METRICS_TOKEN = "hunter2"
+    response = metrics.metrics_view(rf.get("/metrics"))
+    assert response.status_code == 403
+    response = metrics.metrics_view(
+        rf.get("/metrics", HTTP_AUTHORIZATION="Bearer hunter2")
+    )
+    assert response.status_code == 200
+    assert b"# TYPE projectify_requests_total counter" in response.content
+
+
+@pytest.mark.django_db
+def test_middleware(settings: Any, user_client: Client) -> None:
+    """Test that requests are measured per route."""
+    settings.INSTRUMENTATION = True
+    resource_url = reverse("user:users:read")
+    response = user_client.get(resource_url, HTTP_X_REQUEST_ID="req-1")
+    assert response.status_code == 200
+    assert response["X-Request-ID"] == "req-1"
+    stats = metrics.snapshot()[("http", f"GET {resource_url}")]
+    assert stats.count == 1
+    assert stats.queries > 0
+
+    # Unsafe correlation ids are replaced
+    response = user_client.get(resource_url, HTTP_X_REQUEST_ID="<script>")
+    assert response["X-Request-ID"] != "<script>"
+
+
+@pytest.mark.django_db
+def test_middleware_async(settings: Any, rf: RequestFactory) -> None:
+    """Test that async views stay async and are measured."""
+    settings.INSTRUMENTATION = True
+
+    async def view(request: HttpRequest) -> HttpResponse:
+        return HttpResponse(str(await User.objects.acount()))
+
+    middleware = instrumentation(cast(Any, view))
+    assert iscoroutinefunction(middleware)
+    request = rf.get("/async", HTTP_X_REQUEST_ID="req-2")
+    response = async_to_sync(middleware)(request)
+    assert response.content == b"0"
+    assert response["X-Request-ID"] == "req-2"
+    stats = metrics.snapshot()[("http", "GET <unmatched>")]
+    assert stats.count == 1
+    assert stats.queries == 1
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test query budgets and the query scaling check."""
+
+import pytest
+from faker import Faker
+
+from projectify.lib.pytest_query_budget import QueryScaling, check_scaling
+from projectify.lib.query_budget import budget_for, query_budget
+from projectify.user.models import User
+from projectify.user.services.internal import user_create
+
+
+@query_budget(1)
+def list_users() -> list[str]:
+    """List user emails with one query."""
+    return [user.email for user in User.objects.all()]
+
+
+@query_budget(100)
+def list_users_one_by_one() -> list[str]:
+    """List user emails with one query per user."""
+    return [
+        User.objects.get(pk=pk).email
+        for pk in User.objects.values_list("pk", flat=True)
+    ]
+
+
+@query_budget(0)
+def list_users_over_budget() -> list[str]:
+    """List user emails, exceeding the budget."""
+    return list_users()
+
+
+def create_users(faker: Faker, n: int) -> None:
+    """Create n users."""
+    for _ in range(n):
+        user_create(email=faker.unique.email())
+
+
+def test_budget_for() -> None:
+    """Test looking up declared budgets."""
+    budget = budget_for(list_users)
+    assert budget.name == f"{__name__}.list_users"
+    assert budget.max_queries == 1
+    with pytest.raises(LookupError):
+        budget_for(create_users)
+    with pytest.raises(ValueError):
+        query_budget(-1)
+
+
+@pytest.mark.django_db
+def test_constant(query_scaling: QueryScaling, faker: Faker) -> None:
+    """Test that constant query counts pass."""
+    result = query_scaling(
+        list_users,
+        populate=lambda n: create_users(faker, n),
+        run=list_users,
+    )
+    assert result.small_queries == result.large_queries == 1
+
+
+@pytest.mark.django_db
+def test_growing(faker: Faker) -> None:
+    """Test that query counts growing with N fail."""
+    with pytest.raises(pytest.fail.Exception, match="grows with N"):
+        check_scaling(
+            list_users_one_by_one,
+            populate=lambda n: create_users(faker, n),
+            run=list_users_one_by_one,
+            sizes=(1, 3),
+        )
+
+
+@pytest.mark.django_db
+def test_over_budget(faker: Faker) -> None:
+    """Test that exceeding the budget fails."""
+    with pytest.raises(pytest.fail.Exception, match="budget is 0"):
+        check_scaling(
+            list_users_over_budget,
+            populate=lambda n: create_users(faker, n),
+            run=list_users_over_budget,
+        )
@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test settings related functions."""
+
+from typing import Any, cast
+
+from django.core.handlers.asgi import ASGIHandler
+from django.test import RequestFactory
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+
+from projectify.lib.settings import populate_production_middleware
+from projectify.middleware import static_files
+from projectify.settings.base import Base
+
+
+@pytest.mark.parametrize("disable_csrf", [False, True])
+def test_production_middleware_async(
+    settings: Any,
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    disable_csrf: bool,
+) -> None:
+    """Test that no middleware in production makes async views sync."""
+    if disable_csrf:
+        monkeypatch.setenv("DISABLE_CSRF_PROTECTION", "")
+    settings.MIDDLEWARE = list(populate_production_middleware(Base.MIDDLEWARE))
+    assert "projectify.middleware.static_files" in settings.MIDDLEWARE
+    settings.INSTRUMENTATION = True
+    # Django only logs adapted handlers in debug mode
+    settings.DEBUG = True
+    # Typed as a sync handler only
+    handler = cast(Any, ASGIHandler())
+    with caplog.at_level("DEBUG", logger="django.request"):
+        handler.load_middleware(is_async=True)
+    assert "adapted" not in caplog.text
+    assert iscoroutinefunction(handler._middleware_chain)
+
+
+def test_static_files_async(settings: Any, rf: RequestFactory) -> None:
+    """Test that static files are served before reaching the view."""
+    settings.DEBUG = True
+
+    async def view(request: Any) -> Any:
+        raise AssertionError("Static files never reach the view")
+
+    middleware = static_files(cast(Any, view))
+    assert iscoroutinefunction(middleware)
+    request = rf.get(f"{settings.STATIC_URL}polylogo.svg")
+    response = async_to_sync(middleware)(request)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/svg+xml"
+    response.close()
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test streaming helpers."""
+
+import csv
+import io
+from collections.abc import Iterator
+
+from asgiref.sync import async_to_sync
+
+from projectify.lib import json
+from projectify.lib.streaming import (
+    CHUNK_SIZE,
+    aiter_sync,
+    encode_csv,
+    encode_jsonl,
+)
+
+RECORDS = [{"n": i, "text": "x" * 100} for i in range(2000)]
+
+
+def test_encode_jsonl() -> None:
+    """Test that records are chunked without losing any."""
+    chunks = list(encode_jsonl(RECORDS))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= CHUNK_SIZE for chunk in chunks[:-1])
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == RECORDS
+    assert list(encode_jsonl([])) == []
+
+
+def test_encode_csv() -> None:
+    """Test that rows are chunked with a single header."""
+    chunks = list(encode_csv(RECORDS, ("n", "text")))
+    assert len(chunks) > 1
+    reader = csv.DictReader(io.StringIO(b"".join(chunks).decode()))
+    assert [
+        {"n": int(row["n"]), "text": row["text"]} for row in reader
+    ] == RECORDS
+    assert list(encode_csv([], ("n",))) == [b"n\r\n"]
+
+
+def test_aiter_sync() -> None:
+    """Test that a blocking iterator is consumed lazily."""
+    consumed: list[int] = []
+
+    def chunks() -> Iterator[bytes]:
+        for i in range(3):
+            consumed.append(i)
+            yield str(i).encode()
+
+    async def first() -> bytes:
+        async for chunk in aiter_sync(chunks()):
+            return chunk
+        raise AssertionError("No chunks")
+
+    async def collect() -> list[bytes]:
+        return [chunk async for chunk in aiter_sync(chunks())]
+
+    assert async_to_sync(first)() == b"0"
+    assert consumed == [0]
+    assert async_to_sync(collect)() == [b"0", b"1", b"2"]
@@ -1,11 +1,21 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 #
 # SPDX-FileCopyrightText: 2024 JWP Consulting GK
-"""View decorators."""
+"""View decorators and base views."""
 
-from typing import Any, Callable
+import functools
+from typing import Any, Callable, Optional
+from uuid import UUID
 
 from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.views.decorators.vary import vary_on_headers
+
+from asgiref.sync import sync_to_async
+from rest_framework import views
+
+from projectify.lib.types import AuthenticatedHttpRequest
 
 
 def platform_view(func: Callable[..., Any]) -> Callable[..., Any]:
@@ -17,3 +27,98 @@ def platform_view(func: Callable[..., Any]) -> Callable[..., Any]:
     logged in.
     """
     return login_required(func)
+
+
+def dashboard_base_template(request: AuthenticatedHttpRequest) -> str:
+    """
+    Return the template that a dashboard page extends.
+
+    HTMX swaps page content into the dashboard it already shows, so it only
+    needs the content. Boosted links and history restores swap the whole
+    body and need the full page.
+    """
+    htmx = request.htmx
+    if htmx and not htmx.boosted and not htmx.history_restore_request:
+        return "dashboard_partial.html"
+    return "dashboard_base.html"
+
+
+# Dashboard pages render in full or in part depending on these headers, see
+# dashboard_base_template and htmx_target_uuid. Decorate them with this, so
+# that caches keep full pages and partials apart.
+vary_on_htmx = vary_on_headers(
+    "HX-Request", "HX-Boosted", "HX-History-Restore-Request", "HX-Target"
+)
+
+
+def htmx_target_uuid(
+    request: AuthenticatedHttpRequest, prefix: str = ""
+) -> Optional[UUID]:
+    """Return the UUID in the id of the element HTMX swaps, if any."""
+    target = request.htmx.target if request.htmx else None
+    if target is None or not target.startswith(prefix):
+        return None
+    try:
+        return UUID(target.removeprefix(prefix))
+    except ValueError:
+        return None
+
+
+class AsyncReadAPIView(views.APIView):
+    """
+    API view with a coroutine GET handler.
+
+    DRF only dispatches synchronous handlers, so a sync APIView holds a
+    thread for the whole request. This view dispatches GET and HEAD on the
+    event loop instead, and the handler awaits the database only for as long
+    as a query runs. All other methods are dispatched by DRF in a thread, as
+    before.
+
+    Authentication, permissions and exception handling are DRF's own and
+    don't touch the database once the session user is loaded.
+    """
+
+    # Handlers are mixed on purpose, as_view picks the dispatch
+    view_is_async = False
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Callable[..., Any]:
+        """Return a coroutine view that dispatches reads asynchronously."""
+        view = super().as_view(**initkwargs)
+        sync_view = sync_to_async(view)
+
+        async def async_view(
+            request: HttpRequest, *args: Any, **kwargs: Any
+        ) -> HttpResponseBase:
+            if request.method not in ("GET", "HEAD"):
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Keeps cls, initkwargs and csrf_exempt for URL and schema inspection
+        functools.update_wrapper(async_view, view)
+        return async_view
+
+    async def adispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        """Mirror APIView.dispatch for coroutine handlers."""
+        # DRF's session authentication reads request.user synchronously
+        # django-stubs don't know auser yet
+        request.user = await request.auser()  # type: ignore[attr-defined]
+        self.args = args
+        self.kwargs = kwargs
+        drf_request = self.initialize_request(request, *args, **kwargs)
+        self.request = drf_request
+        self.headers = self.default_response_headers
+        try:
+            self.initial(drf_request, *args, **kwargs)
+            handler = getattr(self, (drf_request.method or "").lower())
+            response = await handler(drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            drf_request, response, *args, **kwargs
+        )
+        return self.response
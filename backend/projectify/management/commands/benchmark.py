@@ -0,0 +1,582 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Benchmark command.
+
+Seed a dataset of a given scale with seeddb and time hot code paths against
+it. Results are written as JSON, so that they can be compared across commits.
+
+Always benchmark against a dedicated, freshly migrated database, since seeddb
+only tops up existing data:
+
+dropdb projectify_bench && \
+    createdb projectify_bench && \
+    DATABASE_URL=postgres:///projectify_bench poetry run ./manage.py migrate && \
+    DATABASE_URL=postgres:///projectify_bench poetry run ./manage.py \
+        benchmark --scale 10k --output bench.json
+
+Compare against a result from another commit with --compare other.json. The
+command exits with a non-zero status if a median got slower by more than
+--threshold percent.
+"""
+
+import asyncio
+import json
+import platform
+import subprocess
+import threading
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from rest_framework import renderers
+
+from projectify.lib import metrics
+from projectify.lib.benchmark import CaseResult, compare, run_case, summarize
+from projectify.lib.json import dumps
+from projectify.lib.settings import get_settings
+from projectify.user.models import User
+from projectify.workspace.consumers import ChangeConsumer, get_group_name
+from projectify.workspace.models import Project, Section, Task, Workspace
+from projectify.workspace.models.const import TeamMemberRoles
+from projectify.workspace.selectors.project import (
+    ProjectDetailQuerySet,
+    project_find_by_project_uuid,
+)
+from projectify.workspace.selectors.quota import workspace_get_all_quotas
+from projectify.workspace.selectors.task import (
+    TaskDetailQuerySet,
+    task_find_by_task_uuid,
+)
+from projectify.workspace.serializers.project import ProjectDetailSerializer
+from projectify.workspace.serializers.task_detail import TaskDetailSerializer
+from projectify.workspace.services.section import section_move
+from projectify.workspace.services.task import (
+    task_create_nested,
+    task_move_after,
+)
+
+# Arguments passed to seeddb for each scale. Task counts are approximate,
+# seeddb creates between n_tasks / 2 and n_tasks tasks in 2 to 15 sections
+# per project.
+SCALES: dict[str, dict[str, int]] = {
+    "small": {
+        "n_users": 10,
+        "n_workspaces": 1,
+        "n_projects": 2,
+        "n_add_users": 5,
+        "n_labels": 5,
+        "n_tasks": 10,
+    },
+    "10k": {
+        "n_users": 40,
+        "n_workspaces": 2,
+        "n_projects": 20,
+        "n_add_users": 15,
+        "n_labels": 20,
+        "n_tasks": 40,
+    },
+    "200k": {
+        "n_users": 100,
+        "n_workspaces": 4,
+        "n_projects": 50,
+        "n_add_users": 30,
+        "n_labels": 20,
+        "n_tasks": 157,
+    },
+}
+
+
+@contextmanager
+def rolled_back() -> Iterator[None]:
+    """Run block in a transaction that is always rolled back."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def git_commit() -> Optional[str]:
+    """Return the commit we are benchmarking, if we can find it."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    iterations: int
+    warmup: int
+    subscribers: int
+    log_ins: int
+
+    who: User
+    workspace: Workspace
+    project: Project
+    task: Task
+
+    def setup_fixtures(self) -> None:
+        """Pick the objects that the cases operate on."""
+        workspace = Workspace.objects.order_by("id").first()
+        if workspace is None:
+            raise CommandError("No workspace found. Did seeding fail?")
+        self.workspace = workspace
+        project = (
+            Project.objects.filter(workspace=workspace)
+            .annotate(n_tasks=Count("section__task"))
+            .order_by("-n_tasks", "id")
+            .first()
+        )
+        if project is None:
+            raise CommandError(f"No project found in {workspace}")
+        self.project = project
+        task = (
+            Task.objects.filter(section__project=project)
+            .annotate(n_sub_tasks=Count("subtask"))
+            .order_by("-n_sub_tasks", "id")
+            .first()
+        )
+        if task is None:
+            raise CommandError(f"No task found in {project}")
+        self.task = task
+        team_member = (
+            workspace.teammember_set.filter(role=TeamMemberRoles.OWNER)
+            .order_by("id")
+            .first()
+        )
+        if team_member is None:
+            raise CommandError(f"No owner found in {workspace}")
+        self.who = team_member.user
+
+    def bench(
+        self, fn: Callable[[], object], *, rollback: bool = False
+    ) -> CaseResult:
+        """Run a case with the configured iterations."""
+        return run_case(
+            fn,
+            iterations=self.iterations,
+            warmup=self.warmup,
+            around=rolled_back if rollback else None,
+        )
+
+    def case_project_detail_view(self) -> CaseResult:
+        """Render the project board page."""
+        client = Client()
+        client.force_login(self.who)
+        url = reverse(
+            "dashboard:projects:detail",
+            args=(str(self.project.uuid),),
+        )
+
+        def fn() -> None:
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        return self.bench(fn)
+
+    def case_project_detail_api(self) -> CaseResult:
+        """Fetch the project detail through the REST API."""
+        client = Client()
+        client.force_login(self.who)
+        url = reverse(
+            "workspace:projects:read-update-delete",
+            args=(str(self.project.uuid),),
+        )
+
+        def fn() -> None:
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        return self.bench(fn)
+
+    def project_detail(self) -> Project:
+        """Return the prefetched project."""
+        project = project_find_by_project_uuid(
+            who=self.who,
+            project_uuid=self.project.uuid,
+            qs=ProjectDetailQuerySet,
+        )
+        assert project
+        project.workspace.quota = workspace_get_all_quotas(project.workspace)
+        return project
+
+    def case_project_detail_serializer(self) -> CaseResult:
+        """Serialize a prefetched project."""
+        project = self.project_detail()
+        return self.bench(lambda: ProjectDetailSerializer(project).data)
+
+    def project_detail_data(self) -> object:
+        """Return the serialized project detail."""
+        return ProjectDetailSerializer(self.project_detail()).data
+
+    def case_project_detail_render_drf(self) -> CaseResult:
+        """Render the serialized project detail with DRF's JSONRenderer."""
+        data = self.project_detail_data()
+        renderer = renderers.JSONRenderer()
+        return self.bench(lambda: renderer.render(data))
+
+    def case_project_detail_render_fast(self) -> CaseResult:
+        """Render the serialized project detail with our JSON encoder."""
+        data = self.project_detail_data()
+        return self.bench(lambda: dumps(data))
+
+    def case_task_detail_serializer(self) -> CaseResult:
+        """Serialize a prefetched task."""
+        task = task_find_by_task_uuid(
+            who=self.who, task_uuid=self.task.uuid, qs=TaskDetailQuerySet
+        )
+        assert task
+        return self.bench(lambda: TaskDetailSerializer(task).data)
+
+    def case_task_find_by_task_uuid(self) -> CaseResult:
+        """Look up a task, checking that the user can access it."""
+        return self.bench(
+            lambda: task_find_by_task_uuid(
+                who=self.who, task_uuid=self.task.uuid
+            )
+        )
+
+    def case_task_move_after(self) -> CaseResult:
+        """Move a task into the last section of its project."""
+        section = self.project.section_set.order_by("-_order").first()
+        assert section
+
+        # Moving changes the task instance, so we fetch it every time
+        def fn() -> None:
+            task_move_after(
+                who=self.who,
+                task=Task.objects.get(pk=self.task.pk),
+                after=section,
+            )
+
+        return self.bench(fn, rollback=True)
+
+    def case_section_move(self) -> CaseResult:
+        """Move the first section of a project to the end."""
+        sections = list(self.project.section_set.order_by("_order"))
+
+        def fn() -> None:
+            section_move(
+                who=self.who,
+                section=Section.objects.get(pk=sections[0].pk),
+                order=len(sections) - 1,
+            )
+
+        return self.bench(fn, rollback=True)
+
+    def case_workspace_get_all_quotas(self) -> CaseResult:
+        """Calculate all quotas for a workspace."""
+        return self.bench(lambda: workspace_get_all_quotas(self.workspace))
+
+    def case_task_create_nested(self) -> CaseResult:
+        """Create a task with sub tasks and labels."""
+        section = self.project.section_set.order_by("_order").first()
+        assert section
+        labels = list(self.workspace.label_set.order_by("id")[:2])
+
+        def fn() -> None:
+            task_create_nested(
+                who=self.who,
+                section=section,
+                title="Benchmark task",
+                description="Created by the benchmark command",
+                sub_tasks={
+                    "create_sub_tasks": [
+                        {
+                            "title": f"Sub task {i}",
+                            "description": "",
+                            "done": False,
+                            "_order": i,
+                        }
+                        for i in range(3)
+                    ],
+                    "update_sub_tasks": [],
+                },
+                labels=labels,
+            )
+
+        return self.bench(fn, rollback=True)
+
+    def case_log_in_burst(self) -> CaseResult:
+        """
+        Log in N users at once through the API.
+
+        Seeded users log in with "password". Divide --log-ins by the median
+        to get log ins per second.
+        """
+        url = reverse("user:auth:log-in")
+        data = {"email": self.who.email, "password": "password"}
+        statuses: list[int] = []
+
+        def log_in() -> None:
+            try:
+                response = Client().post(
+                    url, data, content_type="application/json"
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        def fn() -> None:
+            threads = [
+                threading.Thread(target=log_in) for _ in range(self.log_ins)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # Refused log ins are expected once hashing is saturated
+            assert set(statuses) <= {200, 429}, statuses
+
+        # Every log in comes from the same address
+        with override_settings(RATELIMIT_ENABLE=False):
+            result = self.bench(fn)
+        refused = statuses.count(429)
+        if refused:
+            self.stderr.write(f"{refused} of {len(statuses)} log ins got 429")
+        return result
+
+    def case_change_consumer_fan_out(self) -> CaseResult:
+        """Deliver one project change to N subscribed consumers."""
+        # Consumers query the database from their own threads. We count
+        # their queries with the consumer instrumentation instead.
+        key: tuple[metrics.Kind, str] = ("ws", "change project")
+        with override_settings(INSTRUMENTATION=True):
+            before = metrics.snapshot().get(key, metrics.RouteStats())
+            result = async_to_sync(self.fan_out)()
+            after = metrics.snapshot()[key]
+        events = after.count - before.count
+        result["queries"] = (after.queries - before.queries) // (
+            events // self.subscribers
+        )
+        return result
+
+    async def fan_out(self) -> CaseResult:
+        """Time the delivery of change events to all subscribers."""
+        communicators = [
+            WebsocketCommunicator(
+                ChangeConsumer.as_asgi(), "ws/workspace/change"
+            )
+            for _ in range(self.subscribers)
+        ]
+        uuid = str(self.project.uuid)
+        for communicator in communicators:
+            communicator.scope["user"] = self.who
+            connected, _ = await communicator.connect()
+            assert connected
+            await communicator.send_json_to(
+                {"action": "subscribe", "resource": "project", "uuid": uuid}
+            )
+            response = await communicator.receive_json_from()
+            assert isinstance(response, dict), response
+            assert response["kind"] == "subscribed", response
+        channel_layer = get_channel_layer()
+        assert channel_layer
+        event: dict[str, object] = {
+            "type": "change",
+            "resource": "project",
+            "uuid": uuid,
+            "kind": "changed",
+        }
+        group = get_group_name("project", self.project.uuid)
+
+        async def deliver() -> None:
+            await channel_layer.group_send(group, event)
+            # Large projects take longer to serialize than the default
+            # timeout of receive_json_from permits
+            await asyncio.gather(
+                *(
+                    communicator.receive_output(60)
+                    for communicator in communicators
+                )
+            )
+
+        for _ in range(self.warmup):
+            await deliver()
+        samples: list[float] = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            await deliver()
+            samples.append(time.perf_counter() - start)
+        for communicator in communicators:
+            await communicator.disconnect()
+        return summarize(samples, 0)
+
+    def cases(self) -> dict[str, Callable[[], CaseResult]]:
+        """Return all cases by name."""
+        prefix = "case_"
+        return {
+            name.removeprefix(prefix): getattr(self, name)
+            for name in dir(self)
+            if name.startswith(prefix)
+        }
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--scale",
+            choices=SCALES.keys(),
+            default="small",
+            help="Size of the dataset to seed",
+        )
+        parser.add_argument(
+            "--skip-seed",
+            action="store_true",
+            help="Benchmark against existing data without seeding",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed passed to seeddb",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Timed runs per case",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=2,
+            help="Untimed runs per case before timing",
+        )
+        parser.add_argument(
+            "--subscribers",
+            type=int,
+            default=10,
+            help="Consumers subscribed in change_consumer_fan_out",
+        )
+        parser.add_argument(
+            "--log-ins",
+            type=int,
+            default=8,
+            help="Concurrent log ins in log_in_burst",
+        )
+        parser.add_argument(
+            "--case",
+            action="append",
+            default=None,
+            help="Only run this case. Can be given more than once",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Write JSON results to this file instead of stdout",
+        )
+        parser.add_argument(
+            "--compare",
+            default=None,
+            help="Compare medians with JSON results of an earlier run",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20.0,
+            help="Allowed median slowdown in percent when comparing",
+        )
+
+    def handle(self, *args: object, **options: Any) -> None:
+        """Handle."""
+        self.iterations = options["iterations"]
+        self.warmup = options["warmup"]
+        self.subscribers = options["subscribers"]
+        self.log_ins = options["log_ins"]
+        scale = options["scale"]
+        if not options["skip_seed"]:
+            call_command(
+                "seeddb",
+                seed=options["seed"],
+                copy=True,
+                stdout=self.stderr,
+                **SCALES[scale],
+            )
+        self.setup_fixtures()
+
+        cases = self.cases()
+        selected = options["case"] or sorted(cases)
+        unknown = set(selected) - cases.keys()
+        if unknown:
+            raise CommandError(
+                f"Unknown cases {', '.join(sorted(unknown))}. "
+                f"Choose from {', '.join(sorted(cases))}"
+            )
+        results: dict[str, CaseResult] = {}
+        # Like the Django test runner, permit the test client's host name
+        allowed_hosts = [*get_settings().ALLOWED_HOSTS, "testserver"]
+        for name in selected:
+            self.stderr.write(f"Running {name}")
+            with override_settings(ALLOWED_HOSTS=allowed_hosts):
+                results[name] = cases[name]()
+            self.stderr.write(
+                f"{name}: median {results[name]['median_ms']:.2f} ms, "
+                f"{results[name]['queries']} queries"
+            )
+
+        output = {
+            "meta": {
+                "scale": scale,
+                "seed": options["seed"],
+                "git_commit": git_commit(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "timestamp": time.time(),
+                "dataset": {
+                    "workspaces": Workspace.objects.count(),
+                    "projects": Project.objects.count(),
+                    "tasks": Task.objects.count(),
+                    "project_tasks": Task.objects.filter(
+                        section__project=self.project
+                    ).count(),
+                },
+            },
+            "results": results,
+        }
+        dumped = json.dumps(output, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fd:
+                fd.write(dumped)
+        else:
+            self.stdout.write(dumped)
+
+        if options["compare"] is None:
+            return
+        with open(options["compare"]) as fd:
+            baseline = json.load(fd)["results"]
+        regressions = compare(
+            baseline, results, threshold_pct=options["threshold"]
+        )
+        for regression in regressions:
+            self.stderr.write(
+                f"{regression['case']}: {regression['baseline_ms']:.2f} ms "
+                f"-> {regression['current_ms']:.2f} ms "
+                f"(+{regression['change_pct']:.1f}%)"
+            )
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} cases regressed by more than "
+                f"{options['threshold']}%"
+            )
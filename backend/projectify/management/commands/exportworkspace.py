@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Export workspace command.
+
+Write the same export as the workspace export view, without a request and
+without permission checks, for example to hand a workspace over to its
+owner:
+
+poetry run ./manage.py exportworkspace \
+    00000000-0000-0000-0000-000000000000 --output workspace.jsonl
+"""
+
+import sys
+from argparse import ArgumentParser
+from typing import Any
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projectify.workspace.models import Workspace
+from projectify.workspace.selectors.export import workspace_export
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument("workspace_uuid", type=UUID)
+        parser.add_argument(
+            "--file-format",
+            choices=("jsonl", "csv"),
+            default="jsonl",
+            help="Export all records as JSON lines, or tasks as CSV",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write the export to, - for standard output",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        try:
+            workspace = Workspace.objects.get(uuid=options["workspace_uuid"])
+        except Workspace.DoesNotExist:
+            raise CommandError(
+                f"No workspace with uuid {options['workspace_uuid']}"
+            ) from None
+        chunks = workspace_export(
+            workspace=workspace, file_format=options["file_format"]
+        )
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(options["output"], "wb") as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,326 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Load test command.
+
+Generate HTTP and websocket traffic against a running server. Every client
+is a seeded user. It opens a websocket to ws/workspace/change, subscribes
+to a project and some of its tasks, and then replays a mix of task reads,
+creates, moves and updates through the API until the duration is over.
+
+Start a server against a seeded database, for example
+
+DATABASE_URL=postgres:///projectify_bench poetry run uvicorn \
+    projectify.asgi:application
+
+and, in another shell with the same database settings, run
+
+DATABASE_URL=postgres:///projectify_bench poetry run ./manage.py loadtest \
+    --url http://localhost:8000 --clients 50 --duration 60 \
+    --mix read=4,create=1,move=1,update=2 --output load.json
+
+The command picks users, projects and tasks from the database and logs
+users in by creating their sessions there. Writes change the seeded data,
+so use a dedicated database, like for the benchmark command. With the in
+memory channel layer, change events only reach clients of the same server
+process. Use a local Redis to test several processes.
+
+Reported are HTTP latency percentiles per operation, the delivery latency
+from a write until a subscribed client receives its change event, and
+throughput in requests and events per second.
+"""
+
+import asyncio
+import time
+import urllib.error
+import urllib.request
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from random import Random
+from typing import Any, Optional
+from urllib.parse import urlsplit
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.urls import reverse
+
+from websockets.client import WebSocketClientProtocol, connect
+
+from projectify.lib import json
+from projectify.lib.loadtest import (
+    Operation,
+    Recorder,
+    csrf_secret_create,
+    parse_mix,
+    session_create,
+)
+from projectify.workspace.models import Project, Task, TeamMember
+
+
+@dataclass
+class LoadClient:
+    """A logged in user working on one project."""
+
+    email: str
+    session_key: str
+    csrf_secret: str
+    project_uuid: UUID
+    section_uuids: list[UUID]
+    task_uuids: list[UUID]
+
+    def headers(self) -> dict[str, str]:
+        """Return headers that authenticate this client."""
+        return {
+            "Cookie": f"sessionid={self.session_key}; "
+            f"csrftoken={self.csrf_secret}",
+            "X-CSRFToken": self.csrf_secret,
+        }
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    url: str
+    origin: str
+    mix: dict[Operation, int]
+    think_time: float
+    recorder: Recorder
+    random: Random
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--url",
+            default="http://localhost:8000",
+            help="Base URL of the server under test",
+        )
+        parser.add_argument(
+            "--origin",
+            help="Origin header for websockets, defaults to --url. Must be "
+            "in the server's CSRF_TRUSTED_ORIGINS",
+        )
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=10,
+            help="Number of concurrent clients",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30,
+            help="Seconds to generate load for",
+        )
+        parser.add_argument(
+            "--mix",
+            type=parse_mix,
+            default=parse_mix("read=4,create=1,move=1,update=2"),
+            help="Weights of operations, e.g. read=4,create=1,move=1,update=2",
+        )
+        parser.add_argument(
+            "--subscribe-tasks",
+            type=int,
+            default=5,
+            help="Tasks each client subscribes to and operates on",
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0.1,
+            help="Mean seconds a client waits between operations",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output",
+            help="Write the JSON report to this file instead of stdout",
+        )
+
+    def load_clients(self, n: int, n_tasks: int) -> list[LoadClient]:
+        """Pick a user, project and tasks for each client and log in."""
+        projects = list(
+            Project.objects.filter(archived__isnull=True, deleted__isnull=True)
+            .annotate(n_tasks=Count("section__task"))
+            .filter(n_tasks__gt=0)
+            .select_related("workspace")
+            .order_by("id")
+        )
+        if not projects:
+            raise CommandError("No project with tasks found. Run seeddb.")
+        clients: list[LoadClient] = []
+        for i in range(n):
+            project = projects[i % len(projects)]
+            team_members = list(
+                TeamMember.objects.filter(workspace=project.workspace)
+                .select_related("user")
+                .order_by("id")
+            )
+            user = team_members[i // len(projects) % len(team_members)].user
+            tasks = Task.objects.filter(section__project=project).order_by(
+                "?"
+            )[:n_tasks]
+            clients.append(
+                LoadClient(
+                    email=user.email,
+                    session_key=session_create(user),
+                    csrf_secret=csrf_secret_create(),
+                    project_uuid=project.uuid,
+                    section_uuids=list(
+                        project.section_set.values_list("uuid", flat=True)
+                    ),
+                    task_uuids=[task.uuid for task in tasks],
+                )
+            )
+        return clients
+
+    def request(
+        self,
+        client: LoadClient,
+        method: str,
+        path: str,
+        payload: Optional[object] = None,
+    ) -> tuple[int, Any]:
+        """Send a request and return its status and decoded body."""
+        headers = client.headers()
+        data = None
+        if payload is not None:
+            data = json.dumps(payload)
+            headers["Content-Type"] = "application/json"
+        request = urllib.request.Request(
+            self.url + path, data=data, headers=headers, method=method
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+    async def operate(self, client: LoadClient, operation: Operation) -> None:
+        """Perform one operation through the API."""
+        task_uuid = self.random.choice(client.task_uuids)
+        section_uuid = self.random.choice(client.section_uuids)
+        method: str
+        payload: Optional[object] = None
+        match operation:
+            case "read":
+                method = "GET"
+                path = reverse(
+                    "workspace:tasks:read-update-delete", args=(task_uuid,)
+                )
+            case "create":
+                method = "POST"
+                path = reverse("workspace:tasks:create")
+                payload = {
+                    "title": "Load test task",
+                    "description": None,
+                    "labels": [],
+                    "assignee": None,
+                    "section": {"uuid": str(section_uuid)},
+                    "due_date": None,
+                }
+            case "move":
+                method = "POST"
+                path = reverse(
+                    "workspace:tasks:move-to-section", args=(task_uuid,)
+                )
+                payload = {"section_uuid": str(section_uuid)}
+            case "update":
+                method = "PUT"
+                path = reverse(
+                    "workspace:tasks:read-update-delete", args=(task_uuid,)
+                )
+                payload = {
+                    "title": f"Load test {self.random.randrange(10**6)}",
+                    "description": None,
+                    "labels": [],
+                    "assignee": None,
+                    "due_date": None,
+                }
+        started = time.perf_counter()
+        if operation != "read":
+            self.recorder.write_sent("project", str(client.project_uuid))
+            if operation != "create":
+                self.recorder.write_sent("task", str(task_uuid))
+        status, _ = await asyncio.to_thread(
+            self.request, client, method, path, payload
+        )
+        self.recorder.request_done(operation, started, status < 400)
+
+    async def receive(self, websocket: WebSocketClientProtocol) -> None:
+        """Record change events until the connection closes."""
+        async for message in websocket:
+            response = json.loads(message)
+            if response["kind"] == "changed":
+                self.recorder.event_received(
+                    response["resource"], response["uuid"]
+                )
+
+    async def run_client(self, client: LoadClient, until: float) -> None:
+        """Subscribe, then operate until the time is until."""
+        split = urlsplit(self.url)
+        scheme = "wss" if split.scheme == "https" else "ws"
+        async with connect(
+            f"{scheme}://{split.netloc}/ws/workspace/change",
+            extra_headers={**client.headers(), "Origin": self.origin},
+        ) as websocket:
+            subscriptions = [("project", client.project_uuid)] + [
+                ("task", uuid) for uuid in client.task_uuids
+            ]
+            for resource, uuid in subscriptions:
+                await websocket.send(
+                    json.dumps(
+                        {
+                            "action": "subscribe",
+                            "resource": resource,
+                            "uuid": str(uuid),
+                        }
+                    ).decode()
+                )
+            receiver = asyncio.create_task(self.receive(websocket))
+            operations = list(self.mix)
+            weights = list(self.mix.values())
+            while time.perf_counter() < until:
+                (operation,) = self.random.choices(operations, weights)
+                await self.operate(client, operation)
+                if self.think_time:
+                    await asyncio.sleep(
+                        self.random.expovariate(1 / self.think_time)
+                    )
+            receiver.cancel()
+
+    async def run(self, clients: list[LoadClient], duration: float) -> None:
+        """Run all clients concurrently."""
+        self.recorder = Recorder()
+        until = time.perf_counter() + duration
+        await asyncio.gather(
+            *(self.run_client(client, until) for client in clients)
+        )
+
+    def handle(self, *args: object, **options: Any) -> None:
+        """Handle."""
+        self.url = options["url"].rstrip("/")
+        self.origin = options["origin"] or self.url
+        self.mix = options["mix"]
+        self.think_time = options["think_time"]
+        self.random = Random(options["seed"])
+        clients = self.load_clients(
+            options["clients"], options["subscribe_tasks"]
+        )
+        self.stderr.write(
+            f"Running {len(clients)} clients against {self.url} "
+            f"for {options['duration']} s"
+        )
+        asyncio.run(self.run(clients, options["duration"]))
+        report = self.recorder.report()
+        self.stderr.write(
+            f"{report['throughput']['requests_per_s']:.1f} requests/s, "
+            f"{report['throughput']['events_per_s']:.1f} events/s, "
+            f"delivery p50 {report['delivery']['p50_ms']} ms"
+        )
+        dumped = json.dumps(report).decode()
+        if options["output"]:
+            with open(options["output"], "w") as fd:
+                fd.write(dumped)
+        else:
+            self.stdout.write(dumped)
@@ -17,21 +17,55 @@ dropdb projectify && \
     createdb projectify && \
     poetry run ./manage.py migrate && \
     poetry run ./manage.py seeddb
+
+With --copy, tasks, task labels, sub tasks and chat messages are generated by
+--workers processes and streamed into the database using COPY. Use this to
+create large datasets, for example
+poetry run ./manage.py seeddb --copy --n-workspaces 10 --n-projects 100 \
+    --n-tasks 200
 """
 
+import multiprocessing
+import os
+import time
 from argparse import ArgumentParser
-from datetime import timezone
+from collections.abc import Iterator
+from datetime import datetime, timezone
 from itertools import count, groupby
-from random import choice, randint, sample
-from typing import Any, TypedDict
+from random import Random, choice, randint, sample, seed
+from typing import Any, Optional, TypedDict
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
 
+import pgtrigger
 from faker import Faker
 
 from projectify.corporate.models import Customer
 from projectify.corporate.types import CustomerSubscriptionStatus
+from projectify.management.seed import (
+    CHAT_MESSAGE_COLUMNS,
+    SUB_TASK_COLUMNS,
+    SUB_TASK_TITLE_MAX_LENGTH,
+    SUB_TASK_TITLE_MIN_LENGTH,
+    SUB_TASKS_MAX_COUNT,
+    SUB_TASKS_MIN_COUNT,
+    TASK_COLUMNS,
+    TASK_DESCRIPTION_SENTENCES,
+    TASK_LABEL_COLUMNS,
+    TASK_MAX_CHAT_MESSAGE_COUNT,
+    TASK_MAX_LABEL_COUNT,
+    TASK_MIN_CHAT_MESSAGE_COUNT,
+    TASK_MIN_LABEL_COUNT,
+    TASK_TITLE_MAX_LENGTH,
+    TASK_TITLE_MIN_LENGTH,
+    ChunkRows,
+    ChunkSpec,
+    SectionPlan,
+    generate_chunk,
+)
 from projectify.user.models import User
 from projectify.user.services.internal import (
     user_create,
@@ -73,19 +107,6 @@ PROJECT_TITLE_MAX_LENGTH = 100
 SECTION_TITLE_MIN_LENGTH = 20
 SECTION_TITLE_MAX_LENGTH = 200
 
-TASK_TITLE_MIN_LENGTH = 40
-TASK_TITLE_MAX_LENGTH = 250
-TASK_DESCRIPTION_SENTENCES = 10
-TASK_MIN_LABEL_COUNT = 0
-TASK_MAX_LABEL_COUNT = 10
-TASK_MIN_CHAT_MESSAGE_COUNT = 0
-TASK_MAX_CHAT_MESSAGE_COUNT = 10
-
-SUB_TASKS_MIN_COUNT = 0
-SUB_TASKS_MAX_COUNT = 10
-SUB_TASK_TITLE_MIN_LENGTH = 40
-SUB_TASK_TITLE_MAX_LENGTH = 250
-
 
 class Command(BaseCommand):
     """Command."""
@@ -97,6 +118,10 @@ class Command(BaseCommand):
     n_labels: int
     n_tasks: int
     n_add_users: int
+    copy: bool
+    workers: int
+    chunk_size: int
+    seed: int
 
     def create_users(self) -> list["User"]:
         """Create users."""
@@ -115,10 +140,16 @@ class Command(BaseCommand):
             guest.save()
             self.stdout.write("Created and manually activated normal user")
         remaining_users = self.n_users - User.objects.count()
+        # Hashing is slow, so all new users share the same password hash.
+        # They are active and can log in with "password", just like the guest
+        # user.
+        password = make_password("password")
         new_users = User.objects.bulk_create(
             [
                 User(
                     email=self.fake.email(),
+                    password=password,
+                    is_active=True,
                     preferred_name=self.fake.name() if randint(0, 1) else None,
                     is_staff=False,
                     is_superuser=False,
@@ -235,6 +266,175 @@ class Command(BaseCommand):
         self.stdout.write(f"Created {len(chat_messages)} chat messages")
         self.stdout.write(f"Populated {len(tasks)} tasks")
 
+    def plan_chunks(
+        self, altogether: list[Altogether], first_task_id: int
+    ) -> Iterator[ChunkSpec]:
+        """Split all sections into chunks of about chunk_size tasks."""
+        team_member_ids = {
+            together["workspace"].pk: tuple(
+                team_member.pk for team_member in together["team_members"]
+            )
+            for together in altogether
+        }
+        label_ids = {
+            together["workspace"].pk: tuple(
+                label.pk for label in together["labels"]
+            )
+            for together in altogether
+        }
+        now = datetime.now(timezone.utc).isoformat()
+        sections: list[SectionPlan] = []
+
+        def make_spec() -> ChunkSpec:
+            workspace_ids = set(section.workspace_id for section in sections)
+            return ChunkSpec(
+                # Every chunk gets its own reproducible seed
+                seed=self.seed * 1_000_003 + chunk_index,
+                first_task_id=first_task_id,
+                now=now,
+                sections=tuple(sections),
+                team_member_ids={
+                    k: v
+                    for k, v in team_member_ids.items()
+                    if k in workspace_ids
+                },
+                label_ids={
+                    k: v for k, v in label_ids.items() if k in workspace_ids
+                },
+            )
+
+        rng = Random(self.seed)
+        n_tasks = 0
+        chunk_index = 0
+        for together in altogether:
+            for section in together["sections"]:
+                section_n_tasks = rng.randint(self.n_tasks // 2, self.n_tasks)
+                first_number = next(together["number"])
+                together["number"] = count(first_number + section_n_tasks)
+                sections.append(
+                    SectionPlan(
+                        section_id=section.pk,
+                        workspace_id=together["workspace"].pk,
+                        n_tasks=section_n_tasks,
+                        first_number=first_number,
+                    )
+                )
+                n_tasks += section_n_tasks
+                if n_tasks >= self.chunk_size:
+                    yield make_spec()
+                    first_task_id += n_tasks
+                    chunk_index += 1
+                    sections = []
+                    n_tasks = 0
+        if sections:
+            yield make_spec()
+
+    def copy_rows(self, cursor: Any, rows: ChunkRows) -> None:
+        """COPY one chunk of generated rows into the database."""
+        quote = connection.ops.quote_name
+        for model, columns, data in (
+            (Task, TASK_COLUMNS, rows.tasks),
+            (TaskLabel, TASK_LABEL_COLUMNS, rows.task_labels),
+            (SubTask, SUB_TASK_COLUMNS, rows.sub_tasks),
+            (ChatMessage, CHAT_MESSAGE_COLUMNS, rows.chat_messages),
+        ):
+            if not data:
+                continue
+            table = quote(model._meta.db_table)
+            column_list = ", ".join(quote(column) for column in columns)
+            with cursor.copy(
+                f"COPY {table} ({column_list}) FROM STDIN"
+            ) as copy:
+                copy.write(data)
+
+    def copy_tasks(self, altogether: list[Altogether]) -> None:
+        """
+        Create tasks and everything belonging to them using COPY.
+
+        Rows are generated by worker processes, see
+        projectify.management.seed, and copied into the database in chunk
+        order, so that a seed always results in the same data.
+        """
+        # Task ids must be known in advance, since task labels, sub tasks
+        # and chat messages refer to them. We count them up front using the
+        # same random generator as plan_chunks.
+        rng = Random(self.seed)
+        total = sum(
+            rng.randint(self.n_tasks // 2, self.n_tasks)
+            for together in altogether
+            for _ in together["sections"]
+        )
+        if total == 0:
+            self.stdout.write("No tasks to create")
+            return
+
+        start = time.perf_counter()
+        counts = {
+            "tasks": 0,
+            "task labels": 0,
+            "sub tasks": 0,
+            "chat messages": 0,
+        }
+        # Inserted rows satisfy ensure_correct_workspace by construction,
+        # and the trigger would run one query per inserted task. We skip it
+        # and check all new tasks with a single query below instead.
+        # pgtrigger sets pgtrigger.ignore for the remainder of the
+        # transaction with the first statement we execute here, which makes
+        # the trigger skip rows inserted by COPY as well.
+        with (
+            pgtrigger.ignore("workspace.Task:ensure_correct_workspace"),
+            connection.cursor() as cursor,
+        ):
+            # Reserve a contiguous range of task ids
+            sequence = f"pg_get_serial_sequence('{Task._meta.db_table}', 'id')"
+            cursor.execute(
+                f"SELECT setval({sequence}, nextval({sequence}) + %s - 1)",
+                [total],
+            )
+            row = cursor.fetchone()
+            assert row
+            (last_task_id,) = row
+            first_task_id = last_task_id - total + 1
+            specs = self.plan_chunks(altogether, first_task_id)
+            chunks: Iterator[ChunkRows]
+            if self.workers > 1:
+                pool = multiprocessing.get_context("spawn").Pool(self.workers)
+                chunks = pool.imap(generate_chunk, specs)
+            else:
+                pool = None
+                chunks = map(generate_chunk, specs)
+            try:
+                for rows in chunks:
+                    self.copy_rows(cursor, rows)
+                    counts["tasks"] += rows.n_tasks
+                    counts["task labels"] += rows.n_task_labels
+                    counts["sub tasks"] += rows.n_sub_tasks
+                    counts["chat messages"] += rows.n_chat_messages
+                    self.stdout.write(
+                        f"Copied {counts['tasks']}/{total} tasks", ending="\r"
+                    )
+            finally:
+                if pool is not None:
+                    pool.terminate()
+        self.stdout.write("")
+
+        mismatched = (
+            Task.objects.filter(pk__range=(first_task_id, last_task_id))
+            .exclude(workspace=F("section__project__workspace"))
+            .exists()
+        )
+        if mismatched:
+            raise CommandError("Copied tasks with an incorrect workspace")
+
+        elapsed = time.perf_counter() - start
+        for name, n in counts.items():
+            self.stdout.write(f"Created {n} {name}")
+        n_rows = sum(counts.values())
+        self.stdout.write(
+            f"Copied {n_rows} rows in {elapsed:.1f} s "
+            f"({n_rows / elapsed:.0f} rows/s) using {self.workers} workers"
+        )
+
     def create_workspaces(
         self,
         users: list[User],
@@ -267,12 +467,13 @@ class Command(BaseCommand):
                 TeamMember(
                     workspace=workspace,
                     user=user,
+                    # Like in workspace_create, the first user becomes owner
                     role=TeamMemberRoles.OWNER
-                    if user.email == "admin@localhost"
+                    if user.email == "admin@localhost" or i == 0
                     else TeamMemberRoles.CONTRIBUTOR,
                 )
                 for workspace in workspaces
-                for user in sample(users, self.n_add_users)
+                for i, user in enumerate(sample(users, self.n_add_users))
             ]
         )
         self.stdout.write(
@@ -371,7 +572,10 @@ class Command(BaseCommand):
             )
         ]
 
-        self.create_tasks(altogether)
+        if self.copy:
+            self.copy_tasks(altogether)
+        else:
+            self.create_tasks(altogether)
 
         # Now we just have to adjust each workspace's highest task number
         for together in altogether:
@@ -435,11 +639,48 @@ class Command(BaseCommand):
             default=40,
             help="Ensure up to N tasks are in new section",
         )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed random generators to create reproducible data",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Create tasks with COPY, generated by worker processes",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of processes generating rows for --copy",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Tasks generated by a worker at a time for --copy",
+        )
 
     @transaction.atomic
     def handle(self, *args: object, **options: Any) -> None:
         """Handle."""
         self.fake = Faker()
+        self.copy = options["copy"]
+        self.workers = options["workers"]
+        self.chunk_size = options["chunk_size"]
+        given_seed: Optional[int] = options["seed"]
+        if given_seed is not None:
+            seed(given_seed)
+            self.fake.seed_instance(given_seed)
+            self.seed = given_seed
+        else:
+            # COPY workers always need a seed. Show it, so that a dataset
+            # can be recreated.
+            self.seed = randint(0, 2**31)
+            if self.copy:
+                self.stdout.write(f"Using seed {self.seed}")
         self.n_users = options["n_users"]
         self.n_workspaces = options["n_workspaces"]
         self.n_projects = options["n_projects"]
@@ -0,0 +1,275 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Generate task rows for seeddb in COPY text format.
+
+This module is imported by worker processes and must therefore not depend on
+Django being set up. All ids that rows refer to are planned in advance by the
+seeddb command and passed in with ChunkSpec. Generation only depends on
+ChunkSpec, so a given seed always produces the same rows.
+"""
+
+import random
+import uuid
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Union
+
+from faker.providers.lorem.en_US import Provider as LoremProvider
+
+TASK_TITLE_MIN_LENGTH = 40
+TASK_TITLE_MAX_LENGTH = 250
+TASK_DESCRIPTION_SENTENCES = 10
+TASK_MIN_LABEL_COUNT = 0
+TASK_MAX_LABEL_COUNT = 10
+TASK_MIN_CHAT_MESSAGE_COUNT = 0
+TASK_MAX_CHAT_MESSAGE_COUNT = 10
+
+SUB_TASKS_MIN_COUNT = 0
+SUB_TASKS_MAX_COUNT = 10
+SUB_TASK_TITLE_MIN_LENGTH = 40
+SUB_TASK_TITLE_MAX_LENGTH = 250
+
+TASK_COLUMNS = (
+    "id",
+    "created",
+    "modified",
+    "uuid",
+    "title",
+    "description",
+    "section_id",
+    "workspace_id",
+    "number",
+    "due_date",
+    "assignee_id",
+    "_order",
+)
+TASK_LABEL_COLUMNS = ("created", "modified", "task_id", "label_id")
+SUB_TASK_COLUMNS = (
+    "created",
+    "modified",
+    "uuid",
+    "title",
+    "description",
+    "task_id",
+    "done",
+    "_order",
+)
+CHAT_MESSAGE_COLUMNS = (
+    "created",
+    "modified",
+    "uuid",
+    "text",
+    "task_id",
+    "author_id",
+)
+
+
+@dataclass(frozen=True)
+class SectionPlan:
+    """How many tasks to create in a section, and their numbers."""
+
+    section_id: int
+    workspace_id: int
+    n_tasks: int
+    first_number: int
+
+
+@dataclass(frozen=True)
+class ChunkSpec:
+    """Everything a worker needs to generate one chunk of tasks."""
+
+    seed: int
+    # Task ids are reserved by the caller, one for each task in sections
+    first_task_id: int
+    # Used for created and modified, as a COPY compatible timestamp
+    now: str
+    sections: Sequence[SectionPlan]
+    team_member_ids: Mapping[int, Sequence[int]]
+    label_ids: Mapping[int, Sequence[int]]
+
+
+@dataclass(frozen=True)
+class ChunkRows:
+    """Generated rows for each table, in COPY text format."""
+
+    tasks: bytes
+    task_labels: bytes
+    sub_tasks: bytes
+    chat_messages: bytes
+    n_tasks: int
+    n_task_labels: int
+    n_sub_tasks: int
+    n_chat_messages: int
+
+
+CopyValue = Union[str, int, bool, None]
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_value(value: CopyValue) -> str:
+    """Format a single value for COPY text format."""
+    match value:
+        case None:
+            return "\\N"
+        case bool():
+            return "t" if value else "f"
+        case int():
+            return str(value)
+        case str():
+            return value.translate(_ESCAPES)
+
+
+def copy_line(values: Iterable[CopyValue]) -> str:
+    """Format a row for COPY text format."""
+    return "\t".join(copy_value(value) for value in values) + "\n"
+
+
+class Lorem:
+    """
+    Generate lorem ipsum text, like Faker, but a lot faster.
+
+    Faker's text generation dominates the time needed to seed tasks. We only
+    borrow its word list.
+    """
+
+    rng: random.Random
+    words: Sequence[str] = LoremProvider.word_list
+
+    def __init__(self, rng: random.Random):
+        """Generate text using rng."""
+        self.rng = rng
+
+    def sentence(self) -> str:
+        """Return a sentence of 4 to 12 words."""
+        words = self.rng.choices(self.words, k=self.rng.randint(4, 12))
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(self, sentences: int = 3) -> str:
+        """Return a paragraph of about the given amount of sentences."""
+        n = max(1, sentences + self.rng.randint(-1, 1))
+        return " ".join(self.sentence() for _ in range(n))
+
+    def text(self, max_chars: int) -> str:
+        """Return text that is shorter than max_chars."""
+        result = self.sentence()
+        while True:
+            sentence = self.sentence()
+            if len(result) + len(sentence) + 1 > max_chars:
+                return result[:max_chars]
+            result = f"{result} {sentence}"
+
+    def date_time(self) -> str:
+        """Return a UTC timestamp between 1970 and 2030."""
+        timestamp = self.rng.randint(0, 1_900_000_000)
+        return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def generate_chunk(spec: ChunkSpec) -> ChunkRows:
+    """Generate all rows for the tasks in a chunk."""
+    rng = random.Random(spec.seed)
+    fake = Lorem(rng)
+
+    def make_uuid() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    now = spec.now
+    tasks: list[str] = []
+    task_labels: list[str] = []
+    sub_tasks: list[str] = []
+    chat_messages: list[str] = []
+    task_id = spec.first_task_id
+    for section in spec.sections:
+        team_member_ids = spec.team_member_ids[section.workspace_id]
+        label_ids = spec.label_ids[section.workspace_id]
+        for order in range(section.n_tasks):
+            # 2 out of 3 tasks have an assignee
+            assignee_id = (
+                rng.choice(team_member_ids)
+                if team_member_ids and rng.randint(0, 2)
+                else None
+            )
+            due_date = fake.date_time()
+            tasks.append(
+                copy_line(
+                    (
+                        task_id,
+                        now,
+                        now,
+                        make_uuid(),
+                        fake.text(
+                            rng.randint(
+                                TASK_TITLE_MIN_LENGTH, TASK_TITLE_MAX_LENGTH
+                            )
+                        ),
+                        fake.paragraph(TASK_DESCRIPTION_SENTENCES),
+                        section.section_id,
+                        section.workspace_id,
+                        section.first_number + order,
+                        due_date,
+                        assignee_id,
+                        order,
+                    )
+                )
+            )
+            n_labels = min(
+                len(label_ids),
+                rng.randint(TASK_MIN_LABEL_COUNT, TASK_MAX_LABEL_COUNT),
+            )
+            for label_id in rng.sample(label_ids, n_labels):
+                task_labels.append(copy_line((now, now, task_id, label_id)))
+            for sub_task_order in range(
+                rng.randint(SUB_TASKS_MIN_COUNT, SUB_TASKS_MAX_COUNT)
+            ):
+                sub_tasks.append(
+                    copy_line(
+                        (
+                            now,
+                            now,
+                            make_uuid(),
+                            fake.text(
+                                rng.randint(
+                                    SUB_TASK_TITLE_MIN_LENGTH,
+                                    SUB_TASK_TITLE_MAX_LENGTH,
+                                )
+                            ),
+                            fake.paragraph(),
+                            task_id,
+                            rng.random() < 0.5,
+                            sub_task_order,
+                        )
+                    )
+                )
+            if team_member_ids:
+                for _ in range(
+                    rng.randint(
+                        TASK_MIN_CHAT_MESSAGE_COUNT,
+                        TASK_MAX_CHAT_MESSAGE_COUNT,
+                    )
+                ):
+                    chat_messages.append(
+                        copy_line(
+                            (
+                                now,
+                                now,
+                                make_uuid(),
+                                fake.paragraph(),
+                                task_id,
+                                rng.choice(team_member_ids),
+                            )
+                        )
+                    )
+            task_id += 1
+    return ChunkRows(
+        tasks="".join(tasks).encode(),
+        task_labels="".join(task_labels).encode(),
+        sub_tasks="".join(sub_tasks).encode(),
+        chat_messages="".join(chat_messages).encode(),
+        n_tasks=len(tasks),
+        n_task_labels=len(task_labels),
+        n_sub_tasks=len(sub_tasks),
+        n_chat_messages=len(chat_messages),
+    )
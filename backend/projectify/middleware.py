@@ -6,17 +6,28 @@
 import asyncio
 import logging
 import random
+import re
 from collections.abc import Awaitable
-from typing import Callable, Optional
+from typing import Any, Callable, Optional, cast
 
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
 from django.core.handlers.asgi import ASGIHandler
 from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.utils.decorators import async_only_middleware
-
+from django.utils.decorators import (
+    async_only_middleware,
+    sync_and_async_middleware,
+)
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
 from channels.security.websocket import OriginValidator
 from rest_framework import exceptions
+from whitenoise.middleware import WhiteNoiseMiddleware
 
+from projectify.lib import metrics
 from projectify.lib.exception_handler import exception_handler
 from projectify.lib.settings import get_settings
 
@@ -31,11 +42,18 @@ settings = get_settings()
 class DisableCSRFMiddleware:
     """Dangerous CSRF disable middleware."""
 
+    sync_capable = True
+    async_capable = True
+
     get_response: GetResponse
 
     def __init__(self, get_response: GetResponse):
         """Init."""
         self.get_response = get_response
+        # Async views would otherwise be run in a thread because of us. The
+        # response returned in __call__ is awaited then.
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
         """Call."""
@@ -45,6 +63,7 @@ class DisableCSRFMiddleware:
         return response
 
 
+@sync_and_async_middleware
 def reverse_proxy(get_response: GetResponse) -> GetResponse:
     """
     Enhance request headers with X-Forwarded-For, if found, for rate limiting.
@@ -72,7 +91,7 @@ def reverse_proxy(get_response: GetResponse) -> GetResponse:
     > From a practical standpoint, this IP will likely be reliable most of the time (because most people won't be bothering to spoof their IP). Unfortunately, it's impossible to prevent this sort of spoofing and by the time a request gets to the Heroku router, it's impossible for us to tell if IPs in an X-Forwarded-For chain have been tampered with or not.
     """
 
-    def process_request(request: HttpRequest) -> HttpResponse:
+    def forward(request: HttpRequest) -> None:
         forwarded_for: Optional[str] = request.headers.get("X-Forwarded-For")
         if forwarded_for is not None:
             ips = [ip.strip() for ip in forwarded_for.split(",")]
@@ -82,11 +101,114 @@ def reverse_proxy(get_response: GetResponse) -> GetResponse:
                     f"IPs was given: {forwarded_for}"
                 )
             request.META["REMOTE_ADDR"] = ips[0]
+
+    # Async views would otherwise be run in a thread because of us
+    if iscoroutinefunction(get_response):
+        async_get_response = cast(AsyncGetResponse, get_response)
+
+        async def aprocess_request(request: HttpRequest) -> HttpResponse:
+            forward(request)
+            return await async_get_response(request)
+
+        return cast(GetResponse, aprocess_request)
+
+    def process_request(request: HttpRequest) -> HttpResponse:
+        forward(request)
         return get_response(request)
 
     return process_request
 
 
+@sync_and_async_middleware
+def static_files(get_response: GetResponse) -> GetResponse:
+    """
+    Serve static files with WhiteNoise.
+
+    WhiteNoiseMiddleware is sync only, which would make Django run every
+    async view in a thread. Finding a static file is a dictionary lookup,
+    unless files are looked up again on every request in development, so
+    only serving the file found is run in a thread here.
+    """
+    whitenoise = WhiteNoiseMiddleware(get_response)
+
+    if iscoroutinefunction(get_response):
+        async_get_response = cast(AsyncGetResponse, get_response)
+        find_file = sync_to_async(whitenoise.find_file)
+        serve = sync_to_async(whitenoise.serve)
+
+        async def aprocess_request(request: HttpRequest) -> HttpResponse:
+            static_file: Any
+            if whitenoise.autorefresh:
+                static_file = await find_file(request.path_info)
+            else:
+                static_file = whitenoise.files.get(request.path_info)
+            if static_file is None:
+                return await async_get_response(request)
+            return cast(HttpResponse, await serve(static_file, request))
+
+        return cast(GetResponse, aprocess_request)
+
+    return cast(GetResponse, whitenoise)
+
+
+# Only accept correlation ids from clients and proxies that look harmless
+# enough to be put into logs and response headers
+CORRELATION_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+@sync_and_async_middleware
+def instrumentation(get_response: GetResponse) -> GetResponse:
+    """
+    Record query count, db, serializer and total time per route.
+
+    Each request gets a correlation id, either taken from the X-Request-ID
+    header or freshly generated. It is logged with slow requests and
+    returned in the X-Request-ID response header.
+    """
+    if not settings.INSTRUMENTATION:
+        raise MiddlewareNotUsed()
+    metrics.instrument_serializers()
+
+    def correlation_id_get(request: HttpRequest) -> Optional[str]:
+        correlation_id = request.headers.get("X-Request-ID")
+        if correlation_id and not CORRELATION_ID_RE.match(correlation_id):
+            return None
+        return correlation_id
+
+    def route_get(request: HttpRequest) -> Callable[[], str]:
+        def route() -> str:
+            match = request.resolver_match
+            if match is None:
+                return f"{request.method} <unmatched>"
+            return f"{request.method} /{match.route}"
+
+        return route
+
+    # Async views would otherwise be run in a thread because of us
+    if iscoroutinefunction(get_response):
+        async_get_response = cast(AsyncGetResponse, get_response)
+
+        async def aprocess_request(request: HttpRequest) -> HttpResponse:
+            async with metrics.ameasure(
+                "http", route_get(request), correlation_id_get(request)
+            ) as measurement:
+                response = await async_get_response(request)
+            response["X-Request-ID"] = measurement.correlation_id
+            return response
+
+        return cast(GetResponse, aprocess_request)
+
+    def process_request(request: HttpRequest) -> HttpResponse:
+        with metrics.measure(
+            "http", route_get(request), correlation_id_get(request)
+        ) as measurement:
+            response = get_response(request)
+        response["X-Request-ID"] = measurement.correlation_id
+        return response
+
+    return process_request
+
+
 def CsrfTrustedOriginsOriginValidator(application: ASGIHandler) -> ASGIHandler:
     """Return an OriginValidator configured to use CSRF_TRUSTED_ORIGINS."""
     settings = get_settings()
@@ -4,6 +4,7 @@
 """Premail email templates."""
 
 import re
+from collections.abc import Iterable
 from typing import Any, Generic, NewType, TypeVar, Union
 
 from django.conf import settings
@@ -12,7 +13,7 @@ from django.template import loader
 from projectify.context_processors import frontend_url
 from projectify.user.models.user import User
 
-from .tasks import send_mail
+from .tasks import send_mail, send_mails
 
 Context = dict[str, Any]
 
@@ -72,12 +73,15 @@ class TemplateEmail(Generic[T]):
 
     def send(self) -> None:
         """Send email to obj."""
-        subject = self.render_subject()
-        body = self.render_body()
+        subject, body, to = self.render()
         if settings.EMAIL_EAGER:
-            send_mail(subject, body, self.to)
+            send_mail(subject, body, to)
         else:
-            send_mail.delay(subject, body, self.to)
+            send_mail.delay(subject, body, to)
+
+    def render(self) -> tuple[str, str, str]:
+        """Render subject and body, and return them with the address."""
+        return self.render_subject(), self.render_body(), self.to
 
     @property
     def addressee(self) -> str:
@@ -96,3 +100,14 @@ class TemplateEmail(Generic[T]):
                 return email
             case email:
                 return email
+
+
+def send_many(emails: Iterable[TemplateEmail[Any]]) -> None:
+    """Render several emails and send them all in one task."""
+    messages = [email.render() for email in emails]
+    if not messages:
+        return
+    if settings.EMAIL_EAGER:
+        send_mails(messages)
+    else:
+        send_mails.delay(messages)
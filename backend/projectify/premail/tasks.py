@@ -19,3 +19,14 @@ def send_mail(subject: str, body: str, to_email: str) -> None:
         settings.DEFAULT_FROM_EMAIL,
         [to_email],
     )
+
+
+@app.task()
+def send_mails(messages: list[tuple[str, str, str]]) -> None:
+    """Send several emails over one connection, given subject, body and to."""
+    mail.send_mass_mail(
+        [
+            (subject, body, settings.DEFAULT_FROM_EMAIL, [to_email])
+            for subject, body, to_email in messages
+        ]
+    )
@@ -8,6 +8,7 @@ import pytest
 from projectify.user.models.user import User
 from pytest_types import Mailbox
 
+from ..email import send_many
 from ..emails import SampleEmail
 
 
@@ -20,3 +21,16 @@ class TestSampleEmail:
         mail = SampleEmail(receiver=user, obj=user)
         mail.send()
         assert len(mailoutbox) == 1
+
+    def test_send_many(
+        self, user: User, other_user: User, mailoutbox: Mailbox
+    ) -> None:
+        """Test sending several emails in one go."""
+        send_many(
+            SampleEmail(receiver=receiver, obj=receiver)
+            for receiver in (user, other_user)
+        )
+        assert [mail.to for mail in mailoutbox] == [
+            [user.email],
+            [other_user.email],
+        ]
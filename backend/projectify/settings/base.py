@@ -55,6 +55,9 @@ class Base(Configuration):
 
     SESSION_COOKIE_SAMESITE = "Strict"
     SESSION_COOKIE_SECURE = True
+    # Read sessions from the cache, and only fall back to the database when
+    # they are missing there
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 
     # CSRF
     CSRF_USE_SESSIONS = False
@@ -116,6 +119,7 @@ class Base(Configuration):
     MIDDLEWARE = [
         "django.middleware.security.SecurityMiddleware",
         "projectify.middleware.reverse_proxy",
+        "projectify.middleware.instrumentation",
         "django.middleware.gzip.GZipMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -180,11 +184,33 @@ class Base(Configuration):
         },
     ]
 
+    # Like Django's default, with PBKDF2 hashing in a process pool
+    PASSWORD_HASHERS = (
+        "projectify.user.hashers.PooledPBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+    )
+    # Processes hashing passwords, see projectify.user.hashers. None means
+    # hashing in the request thread
+    PASSWORD_HASHING_WORKERS: Optional[int] = 2
+    # Password hashes that may be queued or running at once in a process.
+    # Log ins, sign ups and password changes beyond that get a 429
+    PASSWORD_HASHING_MAX_PENDING = 32
+
     # Authentication
     AUTHENTICATION_BACKENDS = (
         "rules.permissions.ObjectPermissionBackend",
+        "projectify.user.backends.CachedModelBackend",
+        # Sessions remember the backend that they were logged in with. This
+        # keeps sessions from before CachedModelBackend logged in.
         "django.contrib.auth.backends.ModelBackend",
     )
+    # How long, in seconds, to cache the users that sessions belong to. Kept
+    # short, since a user is only removed from the cache when our own
+    # services change them.
+    USER_CACHE_TIMEOUT = 60
 
     # Internationalization
     # https://docs.djangoproject.com/en/3.2/topics/i18n/
@@ -245,6 +271,16 @@ class Base(Configuration):
         ),
         "EXCEPTION_HANDLER": "projectify.lib.exception_handler.exception_handler",
         "NON_FIELD_ERRORS_KEY": "drf_general",
+        # Same as DRF's defaults, but with faster JSON handling
+        "DEFAULT_RENDERER_CLASSES": [
+            "projectify.lib.json.JSONRenderer",
+            "rest_framework.renderers.BrowsableAPIRenderer",
+        ],
+        "DEFAULT_PARSER_CLASSES": [
+            "projectify.lib.json.JSONParser",
+            "rest_framework.parsers.FormParser",
+            "rest_framework.parsers.MultiPartParser",
+        ],
     }
 
     # Where to store media
@@ -310,6 +346,17 @@ class Base(Configuration):
     # N seconds after which 100% of requests time out
     CHANNEL_ERROR: Optional[int] = None
 
+    # Record query counts and timings per route and websocket event
+    INSTRUMENTATION = False
+    # Log requests and websocket events slower than this
+    SLOW_REQUEST_MS: Optional[int] = 500
+    # How many resources a websocket connection may subscribe to, None
+    # means unlimited
+    WEBSOCKET_MAX_SUBSCRIPTIONS: Optional[int] = 200
+    # Serve metrics in Prometheus format at /metrics when set. Scrapers
+    # authenticate with "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN: Optional[str] = None
+
     # tailwind
     # https://django-tailwind.readthedocs.io/en/latest/installation.html
     TAILWIND_APP_NAME = "projectify.theme"
@@ -139,6 +139,9 @@ class Development(SpectacularSettings, Base):
     CHANNEL_ERROR = 20
     ASGI_APPLICATION = "projectify.test.asgi.error_application"
 
+    # Log slow requests and collect query counts
+    INSTRUMENTATION = True
+
     # Show preview of all email types
     PREMAIL_PREVIEW = True
 
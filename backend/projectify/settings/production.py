@@ -127,6 +127,10 @@ class Production(Base):
 
     CSRF_COOKIE_DOMAIN = os.getenv("CSRF_COOKIE_DOMAIN", None)
 
+    # Instrumentation
+    INSTRUMENTATION = "INSTRUMENTATION" in os.environ
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", None)
+
     # Stripe
     STRIPE_PUBLISHABLE_KEY = os.environ["STRIPE_PUBLISHABLE_KEY"]
     STRIPE_SECRET_KEY = os.environ["STRIPE_SECRET_KEY"]
@@ -139,6 +143,20 @@ class Production(Base):
     # https://github.com/django/channels_redis/issues/235
     # https://github.com/django/channels_redis/pull/337
 
+    # Shared between all processes, since workspace versions used for
+    # conditional GET requests are stored here
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_TLS_URL,
+            "OPTIONS": (
+                {"ssl_cert_reqs": None}
+                if REDIS_TLS_URL.startswith("rediss://")
+                else {}
+            ),
+        },
+    }
+
     CHANNEL_LAYERS = {
         "default": {
             "BACKEND": "channels_redis.core.RedisChannelLayer",
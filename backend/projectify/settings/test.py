@@ -38,10 +38,14 @@ class Test(SpectacularSettings, Base):
 
     # Celery
     CELERY_BROKER_URL = "memory://"
+    CELERY_TASK_ALWAYS_EAGER = True
 
     # django-ratelimit
     RATELIMIT_ENABLE = False
 
+    # Don't start hashing processes for every test run
+    PASSWORD_HASHING_WORKERS = None
+
     # Rest Framework settings for drf-spectacular
     REST_FRAMEWORK = {
         **Base.REST_FRAMEWORK,
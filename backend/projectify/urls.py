@@ -90,6 +90,14 @@ if settings.BROWSER_RELOAD:
         path("__reload__/", include("django_browser_reload.urls")),
     )
 
+if settings.METRICS_TOKEN is not None:
+    from projectify.lib.metrics import metrics_view
+
+    urlpatterns = (
+        *urlpatterns,
+        path("metrics", metrics_view, name="metrics"),
+    )
+
 if settings.SERVE_SPECTACULAR:
     try:
         from drf_spectacular.views import (
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+User authentication backends.
+
+Every authenticated request and websocket connection loads the user that
+its session belongs to. Together with the cached_db session engine, caching
+that user means that most authenticated requests run no queries before
+reaching the view.
+
+Services that change a user remove them from the cache, see
+projectify.user.services.user.user_cache_clear. Everything else, such as
+changes in the admin, takes effect after settings.USER_CACHE_TIMEOUT.
+
+The password hash is not cached. Cached users are loaded with the password
+deferred, and carry their session hash instead, so that sessions can still
+be verified without a query. Saving a cached user leaves a password that
+changed in the meantime alone.
+"""
+
+from typing import Any, Optional
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest
+
+from projectify.user.models import User
+from projectify.user.selectors.user import user_cache_key
+
+CachedUser = tuple[dict[str, Any], str]
+
+
+def _user_dump(user: User) -> CachedUser:
+    """Return the fields of a user to cache, leaving out the password."""
+    values = {
+        field.attname: getattr(user, field.attname)
+        for field in User._meta.concrete_fields
+        if field.attname != "password"
+    }
+    return values, user.get_session_auth_hash()
+
+
+def _user_load(cached: CachedUser) -> User:
+    """Build a user from the cache, with the password deferred."""
+    values, session_auth_hash = cached
+    user = User.from_db(
+        DEFAULT_DB_ALIAS, list(values.keys()), list(values.values())
+    )
+    user.cached_session_auth_hash = session_auth_hash
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """Authenticate like ModelBackend, but cache users loaded for sessions."""
+
+    def authenticate(
+        self,
+        request: HttpRequest,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Optional[AbstractBaseUser]:
+        """
+        Authenticate like ModelBackend.
+
+        ModelBackend itself stays in settings.AUTHENTICATION_BACKENDS for
+        sessions that were logged in with it. Failing here keeps Django from
+        trying it next, which would only hash the same password again.
+        """
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied()
+        return user
+
+    def get_user(self, user_id: Any) -> Optional[AbstractBaseUser]:
+        """Return the user from the cache, or load and cache them."""
+        key = user_cache_key(user_id)
+        cached: Optional[CachedUser] = cache.get(key)
+        if cached is not None:
+            return _user_load(cached)
+        user = super().get_user(user_id)
+        if isinstance(user, User):
+            cache.set(
+                key, _user_dump(user), timeout=settings.USER_CACHE_TIMEOUT
+            )
+        return user
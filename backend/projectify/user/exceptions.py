@@ -0,0 +1,11 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Contain exceptions used in user application."""
+
+
+class PasswordHashingOverloaded(RuntimeError):
+    """Tell the caller that too many passwords are being hashed right now."""
+
+    # Seconds after which clients can try again
+    retry_after = 1
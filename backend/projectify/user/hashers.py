@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Password hashers.
+
+Hashing a password with PBKDF2 takes a few hundred milliseconds of CPU
+time. Logging in, signing up and changing a password all hash at least
+once. During a burst of log ins, hashing in request threads keeps the CPU
+of a worker busy, and websocket consumers in the same process stall.
+
+PooledPBKDF2PasswordHasher hashes in a separate pool of
+settings.PASSWORD_HASHING_WORKERS processes instead, and the request thread
+only waits for the result. Once settings.PASSWORD_HASHING_MAX_PENDING
+hashes are queued or running, further hashes are refused with
+PasswordHashingOverloaded, so that a worker keeps responding while
+overloaded. API views answer those with a 429, see
+projectify.lib.exception_handler.
+
+The pool is created on first use in each process, which means after
+uvicorn has started its workers. A pool whose worker died is replaced.
+"""
+
+import base64
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Optional
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.encoding import force_bytes
+
+from projectify.lib.metrics import password_hashing_record
+from projectify.lib.settings import get_settings
+from projectify.user.exceptions import PasswordHashingOverloaded
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = 0
+_pool: Optional[ProcessPoolExecutor] = None
+# Process that created _pool, since forked children can't use it
+_pool_pid: Optional[int] = None
+
+
+def _pool_get(workers: int) -> ProcessPoolExecutor:
+    """Return this process's hashing pool, creating it if needed."""
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # Spawned workers only need hashlib, and don't inherit the
+            # threads and sockets of this process
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn")
+            )
+            _pool_pid = os.getpid()
+            logger.info("Started %d password hashing workers", workers)
+        return _pool
+
+
+def _pool_drop(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken hashing pool, so that the next hash starts a new one."""
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def pbkdf2(
+    password: bytes, salt: bytes, iterations: int, digest: str
+) -> bytes:
+    """
+    Derive a PBKDF2 key, shedding load once too many hashes are pending.
+
+    Raise PasswordHashingOverloaded when
+    settings.PASSWORD_HASHING_MAX_PENDING hashes are already queued or
+    running in this process.
+
+    A worker that dies, for example when it is killed for using too much
+    memory, breaks the whole pool. The hash is then retried once in a new
+    pool, and PasswordHashingOverloaded raised if that breaks as well.
+    """
+    global _pending
+    settings = get_settings()
+    with _lock:
+        if _pending >= settings.PASSWORD_HASHING_MAX_PENDING:
+            shed = True
+        else:
+            shed = False
+            _pending += 1
+    if shed:
+        password_hashing_record(shed=1)
+        logger.warning("Refused to hash password, too many hashes pending")
+        raise PasswordHashingOverloaded(
+            f"{settings.PASSWORD_HASHING_MAX_PENDING} password hashes pending"
+        )
+    password_hashing_record(pending=1)
+    try:
+        workers = settings.PASSWORD_HASHING_WORKERS
+        if workers is None:
+            return hashlib.pbkdf2_hmac(digest, password, salt, iterations)
+        for _attempt in range(2):
+            pool = _pool_get(workers)
+            try:
+                future = pool.submit(
+                    hashlib.pbkdf2_hmac, digest, password, salt, iterations
+                )
+                return future.result()
+            except BrokenProcessPool:
+                logger.warning("Password hashing pool broke, starting anew")
+                _pool_drop(pool)
+        raise PasswordHashingOverloaded("Password hashing pool broke")
+    finally:
+        with _lock:
+            _pending -= 1
+        password_hashing_record(pending=-1)
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Hash like PBKDF2PasswordHasher, but in the password hashing pool.
+
+    Keeps the algorithm name, so hashes are interchangeable with the ones
+    PBKDF2PasswordHasher creates. Verifying a password encodes it again,
+    so log ins are hashed in the pool as well.
+    """
+
+    def encode(
+        self, password: str, salt: str, iterations: Optional[int] = None
+    ) -> str:
+        """Encode a password with PBKDF2 in the password hashing pool."""
+        # django-stubs don't know _check_encode_args
+        self._check_encode_args(password, salt)  # type: ignore[attr-defined]
+        iterations = iterations or self.iterations
+        hash = pbkdf2(
+            force_bytes(password),
+            force_bytes(salt),
+            iterations,
+            self.digest().name,
+        )
+        encoded = base64.b64encode(hash).decode("ascii").strip()
+        return f"{self.algorithm}${iterations}${salt}${encoded}"
@@ -3,7 +3,7 @@
 # SPDX-FileCopyrightText: 2021-2024 JWP Consulting GK
 """User model in user app."""
 
-from typing import Any, ClassVar
+from typing import Any, ClassVar, Optional
 
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -62,11 +62,23 @@ class User(BaseModel, AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = "email"
 
+    # Set by CachedModelBackend, which doesn't cache password hashes
+    cached_session_auth_hash: Optional[str] = None
+
     def save(self, *args: Any, **kwargs: Any) -> None:
         """Override save and call full_clean."""
         self.full_clean()
         return super().save(*args, **kwargs)
 
+    def get_session_auth_hash(self) -> str:
+        """Return the cached session hash if the password wasn't loaded."""
+        if (
+            self.cached_session_auth_hash is not None
+            and "password" in self.get_deferred_fields()
+        ):
+            return self.cached_session_auth_hash
+        return super().get_session_auth_hash()
+
     def __str__(self) -> str:
         """Return printable user name."""
         return self.preferred_name or self.email
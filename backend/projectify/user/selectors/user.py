@@ -8,6 +8,11 @@ from typing import Optional
 from projectify.user.models import User
 
 
+def user_cache_key(user_id: int) -> str:
+    """Return the cache key for a user loaded for a session."""
+    return f"session-user-{user_id}"
+
+
 def user_find_by_email(*, email: str) -> Optional[User]:
     """Find a user by email."""
     try:
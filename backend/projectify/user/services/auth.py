@@ -28,6 +28,7 @@ from projectify.user.services.internal import (
     user_check_token,
     user_create,
 )
+from projectify.user.services.user import user_cache_clear
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +109,7 @@ def user_confirm_email(
         )
     user.is_active = True
     user.save()
+    user_cache_clear(user=user)
     # TODO do not return User here
     return user
 
@@ -160,6 +162,8 @@ def user_log_out(
     if user.is_anonymous:
         raise serializers.ValidationError(_("There is no logged in user"))
     logout(request)
+    if isinstance(user, User):
+        user_cache_clear(user=user)
 
 
 def user_request_password_reset(
@@ -202,6 +206,8 @@ def user_confirm_password_reset(
         )
     user.set_password(new_password)
     user.save()
+    # Log out sessions using the old password right away
+    user_cache_clear(user=user)
     logger.info("Reset password for user with email %s", email)
     # XXX consider if returning a user is necessary here
     return user
@@ -7,6 +7,7 @@ import logging
 from typing import Optional
 
 from django.contrib.auth.password_validation import validate_password
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
@@ -22,7 +23,11 @@ from projectify.user.emails import (
 )
 from projectify.user.models.previous_email_address import PreviousEmailAddress
 from projectify.user.models.user import User
+from projectify.user.selectors.user import user_cache_key
 from projectify.user.services.internal import Token, user_check_token
+from projectify.workspace.services.signals import (
+    workspace_version_bump_for_user,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +35,18 @@ logger = logging.getLogger(__name__)
 # No Create, since creating users is complicated
 
 
+def user_cache_clear(*, user: User) -> None:
+    """
+    Remove a user from the session user cache.
+
+    Call this whenever a user changes, so that their sessions see the
+    change. The user is only removed after the transaction commits, since a
+    concurrent request could otherwise cache them again before that.
+    """
+    key = user_cache_key(user.pk)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
 # Update
 def user_update(
     *,
@@ -43,6 +60,9 @@ def user_update(
         raise PermissionDenied("User can only update own user")
     user.preferred_name = preferred_name
     user.save()
+    user_cache_clear(user=user)
+    # The user's name is shown in workspace, project and task details
+    workspace_version_bump_for_user(user=user)
     return user
 
 
@@ -65,6 +85,9 @@ def user_change_password(
         raise serializers.ValidationError({"policies": e.messages})
     user.set_password(new_password)
     user.save()
+    # Sessions authenticated with the old password must not see a cached
+    # user with the old password hash
+    user_cache_clear(user=user)
 
     email = UserPasswordChangedEmail(receiver=user, obj=user)
     email.send()
@@ -84,6 +107,7 @@ def user_request_email_address_update(
         )
     user.unconfirmed_email = new_email
     user.save()
+    user_cache_clear(user=user)
     UserEmailAddressUpdateEmail(
         receiver=EmailAddress(new_email),
         obj=user,
@@ -111,5 +135,6 @@ def user_confirm_email_address_update(
         )
     user.email = new_email
     user.save()
+    user_cache_clear(user=user)
     PreviousEmailAddress.objects.create(user=user, email=old_email)
     UserEmailAddressUpdatedEmail(receiver=user, obj=user).send()
@@ -6,13 +6,16 @@
 from typing import Optional
 
 from django.db import transaction
+from django.db.models import QuerySet
 from django.utils.timezone import now
 
+from projectify.lib.query_budget import query_budget
 from projectify.user.models import User, UserInvite
 from projectify.user.selectors.user import user_find_by_email
 from projectify.workspace.models.const import TeamMemberRoles
+from projectify.workspace.models.team_member import TeamMember
 from projectify.workspace.models.team_member_invite import TeamMemberInvite
-from projectify.workspace.services.workspace import workspace_add_user
+from projectify.workspace.services.signals import send_change_signal
 
 
 @transaction.atomic
@@ -28,33 +31,63 @@ def user_invite_create(*, email: str) -> Optional[UserInvite]:
     return UserInvite.objects.create(email=email)
 
 
+def _user_invites_redeem(
+    *, user_invites: QuerySet[UserInvite], user: User
+) -> None:
+    """
+    Redeem user invites and add the user to the workspaces they were invited to.
+
+    Runs the same few queries no matter how many workspaces there are.
+    Redeeming turns a team member invite into a team member, so the number
+    of team members and invites that a workspace's quota counts stays the
+    same.
+    """
+    now_ = now()
+    if not user_invites.update(redeemed=True, user=user, modified=now_):
+        return
+    team_member_invites = list(
+        TeamMemberInvite.objects.filter(
+            user_invite__user=user, redeemed=False
+        ).select_related("workspace")
+    )
+    if not team_member_invites:
+        return
+    # Invites to the same workspace from different user invites add the
+    # user only once
+    workspaces = {
+        invite.workspace.pk: invite.workspace for invite in team_member_invites
+    }
+    TeamMember.objects.bulk_create(
+        TeamMember(
+            workspace=workspace, user=user, role=TeamMemberRoles.OBSERVER
+        )
+        for workspace in workspaces.values()
+    )
+    TeamMemberInvite.objects.filter(
+        pk__in=[invite.pk for invite in team_member_invites]
+    ).update(redeemed=True, redeemed_when=now_, modified=now_)
+    for workspace in workspaces.values():
+        send_change_signal("changed", workspace)
+
+
 @transaction.atomic
 def user_invite_redeem(*, user_invite: UserInvite, user: User) -> None:
     """Redeem a UserInvite."""
     assert not user_invite.redeemed
+    _user_invites_redeem(
+        user_invites=UserInvite.objects.filter(pk=user_invite.pk), user=user
+    )
     user_invite.redeemed = True
     user_invite.user = user
-    user_invite.save()
-
-    # Add user to workspaces for any outstanding invites
-    qs = TeamMemberInvite.objects.filter(
-        # This plausibly keeps us from redeeming the same invite twice
-        user_invite__user=user,
-        redeemed=False,
-    )
-    for invite in qs:
-        workspace = invite.workspace
-        workspace_add_user(
-            workspace=workspace, user=user, role=TeamMemberRoles.OBSERVER
-        )
-        invite.redeemed = True
-        invite.redeemed_when = now()
-        invite.save()
 
 
+@query_budget(9)
 @transaction.atomic
 def user_invite_redeem_many(*, user: User) -> None:
     """Redeem all invites for a user."""
-    invites = UserInvite.objects.is_redeemed(False).by_email(user.email)
-    for invitation in invites.iterator():
-        user_invite_redeem(user_invite=invitation, user=user)
+    _user_invites_redeem(
+        user_invites=UserInvite.objects.is_redeemed(False).by_email(
+            user.email
+        ),
+        user=user,
+    )
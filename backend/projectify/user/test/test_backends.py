@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test user authentication backends."""
+
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.test.client import Client
+from django.urls import reverse
+
+import pytest
+
+from pytest_types import DjangoAssertNumQueries, DjangoCaptureOnCommitCallbacks
+
+from ..backends import CachedModelBackend
+from ..models import User
+from ..selectors.user import user_cache_key
+from ..services.user import user_change_password, user_update
+
+pytestmark = pytest.mark.django_db
+
+
+def test_get_user(
+    user: User,
+    django_assert_num_queries: DjangoAssertNumQueries,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    """Test that users are cached until they are updated."""
+    backend = CachedModelBackend()
+    with django_assert_num_queries(1):
+        assert backend.get_user(user.pk) == user
+    with django_assert_num_queries(0):
+        cached = backend.get_user(user.pk)
+    assert cached == user
+    with django_capture_on_commit_callbacks(execute=True):
+        user_update(who=user, user=user, preferred_name="Cached no more")
+    with django_assert_num_queries(1):
+        updated = backend.get_user(user.pk)
+    assert isinstance(updated, User)
+    assert updated.preferred_name == "Cached no more"
+    assert backend.get_user(0) is None
+
+
+def test_get_user_password_not_cached(
+    user: User,
+    password: str,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test that saving a cached user keeps a newer password."""
+    backend = CachedModelBackend()
+    backend.get_user(user.pk)
+    assert password not in str(cache.get(user_cache_key(user.pk)))
+    assert user.password not in str(cache.get(user_cache_key(user.pk)))
+    with django_assert_num_queries(0):
+        cached = backend.get_user(user.pk)
+        assert cached is not None
+        assert cached.get_session_auth_hash() == user.get_session_auth_hash()
+    # Changed without clearing the cache, like in the admin
+    user.set_password("hello-world123")
+    user.save()
+    assert isinstance(cached, User)
+    cached.preferred_name = "Stale"
+    cached.save()
+    user.refresh_from_db()
+    assert user.preferred_name == "Stale"
+    assert user.check_password("hello-world123")
+
+
+def test_authenticated_request(
+    user_client: Client,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test that loading session and user needs no queries."""
+    url = reverse("user:users:read")
+    user_client.get(url)
+    with django_assert_num_queries(0):
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["kind"] == "authenticated"
+
+
+def test_password_change(
+    user: User,
+    user_client: Client,
+    password: str,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    """Test that changing the password logs out other sessions."""
+    url = reverse("user:users:read")
+    assert user_client.get(url).json()["kind"] == "authenticated"
+    with django_capture_on_commit_callbacks(execute=True):
+        user_change_password(
+            user=user, current_password=password, new_password="hello-world123"
+        )
+    assert user_client.get(url).json()["kind"] == "unauthenticated"
+
+
+def test_model_backend_session(user: User, client: Client) -> None:
+    """Test that sessions logged in with ModelBackend stay logged in."""
+    client.force_login(user, "django.contrib.auth.backends.ModelBackend")
+    response = client.get(reverse("user:users:read"))
+    assert response.json()["kind"] == "authenticated"
+
+
+def test_authenticate_hashes_once(
+    user: User, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a wrong password is not checked by ModelBackend again."""
+    checked: list[str] = []
+
+    def check_password(self: User, raw_password: str) -> bool:
+        checked.append(raw_password)
+        return False
+
+    monkeypatch.setattr(User, "check_password", check_password)
+    assert authenticate(username=user.email, password="wrong") is None
+    assert checked == ["wrong"]
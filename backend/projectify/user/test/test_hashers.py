@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test password hashers."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    check_password,
+    make_password,
+)
+
+import pytest
+
+from projectify.lib import metrics
+from projectify.settings.base import Base
+
+from .. import hashers
+from ..exceptions import PasswordHashingOverloaded
+from ..hashers import PooledPBKDF2PasswordHasher
+
+
+def test_encode() -> None:
+    """Test that hashes match the ones PBKDF2PasswordHasher creates."""
+    hasher = PooledPBKDF2PasswordHasher()
+    encoded = hasher.encode("hunter2", "salt", 1000)
+    assert encoded == PBKDF2PasswordHasher().encode("hunter2", "salt", 1000)
+    assert hasher.verify("hunter2", encoded)
+    assert not hasher.verify("hunter3", encoded)
+
+
+def test_make_password() -> None:
+    """Test that Django hashes passwords with the pooled hasher."""
+    encoded = make_password("hunter2")
+    assert encoded.startswith("pbkdf2_sha256$")
+    assert check_password("hunter2", encoded)
+
+
+def test_pool(settings: Base) -> None:
+    """Test hashing in a worker process."""
+    settings.PASSWORD_HASHING_WORKERS = 1
+    hasher = PooledPBKDF2PasswordHasher()
+    encoded = hasher.encode("hunter2", "salt", 1000)
+    assert encoded == PBKDF2PasswordHasher().encode("hunter2", "salt", 1000)
+
+
+def test_pool_broken(settings: Base, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a broken pool is replaced, and hashing retried once."""
+    settings.PASSWORD_HASHING_WORKERS = 1
+    expected = PBKDF2PasswordHasher().encode("hunter2", "salt", 1000)
+    # Kill the only worker of a fresh pool
+    broken = ProcessPoolExecutor(
+        max_workers=1, mp_context=get_context("spawn")
+    )
+    broken.submit(os._exit, 1)
+    monkeypatch.setattr(hashers, "_pool", broken)
+    monkeypatch.setattr(hashers, "_pool_pid", os.getpid())
+    hasher = PooledPBKDF2PasswordHasher()
+    assert hasher.encode("hunter2", "salt", 1000) == expected
+    assert hashers._pool is not broken
+
+    # A pool that breaks again is given up on
+    monkeypatch.setattr(hashers, "_pool_get", lambda workers: broken)
+    with pytest.raises(PasswordHashingOverloaded):
+        hasher.encode("hunter2", "salt", 1000)
+
+
+def test_shed(settings: Base) -> None:
+    """Test that hashes are refused once too many are pending."""
+    metrics.reset()
+    settings.PASSWORD_HASHING_MAX_PENDING = 0
+    with pytest.raises(PasswordHashingOverloaded):
+        make_password("hunter2")
+    stats = metrics.password_hashing_snapshot()
+    assert stats.shed == 1
+    assert stats.pending == 0
+    metrics.reset()
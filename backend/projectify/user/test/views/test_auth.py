@@ -50,7 +50,8 @@ class TestLogOut:
             data={"email": user.email, "password": password},
         )
         assert response.status_code == 200, response.data
-        with django_assert_num_queries(4):
+        # Gone down from 4 -> 3, since the session is read from the cache
+        with django_assert_num_queries(3):
             response = rest_client.post(resource_url)
             assert response.status_code == 200, response.data
         assert response.data == {"kind": "unauthenticated"}
@@ -270,6 +271,23 @@ class TestLogIn:
             "preferred_name": user.preferred_name,
         }
 
+    def test_password_hashing_overloaded(
+        self,
+        rest_client: APIClient,
+        resource_url: str,
+        user: User,
+        password: str,
+        settings: Base,
+    ) -> None:
+        """Test that log ins are refused while too many hashes are pending."""
+        settings.PASSWORD_HASHING_MAX_PENDING = 0
+        response = rest_client.post(
+            resource_url,
+            data={"email": user.email, "password": password},
+        )
+        assert response.status_code == 429, response.data
+        assert response["Retry-After"] == "1"
+
 
 class TestPasswordResetRequest:
     """Test requesting a password reset."""
@@ -80,7 +80,8 @@ class TestUserUpdate:
         user: User,
     ) -> None:
         """Test updating."""
-        with django_assert_num_queries(3):
+        # One query to find the workspaces whose version needs to change
+        with django_assert_num_queries(4):
             response = rest_user_client.put(
                 resource_url,
                 data={},
@@ -26,11 +26,15 @@ from projectify.user.serializers import (
     LoggedInUserSerializer,
 )
 from projectify.user.services.user import (
+    user_cache_clear,
     user_change_password,
     user_confirm_email_address_update,
     user_request_email_address_update,
     user_update,
 )
+from projectify.workspace.services.signals import (
+    workspace_version_bump_for_user,
+)
 
 
 # Create
@@ -130,6 +134,8 @@ class ProfilePictureUpload(views.APIView):
         else:
             user.profile_picture = file_obj
         user.save()
+        user_cache_clear(user=user)
+        workspace_version_bump_for_user(user=user)
         return Response(status=204)
 
 
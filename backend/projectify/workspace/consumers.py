@@ -3,7 +3,12 @@
 # SPDX-FileCopyrightText: 2022, 2023 JWP Consulting GK
 """Workspace ws consumers."""
 
+import asyncio
 import logging
+import sys
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
 from typing import (
     Any,
     Literal,
@@ -19,28 +24,38 @@ from uuid import UUID
 from django.db import models
 
 from asgiref.sync import async_to_sync as _async_to_sync
+from asgiref.sync import sync_to_async
+from channels.exceptions import StopConsumer
 from channels.generic.websocket import JsonWebsocketConsumer
 from rest_framework import serializers, status
 
+from projectify.lib import metrics
+from projectify.lib.json import dumps, loads
+from projectify.lib.metrics import InstrumentedConsumerMixin
+from projectify.lib.settings import get_settings
 from projectify.user.models import User
 
-from .models.project import Project
-from .models.task import Task
-from .models.workspace import Workspace
+from .selectors.change_log import change_log_missed, change_log_sequence_get
 from .selectors.project import (
     ProjectDetailQuerySet,
     project_find_by_project_uuid,
+    project_workspace_pk_find_by_project_uuid,
 )
 from .selectors.quota import workspace_get_all_quotas
-from .selectors.task import TaskDetailQuerySet, task_find_by_task_uuid
+from .selectors.task import (
+    TaskDetailQuerySet,
+    task_find_by_task_uuid,
+    task_workspace_pk_find_by_task_uuid,
+)
 from .selectors.workspace import (
     WorkspaceDetailQuerySet,
     workspace_find_by_workspace_uuid,
+    workspace_pk_find_by_workspace_uuid,
 )
 from .serializers.project import ProjectDetailSerializer
 from .serializers.task_detail import TaskDetailSerializer
 from .serializers.workspace import WorkspaceDetailSerializer
-from .types import ConsumerEvent, Resource
+from .types import ChatMessageEvent, ConsumerEvent, Resource, ResyncEvent
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +72,8 @@ class ClientRequest(TypedDict):
     action: Literal["subscribe", "unsubscribe"]
     resource: Literal["workspace", "project", "task"]
     uuid: UUID
+    # When subscribing again, the last sequence number the client has seen
+    since: NotRequired[int]
 
 
 class ClientRequestSerializer(serializers.Serializer):
@@ -67,6 +84,7 @@ class ClientRequestSerializer(serializers.Serializer):
         choices=["workspace", "project", "task"]
     )
     uuid = serializers.UUIDField()
+    since = serializers.IntegerField(required=False, min_value=0)
 
 
 class ClientResponse(TypedDict):
@@ -78,12 +96,16 @@ class ClientResponse(TypedDict):
         "already_subscribed",
         "not_subscribed",
         "not_found",
+        "too_many_subscriptions",
         "changed",
         "gone",
+        "chat_message",
+        "resync",
     ]
     resource: Literal["workspace", "project", "task"]
     uuid: UUID
     content: NotRequired[object]
+    sequence: NotRequired[int]
 
 
 class ClientResponseSerializer(serializers.Serializer):
@@ -96,8 +118,11 @@ class ClientResponseSerializer(serializers.Serializer):
             "already_subscribed",
             "not_subscribed",
             "not_found",
+            "too_many_subscriptions",
             "changed",
             "gone",
+            "chat_message",
+            "resync",
         ]
     )
     resource = serializers.ChoiceField(
@@ -105,6 +130,7 @@ class ClientResponseSerializer(serializers.Serializer):
     )
     uuid = serializers.UUIDField()
     content = serializers.DictField(required=False)
+    sequence = serializers.IntegerField(required=False)
 
 
 def get_group_name(resource: Resource, uuid: UUID) -> str:
@@ -112,14 +138,178 @@ def get_group_name(resource: Resource, uuid: UUID) -> str:
     return f"{resource}-{uuid}"
 
 
-ResourceInstance = Union[Workspace, Project, Task]
+@dataclass(frozen=True, slots=True)
+class Subscription:
+    """
+    A resource that a connection is subscribed to.
+
+    Only identifies the resource. It is loaded again for every change, so
+    that thousands of connections don't each hold on to model instances.
+    """
+
+    resource: Resource
+    uuid: UUID
+    workspace_id: int
+
+
+SubscribeResult = Literal[
+    "not_found", "subscribed", "already_subscribed", "too_many_subscriptions"
+]
+
+# Channel layer events that are sent to the client through the send queue
+QueuedEvent = Union[ConsumerEvent, ChatMessageEvent, ResyncEvent]
+
+
+def send_queue_key(event: QueuedEvent) -> tuple[str, str, str]:
+    """
+    Return the key an event is queued under.
+
+    A change event replaces a queued change event for the same resource,
+    since the client only needs the newest one. Chat messages are never
+    replaced.
+    """
+    match event["type"]:
+        case "change":
+            return "change", event["resource"], event["uuid"]
+        case "chat_message":
+            return "chat_message", event["uuid"], str(event["sequence"])
+        case "resync":
+            return "resync", event["resource"], event["uuid"]
 
 
-class ChangeConsumer(JsonWebsocketConsumer):
+class ChangeConsumer(InstrumentedConsumerMixin, JsonWebsocketConsumer):
     """Allow subscribing to changes to workspace resources."""
 
     user: User
-    subscriptions: dict[UUID, Union[Workspace, Project, Task]]
+    subscriptions: dict[UUID, Subscription]
+    # Events waiting to be sent to the client, oldest first
+    send_queue: OrderedDict[tuple[str, str, str], QueuedEvent]
+    send_queue_task: Optional[asyncio.Task[None]]
+    # Closes the connection after sending failed
+    send_queue_close_task: Optional[asyncio.Task[None]]
+    # How many events may wait for a slow client before they are replaced
+    # by resync markers
+    send_queue_capacity = 100
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the send queue."""
+        super().__init__(*args, **kwargs)
+        self.send_queue = OrderedDict()
+        self.send_queue_task = None
+        self.send_queue_close_task = None
+
+    async def dispatch(self, message: Mapping[str, Any]) -> None:
+        """
+        Queue channel layer events, dispatch everything else right away.
+
+        Queued events are sent by a separate task. A slow client then only
+        delays its own events, and these wait in the bounded send queue
+        instead of piling up in the channel layer.
+        """
+        if message["type"] in ("change", "chat_message"):
+            self.send_queue_put(cast(QueuedEvent, message))
+            return
+        try:
+            await super().dispatch(message)
+        except StopConsumer:
+            self.send_queue_clear()
+            raise
+
+    def send_queue_put(self, event: QueuedEvent) -> None:
+        """Queue an event and make sure that the queue is being sent."""
+        key = send_queue_key(event)
+        if key in self.send_queue:
+            self.send_queue[key] = event
+            metrics.send_queue_record(coalesced=1)
+        elif len(self.send_queue) < self.send_queue_capacity:
+            self.send_queue[key] = event
+            metrics.send_queue_record(depth=1)
+        else:
+            self.send_queue_overflow(event)
+        if self.send_queue_task is None or self.send_queue_task.done():
+            self.send_queue_task = asyncio.create_task(self.send_queue_drain())
+            self.send_queue_task.add_done_callback(self.send_queue_done)
+
+    def send_queue_overflow(self, event: QueuedEvent) -> None:
+        """
+        Replace all queued events with a resync marker per resource.
+
+        The client fetches these resources again when it receives the
+        marker. Queued gone events are kept, since there is nothing left
+        to fetch.
+        """
+        depth = len(self.send_queue)
+        events = [*self.send_queue.values(), event]
+        self.send_queue.clear()
+        for queued in events:
+            if queued["type"] == "change" and queued["kind"] == "gone":
+                self.send_queue[send_queue_key(queued)] = queued
+                continue
+            resource: Resource = (
+                "task"
+                if queued["type"] == "chat_message"
+                else queued["resource"]
+            )
+            resync: ResyncEvent = {
+                "type": "resync",
+                "resource": resource,
+                "uuid": queued["uuid"],
+            }
+            self.send_queue[send_queue_key(resync)] = resync
+        logger.warning("Send queue overflowed with %d events", depth)
+        metrics.send_queue_record(
+            depth=len(self.send_queue) - depth, overflows=1
+        )
+
+    async def send_queue_drain(self) -> None:
+        """Send queued events until the queue is empty."""
+        while self.send_queue:
+            _, event = self.send_queue.popitem(last=False)
+            metrics.send_queue_record(depth=-1)
+            await super().dispatch(event)
+
+    def send_queue_done(self, task: "asyncio.Task[None]") -> None:
+        """
+        Close the connection if sending queued events failed.
+
+        Nothing awaits the sending task, so its exception would otherwise
+        only be logged when the task is garbage collected, and the client
+        would silently stop receiving events.
+        """
+        if task.cancelled():
+            return
+        exception = task.exception()
+        if exception is None:
+            return
+        logger.error("Sending queued events failed", exc_info=exception)
+        self.send_queue_clear()
+        # Sending is synchronous for this consumer
+        self.send_queue_close_task = asyncio.create_task(
+            sync_to_async(self.close)(1011)
+        )
+
+    def send_queue_clear(self) -> None:
+        """Stop sending and drop all queued events."""
+        if self.send_queue_task is not None:
+            self.send_queue_task.cancel()
+        metrics.send_queue_record(depth=-len(self.send_queue))
+        self.send_queue.clear()
+
+    def get_metrics_route(self, message: Mapping[str, Any]) -> str:
+        """Record change events per resource."""
+        if message["type"] == "change":
+            return f"change {message['resource']}"
+        return super().get_metrics_route(message)
+
+    @classmethod
+    def decode_json(cls, text_data: str) -> Any:
+        """Decode a frame sent by the client."""
+        return loads(text_data)
+
+    @classmethod
+    def encode_json(cls, content: object) -> str:
+        """Encode a frame, which can contain a full project."""
+        return dumps(content).decode()
 
     def connect(self) -> None:
         """Handle connect."""
@@ -137,36 +327,25 @@ class ChangeConsumer(JsonWebsocketConsumer):
     def is_subscribed_to(self, resource: Resource, uuid: UUID) -> bool:
         """Return True if we are subscribed to a group."""
         sub = self.subscriptions.get(uuid)
-        match resource, sub:
-            case "workspace", Workspace():
-                return True
-            case "project", Project():
-                return True
-            case "task", Task():
-                return True
-            case _:
-                return False
-
-    T = TypeVar("T")
+        return sub is not None and sub.resource == resource
 
     def find_subscription(
         self, resource: Resource, uuid: UUID
-    ) -> Optional[ResourceInstance]:
-        """Return True if we are subscribed to a group."""
+    ) -> Optional[Subscription]:
+        """Return the subscription for a group, if we are subscribed."""
         sub = self.subscriptions.get(uuid)
         if sub is None:
             return None
-        match resource, sub:
-            case "workspace", Workspace():
-                return sub
-            case "project", Project():
-                return sub
-            case "task", Task():
-                return sub
-            case _:
-                raise ValueError(
-                    f"Type mismatch for sub {sub} with {uuid}, expected {resource}"
-                )
+        if sub.resource != resource:
+            raise ValueError(
+                f"Type mismatch for sub {sub} with {uuid}, expected {resource}"
+            )
+        return sub
+
+    @staticmethod
+    def subscription_size(sub: Subscription) -> int:
+        """Estimate the memory held by a subscription, in bytes."""
+        return sys.getsizeof(sub) + sys.getsizeof(sub.uuid)
 
     def pop_subscription(self, resource: Resource, uuid: UUID) -> None:
         """Pop a subscription, but only after type checking."""
@@ -179,24 +358,35 @@ class ChangeConsumer(JsonWebsocketConsumer):
 
     def add_subscription_for(
         self, resource: Resource, uuid: UUID
-    ) -> Literal["not_found", "subscribed", "already_subscribed"]:
+    ) -> SubscribeResult:
         """Add a resource subscription."""
+        if self.is_subscribed_to(resource, uuid):
+            return "already_subscribed"
+        limit = get_settings().WEBSOCKET_MAX_SUBSCRIPTIONS
+        if limit is not None and len(self.subscriptions) >= limit:
+            return "too_many_subscriptions"
         who = self.user
-        inst: Optional[ResourceInstance]
-        match resource, self.is_subscribed_to(resource, uuid):
-            case "workspace", False:
-                inst = workspace_find_by_workspace_uuid(
+        workspace_id: Optional[int]
+        match resource:
+            case "workspace":
+                workspace_id = workspace_pk_find_by_workspace_uuid(
                     who=who, workspace_uuid=uuid
                 )
-            case "project", False:
-                inst = project_find_by_project_uuid(who=who, project_uuid=uuid)
-            case "task", False:
-                inst = task_find_by_task_uuid(who=self.user, task_uuid=uuid)
-            case _:
-                return "already_subscribed"
-        if inst is None:
+            case "project":
+                workspace_id = project_workspace_pk_find_by_project_uuid(
+                    who=who, project_uuid=uuid
+                )
+            case "task":
+                workspace_id = task_workspace_pk_find_by_task_uuid(
+                    who=who, task_uuid=uuid
+                )
+        if workspace_id is None:
             return "not_found"
-        self.subscriptions[uuid] = inst
+        sub = Subscription(
+            resource=resource, uuid=uuid, workspace_id=workspace_id
+        )
+        self.subscriptions[uuid] = sub
+        metrics.subscription_record(count=1, size=self.subscription_size(sub))
         async_to_sync(self.channel_layer.group_add)(
             get_group_name(resource, uuid), self.channel_name
         )
@@ -208,7 +398,10 @@ class ChangeConsumer(JsonWebsocketConsumer):
         """Remove a resource subscription."""
         if not self.is_subscribed_to(resource, uuid):
             return "not_subscribed"
-        self.subscriptions.pop(uuid)
+        sub = self.subscriptions.pop(uuid)
+        metrics.subscription_record(
+            count=-1, size=-self.subscription_size(sub)
+        )
         async_to_sync(self.channel_layer.group_discard)(
             get_group_name(resource, uuid), self.channel_name
         )
@@ -216,15 +409,8 @@ class ChangeConsumer(JsonWebsocketConsumer):
 
     def remove_all_subscriptions(self) -> None:
         """Remove all subscriptions, discard self from channel layer."""
-        subs = list(self.subscriptions.items())
-        for k, v in subs:
-            match v:
-                case Workspace():
-                    self.remove_subscription_for("workspace", k)
-                case Project():
-                    self.remove_subscription_for("project", k)
-                case Task():
-                    self.remove_subscription_for("task", k)
+        for sub in list(self.subscriptions.values()):
+            self.remove_subscription_for(sub.resource, sub.uuid)
 
     def disconnect(self, close_code: int) -> None:
         """Handle disconnect."""
@@ -246,12 +432,8 @@ class ChangeConsumer(JsonWebsocketConsumer):
         resource = data["resource"]
         uuid = data["uuid"]
 
-        result: Literal[
-            "subscribed",
-            "not_found",
-            "not_subscribed",
-            "already_subscribed",
-            "unsubscribed",
+        result: Union[
+            SubscribeResult, Literal["not_subscribed", "unsubscribed"]
         ]
 
         match data["action"], resource:
@@ -285,6 +467,18 @@ class ChangeConsumer(JsonWebsocketConsumer):
                     "resource": resource,
                     "uuid": uuid,
                 }
+            case "too_many_subscriptions":
+                logger.warning(
+                    "Client reached the subscription limit with resource %s "
+                    "uuid %s",
+                    resource,
+                    uuid,
+                )
+                response = {
+                    "kind": "too_many_subscriptions",
+                    "resource": resource,
+                    "uuid": uuid,
+                }
             case "not_subscribed":
                 logger.debug(
                     "Not subscribed to uuid %s and resource %s", uuid, resource
@@ -301,12 +495,70 @@ class ChangeConsumer(JsonWebsocketConsumer):
                     "uuid": uuid,
                 }
             case "subscribed":
-                response = {
+                self.resume(resource, uuid, data.get("since"))
+                return
+        self.respond(response)
+
+    def resume(
+        self, resource: Resource, uuid: UUID, since: Optional[int]
+    ) -> None:
+        """
+        Confirm a subscription and send what the client has missed.
+
+        Clients that pass the sequence number they last saw only receive the
+        resource again if it changed since then.
+        """
+        if since is None:
+            self.respond(
+                {
                     "kind": "subscribed",
                     "resource": resource,
                     "uuid": uuid,
+                    "sequence": change_log_sequence_get(
+                        resource=resource, uuid=uuid
+                    ),
                 }
-        self.respond(response)
+            )
+            return
+        missed, sequence = change_log_missed(
+            resource=resource, uuid=uuid, since=since
+        )
+        self.respond(
+            {
+                "kind": "subscribed",
+                "resource": resource,
+                "uuid": uuid,
+                "sequence": sequence,
+            }
+        )
+        match missed:
+            case "up_to_date":
+                pass
+            case "changed":
+                self.change(
+                    {
+                        "type": "change",
+                        "resource": resource,
+                        "uuid": str(uuid),
+                        "kind": "changed",
+                        "sequence": sequence,
+                    }
+                )
+            case "resync":
+                logger.debug(
+                    "Can't tell what changed in resource %s uuid %s since %d",
+                    resource,
+                    uuid,
+                    since,
+                )
+                self.respond(
+                    {
+                        "kind": "resync",
+                        "resource": resource,
+                        "uuid": uuid,
+                        "sequence": sequence,
+                    }
+                )
 
     def change(self, event: ConsumerEvent) -> None:
         """Respond to project change event."""
@@ -321,10 +573,10 @@ class ChangeConsumer(JsonWebsocketConsumer):
         match event["kind"], sub:
             case "gone", _:
                 result = "gone"
-            case "changed", Workspace() as w:
+            case "changed", Subscription(resource="workspace"):
                 workspace = workspace_find_by_workspace_uuid(
                     who=self.user,
-                    workspace_uuid=w.uuid,
+                    workspace_uuid=uuid,
                     qs=WorkspaceDetailQuerySet,
                 )
                 if workspace is not None:
@@ -332,10 +584,10 @@ class ChangeConsumer(JsonWebsocketConsumer):
                     result = WorkspaceDetailSerializer(workspace)
                 else:
                     result = "not_found"
-            case "changed", Project() as p:
+            case "changed", Subscription(resource="project"):
                 project = project_find_by_project_uuid(
                     who=self.user,
-                    project_uuid=p.uuid,
+                    project_uuid=uuid,
                     qs=ProjectDetailQuerySet,
                 )
                 if project is not None:
@@ -345,9 +597,9 @@ class ChangeConsumer(JsonWebsocketConsumer):
                     result = ProjectDetailSerializer(project)
                 else:
                     result = "not_found"
-            case "changed", Task() as t:
+            case "changed", Subscription(resource="task"):
                 task = task_find_by_task_uuid(
-                    who=self.user, task_uuid=t.uuid, qs=TaskDetailQuerySet
+                    who=self.user, task_uuid=uuid, qs=TaskDetailQuerySet
                 )
                 if task is not None:
                     result = TaskDetailSerializer(task)
@@ -357,14 +609,7 @@ class ChangeConsumer(JsonWebsocketConsumer):
                 result = "never_subscribed"
 
         match result:
-            case "gone":
-                self.remove_subscription_for(event["resource"], uuid)
-                response = {
-                    "kind": "gone",
-                    "resource": event["resource"],
-                    "uuid": uuid,
-                }
-            case "not_found":
+            case "gone" | "not_found":
                 self.remove_subscription_for(event["resource"], uuid)
                 response = {
                     "kind": "gone",
@@ -386,4 +631,50 @@ class ChangeConsumer(JsonWebsocketConsumer):
                     "uuid": uuid,
                     "content": result.data,
                 }
+                if "sequence" in event:
+                    response["sequence"] = event["sequence"]
+        self.respond(response)
+
+    def resync(self, event: ResyncEvent) -> None:
+        """Tell the client to fetch a resource whose events were dropped."""
+        uuid = UUID(event["uuid"])
+        if self.find_subscription(event["resource"], uuid) is None:
+            return
+        self.respond(
+            {
+                "kind": "resync",
+                "resource": event["resource"],
+                "uuid": uuid,
+                "sequence": change_log_sequence_get(
+                    resource=event["resource"], uuid=uuid
+                ),
+            }
+        )
+
+    def chat_message(self, event: ChatMessageEvent) -> None:
+        """Send a new chat message to a task's subscriber."""
+        uuid = UUID(event["uuid"])
+        if self.find_subscription("task", uuid) is None:
+            logger.warning(
+                "Received chat message for task %s despite never having "
+                "subscribed",
+                uuid,
+            )
+            return
+        response: ClientResponse
+        # The subscriber might have lost access since subscribing
+        if (
+            task_workspace_pk_find_by_task_uuid(who=self.user, task_uuid=uuid)
+            is None
+        ):
+            self.remove_subscription_for("task", uuid)
+            response = {"kind": "gone", "resource": "task", "uuid": uuid}
+        else:
+            response = {
+                "kind": "chat_message",
+                "resource": "task",
+                "uuid": uuid,
+                "content": event["content"],
+                "sequence": event["sequence"],
+            }
         self.respond(response)
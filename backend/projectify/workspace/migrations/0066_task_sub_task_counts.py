@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Store sub task counts on tasks and keep them up to date with triggers."""
+# Generated by Django 5.1.15 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+
+# Runs before the triggers are added, since read_only_sub_task_counts would
+# discard the counts otherwise
+BACKFILL_SUB_TASK_COUNTS = """
+UPDATE "workspace_task"
+SET "sub_tasks_total" = "counts"."total",
+    "sub_tasks_done" = "counts"."done"
+FROM (
+    SELECT "task_id",
+        COUNT(*) AS "total",
+        COUNT(*) FILTER (WHERE "done") AS "done"
+    FROM "workspace_subtask"
+    GROUP BY "task_id"
+) AS "counts"
+WHERE "workspace_task"."id" = "counts"."task_id"
+"""
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0065_workspace_title"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="sub_tasks_done",
+            field=models.PositiveIntegerField(
+                db_default=0,
+                default=0,
+                editable=False,
+                help_text="Number of sub tasks that are done",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="sub_tasks_total",
+            field=models.PositiveIntegerField(
+                db_default=0,
+                default=0,
+                editable=False,
+                help_text="Number of sub tasks",
+            ),
+        ),
+        migrations.RunSQL(
+            BACKFILL_SUB_TASK_COUNTS, reverse_sql=migrations.RunSQL.noop
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="count_inserted_sub_tasks",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func='\n      BEGIN\n        UPDATE "workspace_task"\n        SET "sub_tasks_total" = "workspace_task"."sub_tasks_total" + "counts"."total",\n            "sub_tasks_done" = "workspace_task"."sub_tasks_done" + "counts"."done"\n        FROM (\n            SELECT "task_id", SUM("total") AS "total", SUM("done") AS "done"\n            FROM (\n    SELECT "task_id", 1 AS "total", "done"::integer AS "done"\n    FROM "new_sub_tasks"\n) AS "changes"\n            GROUP BY "task_id"\n        ) AS "counts"\n        WHERE "workspace_task"."id" = "counts"."task_id"\n        AND ("counts"."total" != 0 OR "counts"."done" != 0);\n        RETURN NULL;\n      END;',
+                    hash="c0c72b3d8b9917c8173ced8a46e0aaadc8196b09",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_count_inserted_sub_tasks_94ffb",
+                    referencing="REFERENCING NEW TABLE AS new_sub_tasks ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="count_updated_sub_tasks",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func='\n      BEGIN\n        UPDATE "workspace_task"\n        SET "sub_tasks_total" = "workspace_task"."sub_tasks_total" + "counts"."total",\n            "sub_tasks_done" = "workspace_task"."sub_tasks_done" + "counts"."done"\n        FROM (\n            SELECT "task_id", SUM("total") AS "total", SUM("done") AS "done"\n            FROM (\n    SELECT "task_id", 1 AS "total", "done"::integer AS "done"\n    FROM "new_sub_tasks"\n UNION ALL \n    SELECT "task_id", -1 AS "total", -"done"::integer AS "done"\n    FROM "old_sub_tasks"\n) AS "changes"\n            GROUP BY "task_id"\n        ) AS "counts"\n        WHERE "workspace_task"."id" = "counts"."task_id"\n        AND ("counts"."total" != 0 OR "counts"."done" != 0);\n        RETURN NULL;\n      END;',
+                    hash="6d8efea20c89ae3345994f533f449fcf67327c10",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_count_updated_sub_tasks_4261b",
+                    referencing="REFERENCING OLD TABLE AS old_sub_tasks  NEW TABLE AS new_sub_tasks ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="count_deleted_sub_tasks",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func='\n      BEGIN\n        UPDATE "workspace_task"\n        SET "sub_tasks_total" = "workspace_task"."sub_tasks_total" + "counts"."total",\n            "sub_tasks_done" = "workspace_task"."sub_tasks_done" + "counts"."done"\n        FROM (\n            SELECT "task_id", SUM("total") AS "total", SUM("done") AS "done"\n            FROM (\n    SELECT "task_id", -1 AS "total", -"done"::integer AS "done"\n    FROM "old_sub_tasks"\n) AS "changes"\n            GROUP BY "task_id"\n        ) AS "counts"\n        WHERE "workspace_task"."id" = "counts"."task_id"\n        AND ("counts"."total" != 0 OR "counts"."done" != 0);\n        RETURN NULL;\n      END;',
+                    hash="e05fbde50a52e630467ce8257116a1f4b3e92c59",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_count_deleted_sub_tasks_1535e",
+                    referencing="REFERENCING OLD TABLE AS old_sub_tasks ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="read_only_sub_task_counts",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                IF pg_trigger_depth() = 1 THEN\n                    NEW.sub_tasks_total := OLD.sub_tasks_total;\n                    NEW.sub_tasks_done := OLD.sub_tasks_done;\n                END IF;\n                RETURN NEW;\n              END;",
+                    hash="b921ef13107029d3ba2d524670b25bcfe637a919",
+                    operation="UPDATE",
+                    pgid="pgtrigger_read_only_sub_task_counts_eee06",
+                    table="workspace_task",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+    ]
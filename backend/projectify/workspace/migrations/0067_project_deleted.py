@@ -0,0 +1,28 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Mark projects as deleted until they are purged."""
+# Generated by Django 5.1.15 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0066_task_sub_task_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="deleted",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="Deletion timestamp of this project. Its contents are purged in the background.",
+                null=True,
+            ),
+        ),
+    ]
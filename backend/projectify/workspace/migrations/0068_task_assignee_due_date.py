@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Index tasks by assignee and due date.
+
+The index is built concurrently, so that writing tasks isn't blocked while
+it is built.
+"""
+# Generated by Django 5.1.15 on 2026-10-19 14:04
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    atomic = False
+
+    dependencies = [
+        ("workspace", "0067_project_deleted"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["assignee", "due_date"], name="task_assignee_due_date"
+            ),
+        ),
+    ]
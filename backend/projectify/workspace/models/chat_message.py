@@ -27,11 +27,13 @@ class ChatMessageQuerySet(models.QuerySet["ChatMessage"]):
         self, user: AbstractBaseUser, uuid: uuid.UUID
     ) -> Self:
         """Get for a specific team member and uuid."""
-        kwargs = {
-            "task__section__project__" "workspace__users": user,
-            "uuid": uuid,
-        }
-        return self.filter(**kwargs)
+        return self.filter(
+            task__workspace_id__in=TeamMember.objects.workspace_pks_for_user(
+                user
+            ),
+            task__section__project__deleted__isnull=True,
+            uuid=uuid,
+        )
 
 
 class ChatMessage(BaseModel):
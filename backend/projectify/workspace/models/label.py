@@ -12,6 +12,7 @@ from django.utils.translation import gettext_lazy as _
 
 from projectify.lib.models import BaseModel
 
+from .team_member import TeamMember
 from .types import Pks
 from .workspace import Workspace as Workspace
 
@@ -29,7 +30,10 @@ class LabelQuerySet(models.QuerySet["Label"]):
         self, user: AbstractBaseUser, uuid: uuid.UUID
     ) -> Self:
         """Return for matching team member and uuid."""
-        return self.filter(workspace__users=user, uuid=uuid)
+        return self.filter(
+            workspace_id__in=TeamMember.objects.workspace_pks_for_user(user),
+            uuid=uuid,
+        )
 
 
 class Label(BaseModel):
@@ -41,6 +41,15 @@ class Project(TitleDescriptionModel, BaseModel):
         blank=True,
         help_text=_("Due date for this workspace board"),
     )
+    deleted = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "Deletion timestamp of this project. Its contents are purged "
+            "in the background."
+        ),
+    )
 
     if TYPE_CHECKING:
         # Related managers
@@ -50,6 +59,8 @@ class Project(TitleDescriptionModel, BaseModel):
         get_section_order: GetOrder
         set_section_order: SetOrder
 
+        workspace_id: int
+
     def __str__(self) -> str:
         """Return title."""
         return self.title
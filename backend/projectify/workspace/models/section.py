@@ -4,7 +4,7 @@
 """Section model."""
 
 import uuid
-from typing import TYPE_CHECKING, Callable, ClassVar, Self, cast
+from typing import TYPE_CHECKING, Callable, ClassVar, Optional, Self, cast
 
 from django.contrib.auth.models import AbstractBaseUser
 from django.db import models
@@ -12,6 +12,7 @@ from django.db import models
 from projectify.lib.models import BaseModel, TitleDescriptionModel
 
 from .task import Task
+from .team_member import TeamMember
 from .types import GetOrder, Pks, SetOrder
 
 if TYPE_CHECKING:
@@ -31,7 +32,13 @@ class SectionQuerySet(models.QuerySet["Section"]):
         self, user: AbstractBaseUser, uuid: uuid.UUID
     ) -> Self:
         """Return a workspace for user and uuid."""
-        return self.filter(project__workspace__users=user, uuid=uuid)
+        return self.filter(
+            project__workspace_id__in=TeamMember.objects.workspace_pks_for_user(
+                user
+            ),
+            project__deleted__isnull=True,
+            uuid=uuid,
+        )
 
 
 class Section(TitleDescriptionModel, BaseModel):
@@ -44,6 +51,10 @@ class Section(TitleDescriptionModel, BaseModel):
         SectionQuerySet.as_manager(),
     )
 
+    # Optional annotation keying the section's cached fragment on the
+    # project page, see section_versions_get
+    version: Optional[str] = None
+
     if TYPE_CHECKING:
         # Related managers
         task_set: RelatedManager["Task"]
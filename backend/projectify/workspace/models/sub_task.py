@@ -10,12 +10,43 @@ from django.contrib.auth.models import AbstractBaseUser
 from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
+import pgtrigger
+
 from projectify.lib.models import BaseModel, TitleDescriptionModel
 
 from .task import Task
+from .team_member import TeamMember
 from .types import Pks
 from .workspace import Workspace as Workspace
 
+# Rows to add to and subtract from their tasks' sub task counts
+_ADDED = """
+    SELECT "task_id", 1 AS "total", "done"::integer AS "done"
+    FROM "new_sub_tasks"
+"""
+_REMOVED = """
+    SELECT "task_id", -1 AS "total", -"done"::integer AS "done"
+    FROM "old_sub_tasks"
+"""
+
+
+def _count_sub_tasks(changes: str) -> str:
+    """Return a trigger function applying changes to Task's counts."""
+    return f"""
+      BEGIN
+        UPDATE "workspace_task"
+        SET "sub_tasks_total" = "workspace_task"."sub_tasks_total" + "counts"."total",
+            "sub_tasks_done" = "workspace_task"."sub_tasks_done" + "counts"."done"
+        FROM (
+            SELECT "task_id", SUM("total") AS "total", SUM("done") AS "done"
+            FROM ({changes}) AS "changes"
+            GROUP BY "task_id"
+        ) AS "counts"
+        WHERE "workspace_task"."id" = "counts"."task_id"
+        AND ("counts"."total" != 0 OR "counts"."done" != 0);
+        RETURN NULL;
+      END;"""
+
 
 class SubTaskQuerySet(models.QuerySet["SubTask"]):
     """Sub task queryset."""
@@ -28,11 +59,13 @@ class SubTaskQuerySet(models.QuerySet["SubTask"]):
         self, user: AbstractBaseUser, uuid: uuid.UUID
     ) -> Self:
         """Get sub task for a certain user and sub task uuid."""
-        kwargs = {
-            "task__section__project__" "workspace__users": user,
-            "uuid": uuid,
-        }
-        return self.filter(**kwargs)
+        return self.filter(
+            task__workspace_id__in=TeamMember.objects.workspace_pks_for_user(
+                user
+            ),
+            task__section__project__deleted__isnull=True,
+            uuid=uuid,
+        )
 
 
 class SubTask(TitleDescriptionModel, BaseModel):
@@ -88,3 +121,34 @@ class SubTask(TitleDescriptionModel, BaseModel):
                 deferrable=models.Deferrable.DEFERRED,
             )
         ]
+        # Keep Task.sub_tasks_total and Task.sub_tasks_done up to date. These
+        # run once per statement, so that bulk operations and COPY only
+        # update each task once.
+        triggers = (
+            pgtrigger.Trigger(
+                name="count_inserted_sub_tasks",
+                level=pgtrigger.Statement,
+                when=pgtrigger.After,
+                operation=pgtrigger.Insert,
+                referencing=pgtrigger.Referencing(new="new_sub_tasks"),
+                func=_count_sub_tasks(_ADDED),
+            ),
+            pgtrigger.Trigger(
+                name="count_updated_sub_tasks",
+                level=pgtrigger.Statement,
+                when=pgtrigger.After,
+                operation=pgtrigger.Update,
+                referencing=pgtrigger.Referencing(
+                    old="old_sub_tasks", new="new_sub_tasks"
+                ),
+                func=_count_sub_tasks(f"{_ADDED} UNION ALL {_REMOVED}"),
+            ),
+            pgtrigger.Trigger(
+                name="count_deleted_sub_tasks",
+                level=pgtrigger.Statement,
+                when=pgtrigger.After,
+                operation=pgtrigger.Delete,
+                referencing=pgtrigger.Referencing(old="old_sub_tasks"),
+                func=_count_sub_tasks(_REMOVED),
+            ),
+        )
@@ -62,6 +62,21 @@ class Task(TitleDescriptionModel, BaseModel):
 
     number = models.PositiveIntegerField()
 
+    # Maintained by the triggers on SubTask, so that boards don't have to
+    # count sub tasks
+    sub_tasks_total = models.PositiveIntegerField(
+        default=0,
+        db_default=0,
+        editable=False,
+        help_text=_("Number of sub tasks"),
+    )
+    sub_tasks_done = models.PositiveIntegerField(
+        default=0,
+        db_default=0,
+        editable=False,
+        help_text=_("Number of sub tasks that are done"),
+    )
+
     if TYPE_CHECKING:
         # Related fields
         subtask_set: RelatedManager["SubTask"]
@@ -73,6 +88,15 @@ class Task(TitleDescriptionModel, BaseModel):
         set_subtask_order: SetOrder
         _order: int
         id: int
+        workspace_id: int
+        section_id: int
+
+    @property
+    def sub_task_progress(self) -> Optional[float]:
+        """Return the share of sub tasks done, or None without sub tasks."""
+        if self.sub_tasks_total == 0:
+            return None
+        return self.sub_tasks_done / self.sub_tasks_total
 
     def get_next_section(self) -> "Section":
         """Return instance of the next section."""
@@ -94,6 +118,13 @@ class Task(TitleDescriptionModel, BaseModel):
         """Meta."""
 
         order_with_respect_to = "section"
+        indexes = [
+            # For listing the tasks assigned to a user by due date
+            models.Index(
+                fields=["assignee", "due_date"],
+                name="task_assignee_due_date",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["section", "_order"],
@@ -149,4 +180,20 @@ class Task(TitleDescriptionModel, BaseModel):
                         RETURN NEW;
                       END;""",
             ),
+            # Saving a task loaded before its sub tasks changed must not
+            # overwrite the counts. Only the SubTask triggers, which run
+            # nested, may change them.
+            pgtrigger.Trigger(
+                name="read_only_sub_task_counts",
+                when=pgtrigger.Before,
+                operation=pgtrigger.Update,
+                func="""
+              BEGIN
+                IF pg_trigger_depth() = 1 THEN
+                    NEW.sub_tasks_total := OLD.sub_tasks_total;
+                    NEW.sub_tasks_done := OLD.sub_tasks_done;
+                END IF;
+                RETURN NEW;
+              END;""",
+            ),
         )
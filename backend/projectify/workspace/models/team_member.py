@@ -21,6 +21,7 @@ from .workspace import Workspace
 
 if TYPE_CHECKING:
     from django.db.models.fields.related import RelatedField  # noqa: F401
+    from django.db.models.query import ValuesQuerySet  # noqa: F401
 
     from projectify.user.models import User, UserInvite  # noqa: F401
 
@@ -34,7 +35,20 @@ class TeamMemberQuerySet(models.QuerySet["TeamMember"]):
 
     def filter_by_user(self, user: AbstractBaseUser) -> Self:
         """Filter team members based on this user's workspaces."""
-        return self.filter(workspace__users=user)
+        return self.filter(workspace_id__in=self.workspace_pks_for_user(user))
+
+    def workspace_pks_for_user(
+        self, user: AbstractBaseUser
+    ) -> "ValuesQuerySet[TeamMember, int]":
+        """
+        Return the pks of this user's workspaces, to be used as a subquery.
+
+        Access checks filter with workspace_id__in on it. Together with the
+        denormalized Task.workspace this is a single lookup on the
+        (workspace, user) unique index, instead of joining every model up to
+        the workspace and then its team members.
+        """
+        return self.filter(user=user).values_list("workspace_id", flat=True)
 
 
 class TeamMember(BaseModel):
@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Change log selectors.
+
+Every change signal for a workspace, project or task gets the next sequence
+number of that resource, see
+projectify.workspace.services.signals.change_log_append. Clients remember
+the last sequence number they have seen and pass it when they subscribe
+again after reconnecting. Then only resources that changed in the meantime
+are sent again.
+
+Since a changed resource is always sent as a whole, the log only needs to
+store the latest sequence number per resource. Everything before it is
+implied. The log is kept in the shared cache, like workspace versions. A
+sequence number lost to cache eviction or expiry only causes the client to
+resync.
+"""
+
+import time
+from typing import Literal, Optional, cast
+from uuid import UUID
+
+from django.core.cache import cache
+
+from projectify.workspace.types import Resource
+
+# How long, in seconds, a resource's sequence number is kept after its log
+# was started. Clients are expected to reconnect within minutes, and resync
+# when they come back later than this
+CHANGE_LOG_TIMEOUT = 60 * 60 * 24
+
+
+def change_log_key(resource: Resource, uuid: UUID) -> str:
+    """Return the cache key for a resource's latest sequence number."""
+    return f"change-log-{resource}-{uuid}"
+
+
+def change_log_start() -> int:
+    """
+    Return the sequence number to start a resource's log at.
+
+    Starting at the current time in microseconds keeps sequence numbers
+    increasing when a log is started again after its cache key was lost,
+    since no resource changes more than once per microsecond. This stays
+    below 2 ** 53, so that JavaScript clients read it exactly.
+    """
+    return time.time_ns() // 1_000
+
+
+def change_log_sequence_get(*, resource: Resource, uuid: UUID) -> int:
+    """Return a resource's latest sequence number, starting a new log."""
+    sequence = cache.get_or_set(
+        change_log_key(resource, uuid),
+        change_log_start,
+        timeout=CHANGE_LOG_TIMEOUT,
+    )
+    return cast(int, sequence)
+
+
+def change_log_missed(
+    *, resource: Resource, uuid: UUID, since: int
+) -> tuple[Literal["up_to_date", "changed", "resync"], int]:
+    """
+    Return what a client that last saw sequence number since has missed.
+
+    Returns "up_to_date" if nothing changed, "changed" if the resource
+    changed since then, and "resync" if the log can't tell, for example
+    because it was evicted. The second value is the latest sequence number.
+    """
+    sequence: Optional[int] = cache.get(change_log_key(resource, uuid))
+    if sequence is None or since > sequence:
+        return "resync", change_log_sequence_get(resource=resource, uuid=uuid)
+    if since == sequence:
+        return "up_to_date", sequence
+    return "changed", sequence
@@ -0,0 +1,16 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Chat message selectors."""
+
+from django.db.models import QuerySet
+
+from ..models.chat_message import ChatMessage
+from ..models.task import Task
+
+
+def chat_message_find_for_task(*, task: Task) -> QuerySet[ChatMessage]:
+    """Find a task's chat messages, including their authors."""
+    return ChatMessage.objects.filter(task=task).select_related(
+        "author", "author__user"
+    )
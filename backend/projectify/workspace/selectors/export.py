@@ -0,0 +1,220 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Workspace export selectors.
+
+Exports read a whole workspace, so nothing here loads more than
+EXPORT_CHUNK_SIZE rows at a time. Rows are read with server-side cursors
+using .iterator() and turned into plain dicts one by one. Related objects are
+referred to by their uuid, for example as section_uuid, instead of being
+nested.
+"""
+
+from collections.abc import Iterator
+from typing import Any, Literal
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import F
+
+from projectify.lib.query_budget import query_budget
+from projectify.lib.streaming import encode_csv, encode_jsonl
+
+from ..models.chat_message import ChatMessage
+from ..models.label import Label
+from ..models.project import Project
+from ..models.section import Section
+from ..models.sub_task import SubTask
+from ..models.task import Task
+from ..models.task_label import TaskLabel
+from ..models.team_member import TeamMember
+from ..models.workspace import Workspace
+
+# How many rows are fetched from a server-side cursor at once
+EXPORT_CHUNK_SIZE = 1000
+
+# Columns of workspace_export_task_rows, in order
+EXPORT_TASK_COLUMNS = (
+    "project",
+    "section",
+    "number",
+    "title",
+    "description",
+    "assignee",
+    "labels",
+    "due_date",
+    "sub_tasks_done",
+    "sub_tasks_total",
+    "created",
+    "modified",
+)
+
+
+@query_budget(8)
+def workspace_export_records(
+    *, workspace: Workspace
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield everything in a workspace as flat records.
+
+    Every record has a type. Records come in dependency order, so a record
+    only refers to records that came before it.
+    """
+    yield {
+        "type": "workspace",
+        "uuid": workspace.uuid,
+        "title": workspace.title,
+        "description": workspace.description,
+        "created": workspace.created,
+    }
+    querysets = (
+        (
+            "team_member",
+            TeamMember.objects.filter(workspace=workspace).values(
+                "uuid", "role", "job_title", email=F("user__email")
+            ),
+        ),
+        (
+            "label",
+            Label.objects.filter(workspace=workspace).values(
+                "uuid", "name", "color"
+            ),
+        ),
+        (
+            "project",
+            Project.objects.filter(
+                workspace=workspace, deleted__isnull=True
+            ).values(
+                "uuid",
+                "title",
+                "description",
+                "archived",
+                "due_date",
+                "created",
+            ),
+        ),
+        (
+            "section",
+            Section.objects.filter(
+                project__workspace=workspace, project__deleted__isnull=True
+            ).values(
+                "uuid",
+                "title",
+                "description",
+                "_order",
+                project_uuid=F("project__uuid"),
+            ),
+        ),
+        (
+            "task",
+            Task.objects.filter(
+                workspace=workspace, section__project__deleted__isnull=True
+            ).values(
+                "uuid",
+                "number",
+                "title",
+                "description",
+                "_order",
+                "due_date",
+                "created",
+                "modified",
+                section_uuid=F("section__uuid"),
+                assignee_uuid=F("assignee__uuid"),
+            ),
+        ),
+        (
+            "task_label",
+            TaskLabel.objects.filter(
+                task__workspace=workspace,
+                task__section__project__deleted__isnull=True,
+            ).values(task_uuid=F("task__uuid"), label_uuid=F("label__uuid")),
+        ),
+        (
+            "sub_task",
+            SubTask.objects.filter(
+                task__workspace=workspace,
+                task__section__project__deleted__isnull=True,
+            ).values(
+                "uuid",
+                "title",
+                "description",
+                "done",
+                "_order",
+                task_uuid=F("task__uuid"),
+            ),
+        ),
+        (
+            "chat_message",
+            ChatMessage.objects.filter(
+                task__workspace=workspace,
+                task__section__project__deleted__isnull=True,
+            ).values(
+                "uuid",
+                "text",
+                "created",
+                task_uuid=F("task__uuid"),
+                author_uuid=F("author__uuid"),
+            ),
+        ),
+    )
+    for record_type, qs in querysets:
+        for row in qs.order_by("pk").iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield {"type": record_type, **row}
+
+
+def workspace_export_task_rows(
+    *, workspace: Workspace
+) -> Iterator[dict[str, Any]]:
+    """Yield one row per task, with EXPORT_TASK_COLUMNS as keys."""
+    qs = (
+        Task.objects.filter(
+            workspace=workspace, section__project__deleted__isnull=True
+        )
+        .annotate(
+            labels_joined=StringAgg(
+                "labels__name", delimiter=", ", ordering="labels__name"
+            )
+        )
+        .order_by("section__project__created", "section___order", "_order")
+        .values(
+            "number",
+            "title",
+            "description",
+            "due_date",
+            "sub_tasks_done",
+            "sub_tasks_total",
+            "created",
+            "modified",
+            "labels_joined",
+            project_title=F("section__project__title"),
+            section_title=F("section__title"),
+            assignee_email=F("assignee__user__email"),
+        )
+    )
+    for row in qs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row["project"] = row.pop("project_title")
+        row["section"] = row.pop("section_title")
+        row["assignee"] = row.pop("assignee_email")
+        row["labels"] = row.pop("labels_joined") or ""
+        yield {column: row[column] for column in EXPORT_TASK_COLUMNS}
+
+
+ExportFormat = Literal["jsonl", "csv"]
+
+
+def workspace_export(
+    *, workspace: Workspace, file_format: ExportFormat
+) -> Iterator[bytes]:
+    """
+    Export a workspace, chunk by chunk.
+
+    JSON lines contain every record. CSV contains one row per task.
+    """
+    match file_format:
+        case "jsonl":
+            return encode_jsonl(workspace_export_records(workspace=workspace))
+        case "csv":
+            return encode_csv(
+                workspace_export_task_rows(workspace=workspace),
+                EXPORT_TASK_COLUMNS,
+            )
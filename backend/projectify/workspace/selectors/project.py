@@ -6,11 +6,11 @@
 from typing import Optional
 from uuid import UUID
 
-from django.db.models import Count, Prefetch, Q, QuerySet
-from django.db.models.functions import NullIf
+from django.db.models import Prefetch, QuerySet
 
 from projectify.user.models import User
 from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
 
 from ..models.project import Project
 
@@ -18,14 +18,7 @@ ProjectDetailQuerySet = Project.objects.prefetch_related(
     "section_set",
     Prefetch(
         "section_set__task_set",
-        queryset=Task.objects.annotate(
-            sub_task_progress=Count(
-                "subtask",
-                filter=Q(subtask__done=True),
-            )
-            * 1.0
-            / NullIf(Count("subtask"), 0),
-        ).order_by("_order"),
+        queryset=Task.objects.order_by("_order"),
     ),
     "section_set__task_set__assignee",
     "section_set__task_set__assignee__user",
@@ -33,7 +26,9 @@ ProjectDetailQuerySet = Project.objects.prefetch_related(
     "workspace__label_set",
     Prefetch(
         "workspace__project_set",
-        queryset=Project.objects.filter(archived__isnull=True),
+        queryset=Project.objects.filter(
+            archived__isnull=True, deleted__isnull=True
+        ),
     ),
     "workspace__teammember_set",
     "workspace__teammember_set__user",
@@ -48,7 +43,9 @@ def project_find_by_workspace_uuid(
 ) -> QuerySet[Project]:
     """Find projects for a workspace."""
     qs = Project.objects.filter(
-        workspace__users=who, workspace__uuid=workspace_uuid
+        workspace__users=who,
+        workspace__uuid=workspace_uuid,
+        deleted__isnull=True,
     )
     if archived is not None:
         qs = qs.filter(archived__isnull=not archived)
@@ -65,8 +62,28 @@ def project_find_by_project_uuid(
     """Find a workspace by uuid for a given user."""
     qs = Project.objects.all() if qs is None else qs
     qs = qs.filter(archived__isnull=not archived)
-    qs = qs.filter(workspace__users=who, uuid=project_uuid)
+    qs = qs.filter(
+        workspace_id__in=TeamMember.objects.workspace_pks_for_user(who),
+        uuid=project_uuid,
+        deleted__isnull=True,
+    )
     try:
         return qs.get()
     except Project.DoesNotExist:
         return None
+
+
+def project_workspace_pk_find_by_project_uuid(
+    *, project_uuid: UUID, who: User
+) -> Optional[int]:
+    """Return the workspace pk of a project, if the user can find it."""
+    return (
+        Project.objects.filter(
+            workspace_id__in=TeamMember.objects.workspace_pks_for_user(who),
+            uuid=project_uuid,
+            archived__isnull=True,
+            deleted__isnull=True,
+        )
+        .values_list("workspace_id", flat=True)
+        .first()
+    )
@@ -111,22 +111,32 @@ def get_workspace_resource_count(
         case "ChatMessage":
             # XXX At the moment, chat messages are not supported
             return ChatMessage.objects.filter(
-                task__workspace=workspace
+                task__workspace=workspace,
+                task__section__project__deleted__isnull=True,
             ).count()
         case "Label":
             return Label.objects.filter(workspace=workspace).count()
         case "SubTask":
-            return SubTask.objects.filter(task__workspace=workspace).count()
+            return SubTask.objects.filter(
+                task__workspace=workspace,
+                task__section__project__deleted__isnull=True,
+            ).count()
         case "Task":
             return Task.objects.filter(
-                section__project__workspace=workspace
+                section__project__workspace=workspace,
+                section__project__deleted__isnull=True,
             ).count()
         case "TaskLabel":
-            return TaskLabel.objects.filter(label__workspace=workspace).count()
+            return TaskLabel.objects.filter(
+                label__workspace=workspace,
+                task__section__project__deleted__isnull=True,
+            ).count()
         case "Project":
-            return workspace.project_set.count()
+            return workspace.project_set.filter(deleted__isnull=True).count()
         case "Section":
-            return Section.objects.filter(project__workspace=workspace).count()
+            return Section.objects.filter(
+                project__workspace=workspace, project__deleted__isnull=True
+            ).count()
         case "TeamMemberAndInvite":
             user_count = workspace.users.count()
             invite_count = workspace.teammemberinvite_set.filter(
@@ -10,6 +10,7 @@ from django.db.models import QuerySet
 
 from projectify.user.models import User
 from projectify.workspace.models.section import Section
+from projectify.workspace.models.team_member import TeamMember
 
 SectionDetailQuerySet = Section.objects.prefetch_related(
     "task_set",
@@ -38,7 +39,10 @@ def section_find_for_user_and_uuid(
         qs = Section.objects
     try:
         return qs.filter(
-            project__workspace__users=user,
+            project__workspace_id__in=TeamMember.objects.workspace_pks_for_user(
+                user
+            ),
+            project__deleted__isnull=True,
             uuid=section_uuid,
         ).get()
     except Section.DoesNotExist:
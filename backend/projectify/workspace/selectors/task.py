@@ -3,16 +3,21 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Workspace selectors."""
 
-from typing import Optional
+from typing import Literal, Optional, Sequence
 from uuid import UUID
 
-from django.db.models import Count, Prefetch, Q, QuerySet
-from django.db.models.functions import NullIf
+from django.db.models import F, Prefetch, QuerySet, Window
+from django.db.models.functions import RowNumber
 
 from projectify.user.models import User
 
 from ..models.chat_message import ChatMessage
 from ..models.task import Task
+from ..models.team_member import TeamMember
+
+# How many of a task's latest chat messages its detail contains. Older ones
+# are available through ChatMessageList.
+CHAT_MESSAGE_WINDOW = 20
 
 TaskDetailQuerySet: QuerySet[Task] = (
     Task.objects.select_related(
@@ -30,18 +35,79 @@ TaskDetailQuerySet: QuerySet[Task] = (
             queryset=ChatMessage.objects.select_related(
                 "author",
                 "author__user",
-            ),
+            )
+            .alias(
+                recency=Window(
+                    RowNumber(),
+                    partition_by=F("task_id"),
+                    order_by=(F("created").desc(), F("pk").desc()),
+                )
+            )
+            .filter(recency__lte=CHAT_MESSAGE_WINDOW)
+            .order_by("created", "pk"),
         ),
     )
-    .annotate(
-        sub_task_progress=Count(
-            "subtask",
-            filter=Q(subtask__done=True),
+)
+
+
+def task_find_assigned_to_user(
+    *, who: User, order_by: Literal["due_date", "-due_date"] = "due_date"
+) -> QuerySet[Task]:
+    """
+    Find the tasks assigned to a user in all of their workspaces.
+
+    Only loads what TaskAssignedSerializer needs. Being assigned implies
+    being a team member, so no further access check is needed. Tasks
+    without due date come last. The (assignee, due_date) index on Task
+    serves both filtering and sorting.
+    """
+    due_date = F("due_date")
+    return (
+        Task.objects.filter(
+            assignee__user=who,
+            section__project__archived__isnull=True,
+            section__project__deleted__isnull=True,
+        )
+        .select_related("section__project", "workspace")
+        .only(
+            "uuid",
+            "number",
+            "title",
+            "due_date",
+            "sub_tasks_done",
+            "sub_tasks_total",
+            "section__uuid",
+            "section__title",
+            "section__project__uuid",
+            "section__project__title",
+            "workspace__uuid",
+            "workspace__title",
+        )
+        .order_by(
+            due_date.desc(nulls_last=True)
+            if order_by == "-due_date"
+            else due_date.asc(nulls_last=True),
+            "pk",
+        )
+    )
+
+
+def task_find_by_task_uuids(
+    *, task_uuids: Sequence[UUID], who: User
+) -> list[Task]:
+    """
+    Find several tasks given a user and uuids.
+
+    Checks access to all of them in one query. Tasks that can't be found are
+    left out, callers compare the result with what they asked for.
+    """
+    return list(
+        Task.objects.select_related("section__project__workspace").filter(
+            workspace_id__in=TeamMember.objects.workspace_pks_for_user(who),
+            section__project__deleted__isnull=True,
+            uuid__in=task_uuids,
         )
-        * 1.0
-        / NullIf(Count("subtask"), 0),
     )
-)
 
 
 def task_find_by_task_uuid(
@@ -53,8 +119,24 @@ def task_find_by_task_uuid(
     qs = Task.objects if qs is None else qs
     try:
         return qs.get(
-            section__project__workspace__users=who,
+            workspace_id__in=TeamMember.objects.workspace_pks_for_user(who),
+            section__project__deleted__isnull=True,
             uuid=task_uuid,
         )
     except Task.DoesNotExist:
         return None
+
+
+def task_workspace_pk_find_by_task_uuid(
+    *, task_uuid: UUID, who: User
+) -> Optional[int]:
+    """Return the workspace pk of a task, if the user can find it."""
+    return (
+        Task.objects.filter(
+            workspace_id__in=TeamMember.objects.workspace_pks_for_user(who),
+            section__project__deleted__isnull=True,
+            uuid=task_uuid,
+        )
+        .values_list("workspace_id", flat=True)
+        .first()
+    )
@@ -27,7 +27,8 @@ def team_member_find_by_team_member_uuid(
     """Find team member by UUID according to user access permissions."""
     try:
         return TeamMember.objects.select_related("user").get(
-            workspace__users=who, uuid=team_member_uuid
+            workspace_id__in=TeamMember.objects.workspace_pks_for_user(who),
+            uuid=team_member_uuid,
         )
     except TeamMember.DoesNotExist:
         return None
@@ -0,0 +1,146 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Workspace version selectors.
+
+Every workspace has a version token stored in the cache. The token changes
+whenever anything in the workspace changes, see
+projectify.workspace.services.signals.workspace_version_bump. Detail views
+derive their ETag from it, which lets them answer conditional GET requests
+without loading and serializing the resource.
+
+A single version per workspace is coarse, but the project and workspace
+details contain the workspace quota, which changes with every task, label or
+project created anywhere in the workspace.
+
+Sections have versions of their own, which key the cached section fragments
+of the project page, see section_version_bump in the same module as
+workspace_version_bump.
+"""
+
+import hashlib
+from collections.abc import Sequence
+from typing import Optional
+from uuid import UUID, uuid4
+
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+from projectify.user.models import User
+from projectify.workspace.models.project import Project
+from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.models.workspace import Workspace
+from projectify.workspace.types import Resource
+
+# How long, in seconds, version tokens are kept. An expired token is
+# replaced by a new one, which only causes clients to refetch once
+VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def workspace_version_key(workspace_id: int) -> str:
+    """Return the cache key for a workspace's version."""
+    return f"workspace-version-{workspace_id}"
+
+
+def workspace_version_get(*, workspace_id: int) -> str:
+    """
+    Return the current version token for a workspace.
+
+    A missing token, for example after the cache was flushed or the token
+    expired, is replaced by a new random one, which only causes clients to
+    refetch.
+    """
+    version = cache.get_or_set(
+        workspace_version_key(workspace_id),
+        lambda: uuid4().hex,
+        timeout=VERSION_TIMEOUT,
+    )
+    return str(version)
+
+
+def section_version_key(section_id: int) -> str:
+    """Return the cache key for a section's version."""
+    return f"section-version-{section_id}"
+
+
+def section_versions_get(*, section_ids: Sequence[int]) -> dict[int, str]:
+    """
+    Return the current version tokens of many sections.
+
+    Fetches all tokens at once. Missing ones, also the ones that expired,
+    are replaced by new random ones, like workspace_version_get does.
+    """
+    keys = {
+        section_version_key(section_id): section_id
+        for section_id in section_ids
+    }
+    versions = {
+        keys[key]: str(version)
+        for key, version in cache.get_many(keys).items()
+    }
+    missing = {
+        key: uuid4().hex
+        for key, section_id in keys.items()
+        if section_id not in versions
+    }
+    if missing:
+        cache.set_many(missing, timeout=VERSION_TIMEOUT)
+        versions.update(
+            (keys[key], version) for key, version in missing.items()
+        )
+    return versions
+
+
+def resource_etag_find(
+    *, who: User, resource: Resource, uuid: UUID
+) -> Optional[str]:
+    """
+    Return the ETag for a resource's detail, if who can see it.
+
+    Runs a single query that checks access, matching the detail selectors.
+    The version is read before the resource is loaded, so that a change
+    committed in between results in an outdated ETag and not in outdated
+    content with a current ETag.
+    """
+    workspace_id: Optional[int]
+    match resource:
+        case "workspace":
+            workspace_id = (
+                Workspace.objects.filter(users=who, uuid=uuid)
+                .values_list("pk", flat=True)
+                .first()
+            )
+        case "project":
+            workspace_id = (
+                Project.objects.filter(
+                    workspace_id__in=TeamMember.objects.workspace_pks_for_user(
+                        who
+                    ),
+                    uuid=uuid,
+                    archived__isnull=True,
+                    deleted__isnull=True,
+                )
+                .values_list("workspace_id", flat=True)
+                .first()
+            )
+        case "task":
+            workspace_id = (
+                Task.objects.filter(
+                    workspace_id__in=TeamMember.objects.workspace_pks_for_user(
+                        who
+                    ),
+                    section__project__deleted__isnull=True,
+                    uuid=uuid,
+                )
+                .values_list("workspace_id", flat=True)
+                .first()
+            )
+    if workspace_id is None:
+        return None
+    version = workspace_version_get(workspace_id=workspace_id)
+    digest = hashlib.sha256(
+        f"{resource}:{uuid}:{who.pk}:{version}".encode()
+    ).hexdigest()
+    return quote_etag(digest[:32])
@@ -23,7 +23,9 @@ WorkspaceDetailQuerySet = Workspace.objects.prefetch_related(
 ).prefetch_related(
     Prefetch(
         "project_set",
-        queryset=Project.objects.filter(archived__isnull=True),
+        queryset=Project.objects.filter(
+            archived__isnull=True, deleted__isnull=True
+        ),
     ),
     Prefetch(
         "teammember_set",
@@ -67,3 +69,15 @@ def workspace_find_by_workspace_uuid(
     except Workspace.DoesNotExist:
         logger.warning("No workspace found for uuid %s", workspace_uuid)
         return None
+
+
+def workspace_pk_find_by_workspace_uuid(
+    *, workspace_uuid: UUID, who: User
+) -> Optional[int]:
+    """Return the pk of a workspace, if the user can find it."""
+    return (
+        workspace_find_for_user(who=who)
+        .filter(uuid=workspace_uuid)
+        .values_list("id", flat=True)
+        .first()
+    )
@@ -0,0 +1,263 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Fast read-only representations.
+
+The detail serializers nest several levels of ModelSerializers. DRF binds,
+looks up and calls every field of every nested instance, which adds up with
+thousands of tasks in a project, and the change consumer does this for every
+subscriber on every change.
+
+The functions here build the same dicts as the serializers by hand. The
+serializers call them in to_representation, so that their fields still
+describe the OpenAPI schema. When changing a serializer's fields, change the
+matching function as well. test_fast.py checks that both produce the same
+output.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from django.utils import timezone
+
+from projectify import utils
+from projectify.user.models import User
+
+from ..models.chat_message import ChatMessage
+from ..models.label import Label
+from ..models.project import Project
+from ..models.section import Section
+from ..models.sub_task import SubTask
+from ..models.task import Task
+from ..models.team_member import TeamMember
+from ..models.workspace import Workspace
+from ..types import Quota, WorkspaceQuota
+
+
+def datetime_representation(value: Optional[datetime]) -> Optional[str]:
+    """Represent a datetime like DRF's DateTimeField."""
+    if value is None:
+        return None
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    ret = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if ret.endswith("+00:00"):
+        ret = ret[:-6] + "Z"
+    return ret
+
+
+def user_representation(user: User) -> dict[str, Any]:
+    """Represent a user like UserSerializer."""
+    return {
+        "email": user.email,
+        "preferred_name": user.preferred_name,
+        "profile_picture": utils.crop_image(user.profile_picture, 100, 100),
+    }
+
+
+def team_member_representation(team_member: TeamMember) -> dict[str, Any]:
+    """Represent a team member like TeamMemberBaseSerializer."""
+    return {
+        "user": user_representation(team_member.user),
+        "uuid": str(team_member.uuid),
+        "role": str(team_member.role),
+    }
+
+
+def label_representation(label: Label) -> dict[str, Any]:
+    """Represent a label like LabelBaseSerializer."""
+    return {
+        "name": label.name,
+        "color": label.color,
+        "uuid": str(label.uuid),
+    }
+
+
+def quota_representation(quota: Quota) -> dict[str, Any]:
+    """Represent a quota like SingleQuotaSerializer."""
+    return {
+        "current": quota.current,
+        "limit": quota.limit,
+        "can_create_more": quota.can_create_more,
+    }
+
+
+def workspace_quota_representation(
+    quota: Optional[WorkspaceQuota],
+) -> Optional[dict[str, Any]]:
+    """Represent workspace quotas like WorkspaceQuotaSerializer."""
+    if quota is None:
+        return None
+    return {
+        "workspace_status": quota.workspace_status,
+        "chat_messages": quota_representation(quota.chat_messages),
+        "labels": quota_representation(quota.labels),
+        "sub_tasks": quota_representation(quota.sub_tasks),
+        "tasks": quota_representation(quota.tasks),
+        "task_labels": quota_representation(quota.task_labels),
+        "projects": quota_representation(quota.projects),
+        "sections": quota_representation(quota.sections),
+        "team_members_and_invites": quota_representation(
+            quota.team_members_and_invites
+        ),
+    }
+
+
+def workspace_detail_representation(workspace: Workspace) -> dict[str, Any]:
+    """Represent a workspace like WorkspaceDetailSerializer."""
+    return {
+        "uuid": str(workspace.uuid),
+        "title": workspace.title,
+        "description": workspace.description,
+        "picture": utils.crop_image(workspace.picture, 100, 100),
+        "team_members": [
+            {
+                "user": user_representation(team_member.user),
+                "uuid": str(team_member.uuid),
+                "role": str(team_member.role),
+                "job_title": team_member.job_title,
+            }
+            for team_member in workspace.teammember_set.all()
+        ],
+        "team_member_invites": [
+            {
+                "email": invite.user_invite.email,
+                "created": datetime_representation(invite.created),
+            }
+            for invite in workspace.teammemberinvite_set.all()
+        ],
+        "projects": [
+            {
+                "title": project.title,
+                "description": project.description,
+                "uuid": str(project.uuid),
+                "archived": datetime_representation(project.archived),
+            }
+            for project in workspace.project_set.all()
+        ],
+        "labels": [
+            label_representation(label) for label in workspace.label_set.all()
+        ],
+        "quota": workspace_quota_representation(workspace.quota),
+    }
+
+
+def project_detail_task_representation(task: Task) -> dict[str, Any]:
+    """Represent a task like ProjectDetailTaskSerializer."""
+    progress = task.sub_task_progress
+    assignee = task.assignee
+    return {
+        "title": task.title,
+        "uuid": str(task.uuid),
+        "due_date": datetime_representation(task.due_date),
+        "number": task.number,
+        "labels": [label_representation(label) for label in task.labels.all()],
+        "assignee": None
+        if assignee is None
+        else team_member_representation(assignee),
+        "sub_task_progress": progress,
+        "description": task.description,
+    }
+
+
+def project_detail_section_representation(section: Section) -> dict[str, Any]:
+    """Represent a section like ProjectDetailSectionSerializer."""
+    return {
+        "uuid": str(section.uuid),
+        "_order": section._order,
+        "title": section.title,
+        "description": section.description,
+        "tasks": [
+            project_detail_task_representation(task)
+            for task in section.task_set.all()
+        ],
+    }
+
+
+def project_detail_representation(project: Project) -> dict[str, Any]:
+    """Represent a project like ProjectDetailSerializer."""
+    return {
+        "title": project.title,
+        "description": project.description,
+        "uuid": str(project.uuid),
+        "archived": datetime_representation(project.archived),
+        "sections": [
+            project_detail_section_representation(section)
+            for section in project.section_set.all()
+        ],
+        "workspace": workspace_detail_representation(project.workspace),
+    }
+
+
+def sub_task_representation(sub_task: SubTask) -> dict[str, Any]:
+    """Represent a sub task like SubTaskBaseSerializer."""
+    return {
+        "created": datetime_representation(sub_task.created),
+        "modified": datetime_representation(sub_task.modified),
+        "title": sub_task.title,
+        "description": sub_task.description,
+        "uuid": str(sub_task.uuid),
+        "done": sub_task.done,
+        "_order": sub_task._order,
+    }
+
+
+def chat_message_representation(chat_message: ChatMessage) -> dict[str, Any]:
+    """Represent a chat message like ChatMessageBaseSerializer."""
+    author = chat_message.author
+    return {
+        "created": datetime_representation(chat_message.created),
+        "modified": datetime_representation(chat_message.modified),
+        "uuid": str(chat_message.uuid),
+        "text": chat_message.text,
+        "author": None
+        if author is None
+        else team_member_representation(author),
+    }
+
+
+def task_detail_representation(task: Task) -> dict[str, Any]:
+    """Represent a task like TaskDetailSerializer."""
+    assignee = task.assignee
+    section = task.section
+    project = section.project
+    workspace = project.workspace
+    return {
+        "created": datetime_representation(task.created),
+        "modified": datetime_representation(task.modified),
+        "title": task.title,
+        "description": task.description,
+        "_order": task._order,
+        "uuid": str(task.uuid),
+        "due_date": datetime_representation(task.due_date),
+        "number": task.number,
+        "sub_tasks": [
+            sub_task_representation(sub_task)
+            for sub_task in task.subtask_set.all()
+        ],
+        "labels": [label_representation(label) for label in task.labels.all()],
+        "assignee": None
+        if assignee is None
+        else team_member_representation(assignee),
+        "chat_messages": [
+            chat_message_representation(chat_message)
+            for chat_message in task.chatmessage_set.all()
+        ],
+        "section": {
+            "title": section.title,
+            "uuid": str(section.uuid),
+            "project": {
+                "title": project.title,
+                "uuid": str(project.uuid),
+                "workspace": {
+                    "title": workspace.title,
+                    "uuid": str(workspace.uuid),
+                },
+                "description": project.description,
+                "due_date": datetime_representation(project.due_date),
+            },
+            "description": section.description,
+            "_order": section._order,
+        },
+    }
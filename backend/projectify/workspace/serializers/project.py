@@ -3,6 +3,8 @@
 # SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """Project serializers."""
 
+from typing import Any, cast
+
 from rest_framework import serializers
 
 from projectify.user.serializers import UserSerializer
@@ -13,6 +15,7 @@ from ..models.task import Task
 from ..models.team_member import TeamMember
 from ..serializers.base import LabelBaseSerializer, ProjectBaseSerializer
 from ..serializers.workspace import WorkspaceDetailSerializer
+from . import fast
 
 
 class ProjectTaskAssigneeSerializer(serializers.ModelSerializer[TeamMember]):
@@ -104,6 +107,10 @@ class ProjectDetailSerializer(ProjectBaseSerializer):
 
     workspace = WorkspaceDetailSerializer(read_only=True)
 
+    def to_representation(self, instance: object) -> dict[str, Any]:
+        """Use the equivalent, faster hand written representation."""
+        return fast.project_detail_representation(cast(Project, instance))
+
     class Meta(ProjectBaseSerializer.Meta):
         """Meta."""
 
@@ -6,6 +6,7 @@
 from rest_framework import serializers
 
 from projectify.user.serializers import UserSerializer
+from projectify.workspace.models.task import Task
 from projectify.workspace.models.team_member import TeamMember
 
 from . import base
@@ -48,3 +49,37 @@ class TaskWithSubTaskSerializer(base.TaskBaseSerializer):
             "labels",
             "assignee",
         )
+
+
+class TaskLocationSerializer(serializers.Serializer):
+    """Serialize where a task can be found, by uuid and title."""
+
+    uuid = serializers.UUIDField(read_only=True)
+    title = serializers.CharField(read_only=True)
+
+
+class TaskAssignedSerializer(serializers.ModelSerializer[Task]):
+    """Serialize a task assigned to a user, across workspaces."""
+
+    sub_task_progress = serializers.FloatField(allow_null=True)
+    section = TaskLocationSerializer(read_only=True)
+    project = TaskLocationSerializer(read_only=True, source="section.project")
+    workspace = TaskLocationSerializer(read_only=True)
+
+    class Meta:
+        """Meta."""
+
+        model = Task
+        fields = (
+            "uuid",
+            "number",
+            "title",
+            "due_date",
+            "sub_task_progress",
+            "section",
+            "project",
+            "workspace",
+        )
+        extra_kwargs = {
+            "due_date": {"required": True},
+        }
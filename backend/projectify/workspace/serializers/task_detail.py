@@ -10,7 +10,7 @@ because ws board section requires importing the task serializer.
 
 from collections import Counter
 from collections.abc import Sequence
-from typing import Any, Optional, TypedDict
+from typing import Any, Optional, TypedDict, cast
 from uuid import UUID
 
 from django.utils.translation import gettext_lazy as _
@@ -37,6 +37,7 @@ from ..services.sub_task import (
     ValidatedDatum,
     ValidatedDatumWithUuid,
 )
+from . import fast
 from .task import TaskWithSubTaskSerializer
 
 
@@ -105,8 +106,8 @@ class TaskDetailSerializer(TaskWithSubTaskSerializer):
     """
     Serialize all task details.
 
-    Serializes up to the workspace in one direction, and all chat messages,
-    labels and sub task in the other direction.
+    Serializes up to the workspace in one direction, and the latest chat
+    messages, labels and sub task in the other direction.
     """
 
     chat_messages = ChatMessageBaseSerializer(
@@ -114,6 +115,10 @@ class TaskDetailSerializer(TaskWithSubTaskSerializer):
     )
     section = TaskDetailSectionSerializer(read_only=True)
 
+    def to_representation(self, instance: object) -> dict[str, Any]:
+        """Use the equivalent, faster hand written representation."""
+        return fast.task_detail_representation(cast(Task, instance))
+
     class Meta(TaskWithSubTaskSerializer.Meta):
         """Meta."""
 
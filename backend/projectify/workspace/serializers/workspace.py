@@ -3,13 +3,16 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Workspace serializers."""
 
+from typing import Any, cast
+
 from rest_framework import serializers
 
 from projectify.user.serializers import UserSerializer
 from projectify.workspace.models.project import Project
 from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.models.workspace import Workspace
 
-from . import base
+from . import base, fast
 
 
 class TeamMemberInviteSerializer(serializers.Serializer):
@@ -102,6 +105,10 @@ class WorkspaceDetailSerializer(base.WorkspaceBaseSerializer):
     )
     quota = WorkspaceQuotaSerializer()
 
+    def to_representation(self, instance: object) -> dict[str, Any]:
+        """Use the equivalent, faster hand written representation."""
+        return fast.workspace_detail_representation(cast(Workspace, instance))
+
     class Meta(base.WorkspaceBaseSerializer.Meta):
         """Meta."""
 
@@ -14,7 +14,7 @@ from projectify.workspace.models.task import Task
 from projectify.workspace.selectors.team_member import (
     team_member_find_for_workspace,
 )
-from projectify.workspace.services.signals import send_change_signal
+from projectify.workspace.services.signals import send_chat_message_signal
 
 
 # TODO this could take an author instead of who -> user is derived from author
@@ -33,5 +33,5 @@ def chat_message_create(
     instance = ChatMessage.objects.create(
         task=task, text=text, author=team_member
     )
-    send_change_signal("changed", task)
+    send_chat_message_signal(instance)
     return instance
@@ -3,17 +3,25 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Project services."""
 
+import logging
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
+from django.db import transaction
 from django.utils.timezone import now
 
 from projectify.lib.auth import validate_perm
 from projectify.user.models import User
 from projectify.workspace.models import Project
+from projectify.workspace.models.task import Task
 from projectify.workspace.models.workspace import Workspace
 from projectify.workspace.services.signals import send_change_signal
 
+logger = logging.getLogger(__name__)
+
+# How many tasks project_purge deletes per transaction
+PROJECT_PURGE_BATCH_SIZE = 500
+
 
 # Create
 # TODO atomic
@@ -60,16 +68,68 @@ def project_update(
 
 
 # Delete
-# TODO atomic
+@transaction.atomic
 def project_delete(*, who: User, project: Project) -> None:
-    """Delete a project."""
+    """
+    Delete a project.
+
+    The project is only marked as deleted here, which hides it from all
+    selectors. Its sections, tasks and everything belonging to them are
+    purged by a background job once the transaction commits.
+    """
+    # Avoid circular import, tasks imports this module
+    from projectify.workspace.tasks import project_purge_task
+
     validate_perm("workspace.delete_project", who, project.workspace)
-    project.delete()
+    project.deleted = now()
+    project.save()
+    project_pk = project.pk
+    transaction.on_commit(lambda: project_purge_task.delay(project_pk))
     # 1 + 1 query performance problem ?
     send_change_signal("changed", project.workspace)
     send_change_signal("gone", project)
 
 
+def project_purge(
+    *,
+    project: Project,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> None:
+    """
+    Purge a project marked as deleted.
+
+    Tasks are deleted in batches, each in its own transaction, so that large
+    projects are never loaded into memory at once and locks are held
+    briefly. Sub tasks, chat messages and task labels are deleted along with
+    their tasks in one statement each. An interrupted purge can be resumed by
+    calling this again.
+
+    on_progress is called with the number of tasks deleted so far and the
+    total number of tasks after each batch.
+    """
+    if project.deleted is None:
+        raise ValueError(f"Project {project} is not marked as deleted")
+    tasks = Task.objects.filter(section__project=project)
+    total = tasks.count()
+    purged = 0
+    while batch := list(
+        tasks.values_list("pk", flat=True)[:PROJECT_PURGE_BATCH_SIZE]
+    ):
+        with transaction.atomic():
+            Task.objects.filter(pk__in=batch).delete()
+        purged += len(batch)
+        logger.info(
+            "Purging project %s, deleted %d of %d tasks",
+            project.pk,
+            purged,
+            total,
+        )
+        if on_progress is not None:
+            on_progress(purged, total)
+    # Only sections remain
+    project.delete()
+
+
 # RPC
 # TODO atomic
 def project_archive(*, who: User, project: Project, archived: bool) -> Project:
@@ -10,7 +10,10 @@ from django.db import transaction
 from projectify.lib.auth import validate_perm
 from projectify.user.models import User
 from projectify.workspace.models import Project, Section
-from projectify.workspace.services.signals import send_change_signal
+from projectify.workspace.services.signals import (
+    section_version_bump,
+    send_change_signal,
+)
 
 
 # Create
@@ -52,6 +55,7 @@ def section_update(
     section.title = title
     section.description = description
     section.save()
+    section_version_bump(section_ids=[section.pk])
     send_change_signal("changed", section.project)
     return section
 
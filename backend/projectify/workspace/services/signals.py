@@ -3,15 +3,31 @@
 # SPDX-FileCopyrightText: 2024 JWP Consulting GK
 """Functions to handle signals."""
 
+from collections.abc import Iterable
 from typing import Any, Literal, Union, cast
+from uuid import UUID
+
+from django.core.cache import cache
+from django.db import transaction
 
 from asgiref.sync import async_to_sync as _async_to_sync
 from channels.layers import get_channel_layer
 
+from projectify.user.models import User
+
+from ..models.chat_message import ChatMessage
 from ..models.project import Project
 from ..models.task import Task
+from ..models.team_member import TeamMember
 from ..models.workspace import Workspace
-from ..types import ConsumerEvent, Resource
+from ..selectors.change_log import (
+    CHANGE_LOG_TIMEOUT,
+    change_log_key,
+    change_log_start,
+)
+from ..selectors.version import section_version_key, workspace_version_key
+from ..serializers.fast import chat_message_representation
+from ..types import ChatMessageEvent, ConsumerEvent, Resource
 
 # TODO AsyncToSync is typed in a newer (unreleased) version of asgiref
 # which we indirectly install with channels, which has not been
@@ -19,6 +35,46 @@ from ..types import ConsumerEvent, Resource
 async_to_sync = cast(Any, _async_to_sync)
 
 
+def workspace_version_bump(*, workspace_id: int) -> None:
+    """Change a workspace's version once the current transaction commits."""
+    transaction.on_commit(
+        lambda: cache.delete(workspace_version_key(workspace_id))
+    )
+
+
+def section_version_bump(*, section_ids: Iterable[int]) -> None:
+    """
+    Change sections' versions once the current transaction commits.
+
+    Bump whenever anything that the project page shows for a section
+    changes, such as its title or its tasks' titles and order.
+    """
+    keys = [section_version_key(section_id) for section_id in set(section_ids)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def workspace_version_bump_for_user(*, user: User) -> None:
+    """Change the version of every workspace that user is a member of."""
+    workspace_ids = TeamMember.objects.filter(user=user).values_list(
+        "workspace_id", flat=True
+    )
+    for workspace_id in workspace_ids:
+        workspace_version_bump(workspace_id=workspace_id)
+
+
+def change_log_append(*, resource: Resource, uuid: UUID) -> int:
+    """Log a change to a resource and return its new sequence number."""
+    key = change_log_key(resource, uuid)
+    cache.add(key, change_log_start(), timeout=CHANGE_LOG_TIMEOUT)
+    try:
+        return int(cache.incr(key))
+    except ValueError:
+        # Evicted in between, start over
+        sequence = change_log_start()
+        cache.set(key, sequence, timeout=CHANGE_LOG_TIMEOUT)
+        return sequence
+
+
 def send_change_signal(
     kind: Literal["changed", "gone"], object: Union[Workspace, Project, Task]
 ) -> None:
@@ -28,19 +84,52 @@ def send_change_signal(
         case Workspace():
             group = f"workspace-{object.uuid}"
             resource = "workspace"
+            workspace_id = object.pk
         case Project():
             group = f"project-{object.uuid}"
             resource = "project"
+            workspace_id = object.workspace_id
         case Task():
             group = f"task-{object.uuid}"
             resource = "task"
+            workspace_id = object.workspace_id
+    workspace_version_bump(workspace_id=workspace_id)
     event: ConsumerEvent = {
         "type": "change",
         "resource": resource,
         "uuid": str(object.uuid),
         "kind": kind,
     }
+    match kind:
+        case "changed":
+            event["sequence"] = change_log_append(
+                resource=resource, uuid=object.uuid
+            )
+        case "gone":
+            # A resource that is gone can't be subscribed to again
+            cache.delete(change_log_key(resource, object.uuid))
     channel_layer = get_channel_layer()
     if not channel_layer:
         raise Exception("Did not get channel layer")
     async_to_sync(channel_layer.group_send)(group, event)
+
+
+def send_chat_message_signal(chat_message: ChatMessage) -> None:
+    """
+    Send a new chat message to the task's subscribers.
+
+    Subscribers append the message to what they have, instead of reloading
+    the whole task.
+    """
+    task = chat_message.task
+    workspace_version_bump(workspace_id=task.workspace_id)
+    event: ChatMessageEvent = {
+        "type": "chat_message",
+        "uuid": str(task.uuid),
+        "content": chat_message_representation(chat_message),
+        "sequence": change_log_append(resource="task", uuid=task.uuid),
+    }
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        raise Exception("Did not get channel layer")
+    async_to_sync(channel_layer.group_send)(f"task-{task.uuid}", event)
@@ -8,19 +8,24 @@ from datetime import datetime
 from typing import Literal, Optional, Sequence, Union
 
 from django.db import transaction
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from projectify.lib.auth import validate_perm
+from projectify.lib.query_budget import query_budget
 from projectify.user.models import User
 
 from ..models.label import Label
+from ..models.project import Project
 from ..models.section import Section
 from ..models.task import Task
+from ..models.task_label import TaskLabel
 from ..models.team_member import TeamMember
-from ..services.signals import send_change_signal
+from ..models.workspace import Workspace
+from ..services.signals import section_version_bump, send_change_signal
 from ..services.sub_task import (
     ValidatedData,
     sub_task_create_many,
@@ -80,7 +85,7 @@ def task_create(
                 )
             }
         )
-    return Task.objects.create(
+    task = Task.objects.create(
         section=section,
         title=title,
         description=description,
@@ -88,6 +93,8 @@ def task_create(
         workspace=workspace,
         assignee=assignee,
     )
+    section_version_bump(section_ids=[section.pk])
+    return task
 
 
 # TODO make this the regular task_create
@@ -156,6 +163,7 @@ def task_update_nested(
             create_sub_tasks=sub_tasks["create_sub_tasks"] or [],
             update_sub_tasks=sub_tasks["update_sub_tasks"] or [],
         )
+    section_version_bump(section_ids=[task.section_id])
     send_change_signal("changed", task.section.project)
     send_change_signal("changed", task)
     return task
@@ -167,6 +175,7 @@ def task_delete(*, task: Task, who: User) -> None:
     """Delete a task."""
     validate_perm("workspace.delete_task", who, task.workspace)
     task.delete()
+    section_version_bump(section_ids=[task.section_id])
     send_change_signal("changed", task.section.project)
     send_change_signal("gone", task)
 
@@ -208,6 +217,7 @@ def task_move_in_direction(
     return task_move_after(who=who, task=task, after=neighbor)
 
 
+@query_budget(9)
 @transaction.atomic
 def task_move_after(
     *,
@@ -224,6 +234,7 @@ def task_move_after(
         case Section():
             section = after
             order = 0
+    section_version_bump(section_ids=[task.section_id, section.pk])
 
     # Lock tasks in own section
     neighbor_tasks = section.task_set.select_for_update()
@@ -250,3 +261,143 @@ def task_move_after(
     send_change_signal("changed", task.section.project)
     send_change_signal("changed", task)
     return task
+
+
+# Bulk
+def _tasks_project(tasks: Sequence[Task]) -> Project:
+    """Return the project all tasks belong to."""
+    projects = {task.section.project for task in tasks}
+    if len(projects) != 1:
+        raise serializers.ValidationError(
+            {"task_uuids": _("Tasks must all belong to the same project")}
+        )
+    (project,) = projects
+    return project
+
+
+def _tasks_changed(
+    kind: Literal["changed", "gone"],
+    projects: Sequence[Project],
+    tasks: Sequence[Task],
+) -> None:
+    """
+    Notify about many changed tasks with one signal per project.
+
+    Every task still gets a signal of its own, so that subscribers of its
+    detail see the change and its change log sequence number advances.
+    Clients that are slow to receive them get them coalesced in their send
+    queue, see projectify.workspace.consumers.ChangeConsumer.
+    """
+    section_version_bump(section_ids=[task.section_id for task in tasks])
+    for project in projects:
+        send_change_signal("changed", project)
+    for task in tasks:
+        send_change_signal(kind, task)
+
+
+@query_budget(9)
+@transaction.atomic
+def task_bulk_move_to_section(
+    *, who: User, tasks: Sequence[Task], section: Section
+) -> None:
+    """
+    Move tasks to the beginning of a section.
+
+    The tasks keep the order they had on the board.
+    """
+    project = _tasks_project(tasks)
+    workspace: Workspace = project.workspace
+    validate_perm("workspace.update_task", who, workspace)
+    if section.project.workspace_id != workspace.pk:
+        raise serializers.ValidationError(
+            {"section_uuid": _("The section belongs to a different workspace")}
+        )
+    moved = sorted(tasks, key=lambda task: (task.section._order, task._order))
+    moved_pks = [task.pk for task in moved]
+    section_version_bump(section_ids=[task.section_id for task in moved])
+    # Lock the destination's tasks, like task_move_after does
+    remaining = list(
+        section.task_set.select_for_update()
+        .exclude(pk__in=moved_pks)
+        .values_list("pk", flat=True)
+    )
+    Task.objects.filter(pk__in=moved_pks).update(
+        section=section, modified=now()
+    )
+    section.set_task_order(moved_pks + remaining)
+    for task in moved:
+        task.section = section
+    _tasks_changed(
+        "changed",
+        [project]
+        if section.project == project
+        else [project, section.project],
+        moved,
+    )
+
+
+@query_budget(7)
+@transaction.atomic
+def task_bulk_assign(
+    *, who: User, tasks: Sequence[Task], assignee: Optional[TeamMember]
+) -> None:
+    """Assign tasks to a team member, or unassign them."""
+    project = _tasks_project(tasks)
+    validate_perm("workspace.update_task", who, project.workspace)
+    if assignee and assignee.workspace != project.workspace:
+        raise serializers.ValidationError(
+            {
+                "assignee_uuid": _(
+                    "The team member to be assigned belongs to a different workspace"
+                )
+            }
+        )
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+        assignee=assignee, modified=now()
+    )
+    for task in tasks:
+        task.assignee = assignee
+    _tasks_changed("changed", [project], tasks)
+
+
+@query_budget(8)
+@transaction.atomic
+def task_bulk_label(
+    *,
+    who: User,
+    tasks: Sequence[Task],
+    add: Sequence[Label],
+    remove: Sequence[Label],
+) -> None:
+    """Add labels to and remove labels from tasks."""
+    project = _tasks_project(tasks)
+    validate_perm("workspace.update_task", who, project.workspace)
+    if any(label.workspace != project.workspace for label in (*add, *remove)):
+        raise serializers.ValidationError(
+            _("Labels must belong to the tasks' workspace")
+        )
+    task_pks = [task.pk for task in tasks]
+    if remove:
+        TaskLabel.objects.filter(
+            task__in=task_pks, label__in=[label.pk for label in remove]
+        ).delete()
+    if add:
+        TaskLabel.objects.bulk_create(
+            [
+                TaskLabel(task_id=task_pk, label=label)
+                for task_pk in task_pks
+                for label in add
+            ],
+            ignore_conflicts=True,
+        )
+    _tasks_changed("changed", [project], tasks)
+
+
+@query_budget(11)
+@transaction.atomic
+def task_bulk_delete(*, who: User, tasks: Sequence[Task]) -> None:
+    """Delete tasks."""
+    project = _tasks_project(tasks)
+    validate_perm("workspace.delete_task", who, project.workspace)
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+    _tasks_changed("gone", [project], tasks)
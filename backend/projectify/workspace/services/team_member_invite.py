@@ -3,6 +3,7 @@
 # SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """Team member invite services."""
 
+from collections.abc import Sequence
 from typing import Optional, Union
 
 from django.db import transaction
@@ -11,7 +12,8 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
 from projectify.lib.auth import validate_perm
-from projectify.premail.email import EmailAddress
+from projectify.lib.query_budget import query_budget
+from projectify.premail.email import EmailAddress, send_many
 from projectify.user.models import User, UserInvite
 from projectify.user.services.user_invite import user_invite_create
 from projectify.workspace.services.signals import send_change_signal
@@ -22,7 +24,9 @@ from ..models.const import TeamMemberRoles
 from ..models.team_member import TeamMember
 from ..models.team_member_invite import TeamMemberInvite
 from ..models.workspace import Workspace
+from ..selectors.quota import workspace_quota_for
 from ..services.workspace import workspace_add_user
+from ..types import InviteResult
 
 
 # TODO these could be better suited as selectors
@@ -148,6 +152,121 @@ def team_member_invite_create(
     return team_member_invite
 
 
+@query_budget(16)
+@transaction.atomic
+def team_member_invite_create_many(
+    *,
+    workspace: Workspace,
+    emails: Sequence[str],
+    who: User,
+) -> dict[str, InviteResult]:
+    """
+    Add or invite several team members by email address.
+
+    Handles every address like team_member_invite_create, but looks them all
+    up at once. Registered users are added right away, everyone else is
+    invited with one email each, sent together in a single task. Instead of
+    raising, addresses of team members and invitees are reported as
+    already_added or already_invited.
+
+    Raise a ValidationError if the new team members and invites together
+    don't fit into the workspace's quota.
+    """
+    validate_perm("workspace.create_team_member", who, workspace)
+    # Drop duplicates, but keep the order
+    emails = list(dict.fromkeys(emails))
+    users = {
+        user.email: user for user in User.objects.filter(email__in=emails)
+    }
+    added_user_ids = set(
+        workspace.teammember_set.filter(user__in=users.values()).values_list(
+            "user_id", flat=True
+        )
+    )
+    user_invites = {
+        user_invite.email: user_invite
+        for user_invite in UserInvite.objects.filter(
+            email__in=[email for email in emails if email not in users],
+            redeemed=False,
+        )
+    }
+    invited_user_invite_ids = set(
+        workspace.teammemberinvite_set.filter(
+            user_invite__in=user_invites.values()
+        ).values_list("user_invite_id", flat=True)
+    )
+
+    results: dict[str, InviteResult] = {}
+    new_team_members: list[TeamMember] = []
+    new_user_invites: list[UserInvite] = []
+    invite_emails: list[str] = []
+    for email in emails:
+        user = users.get(email)
+        user_invite = user_invites.get(email)
+        if user is not None:
+            if user.pk in added_user_ids:
+                results[email] = "already_added"
+                continue
+            new_team_members.append(
+                TeamMember(
+                    workspace=workspace,
+                    user=user,
+                    role=TeamMemberRoles.OBSERVER,
+                )
+            )
+            results[email] = "added"
+        elif user_invite is None:
+            new_user_invites.append(UserInvite(email=email))
+            invite_emails.append(email)
+            results[email] = "invited"
+        elif user_invite.pk in invited_user_invite_ids:
+            results[email] = "already_invited"
+        else:
+            invite_emails.append(email)
+            results[email] = "invited"
+
+    quota = workspace_quota_for(
+        resource="TeamMemberAndInvite", workspace=workspace
+    )
+    if (
+        quota.limit is not None
+        and quota.current is not None
+        and quota.current + len(new_team_members) + len(invite_emails)
+        > quota.limit
+    ):
+        raise serializers.ValidationError(
+            {
+                "emails": _(
+                    "Inviting this many team members would exceed the "
+                    "workspace's {limit} seats."
+                ).format(limit=quota.limit)
+            }
+        )
+    if not new_team_members and not invite_emails:
+        return results
+
+    TeamMember.objects.bulk_create(new_team_members)
+    for user_invite in UserInvite.objects.bulk_create(new_user_invites):
+        user_invites[user_invite.email] = user_invite
+    team_member_invites = TeamMemberInvite.objects.bulk_create(
+        TeamMemberInvite(workspace=workspace, user_invite=user_invites[email])
+        for email in invite_emails
+    )
+    send_many(
+        TeamMemberInviteEmail(
+            receiver=EmailAddress(email),
+            obj=team_member_invite,
+            who=who,
+        )
+        for email, team_member_invite in zip(
+            invite_emails, team_member_invites
+        )
+    )
+
+    send_change_signal("changed", workspace)
+    return results
+
+
 @transaction.atomic
 def team_member_invite_delete(
     *, who: User, workspace: Workspace, email: str
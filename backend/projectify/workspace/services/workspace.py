@@ -18,6 +18,7 @@ from rest_framework import serializers
 from projectify.corporate.services.customer import customer_create
 from projectify.lib.auth import validate_perm
 from projectify.user.models import User
+from projectify.workspace.services.project import project_purge
 from projectify.workspace.services.signals import send_change_signal
 
 from ..models.const import TeamMemberRoles
@@ -72,7 +73,6 @@ def workspace_update(
 
 
 # Delete
-@transaction.atomic
 def workspace_delete(
     *,
     who: User,
@@ -88,8 +88,21 @@ def workspace_delete(
     - No open invites
     - No boards
     - No labels
+
+    Projects that are deleted, but not purged yet, still protect the
+    workspace from being deleted. They are purged first, with every batch
+    committed on its own, and not as part of the transaction deleting the
+    workspace.
     """
     validate_perm("workspace.delete_workspace", who, workspace)
+    for project in workspace.project_set.filter(deleted__isnull=False):
+        project_purge(project=project)
+    _workspace_delete(workspace=workspace)
+
+
+@transaction.atomic
+def _workspace_delete(*, workspace: Workspace) -> None:
+    """Delete a workspace, if the rules in workspace_delete allow it."""
     if workspace.teammember_set.count() > 1:
         raise serializers.ValidationError(
             _("Can only delete workspace with one remaining team member")
@@ -98,7 +111,7 @@ def workspace_delete(
         raise serializers.ValidationError(
             _("Can only delete workspace with no outstanding invites")
         )
-    if workspace.project_set.exists():
+    if workspace.project_set.filter(deleted__isnull=True).exists():
         raise serializers.ValidationError(
             _("Can only delete workspace with no projects")
         )
@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Workspace tasks."""
+
+import logging
+
+from celery import Task
+
+from projectify.celery import app
+
+from .models.project import Project
+from .services.project import project_purge
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(bind=True)
+def project_purge_task(self: "Task[[int], None]", project_pk: int) -> None:
+    """Purge a deleted project, reporting progress as task state."""
+    project = Project.objects.filter(pk=project_pk).first()
+    if project is None:
+        logger.warning("Project %d was already purged", project_pk)
+        return
+
+    def on_progress(purged: int, total: int) -> None:
+        self.update_state(
+            state="PROGRESS", meta={"purged": purged, "total": total}
+        )
+
+    project_purge(project=project, on_progress=on_progress)
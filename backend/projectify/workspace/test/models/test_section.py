@@ -3,6 +3,8 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Section model tests."""
 
+from django.utils.timezone import now
+
 import pytest
 
 from ... import models
@@ -38,6 +40,12 @@ class TestSectionManager:
             section.uuid,
         ).get()
         assert actual == section
+        section.project.deleted = now()
+        section.project.save()
+        assert not models.Section.objects.filter_for_user_and_uuid(
+            team_member.user,
+            section.uuid,
+        ).exists()
 
 
 @pytest.mark.django_db
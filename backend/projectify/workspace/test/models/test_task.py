@@ -77,3 +77,18 @@ class TestTask:
         with pytest.raises(db.ProgrammingError):
             task.workspace = unrelated_workspace
             task.save()
+
+    def test_sub_task_counts(
+        self, task: models.Task, sub_task: models.SubTask
+    ) -> None:
+        """Test that saving a stale task keeps its sub task counts."""
+        stale = models.Task.objects.get(pk=task.pk)
+        assert stale.sub_tasks_total == 1
+        sub_task.delete()
+        stale.title = "Stale"
+        stale.save()
+        task.refresh_from_db()
+        assert task.title == "Stale"
+        assert task.sub_tasks_total == 0
+        assert task.sub_tasks_done == 0
+        assert task.sub_task_progress is None
@@ -52,6 +52,17 @@ class TestTeamMemberManager:
         )
         assert TeamMember.objects.filter_by_user(unrelated_user).count() == 2
 
+    def test_workspace_pks_for_user(
+        self,
+        workspace: Workspace,
+        unrelated_workspace: Workspace,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that only the user's workspaces are returned."""
+        assert list(
+            TeamMember.objects.workspace_pks_for_user(team_member.user)
+        ) == [workspace.pk]
+
 
 @pytest.mark.django_db
 class TestTeamMember:
@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test change log selectors."""
+
+import time
+
+from django.core.cache import cache
+
+import pytest
+
+from ...models.task import Task
+from ...selectors.change_log import (
+    CHANGE_LOG_TIMEOUT,
+    change_log_key,
+    change_log_missed,
+    change_log_sequence_get,
+)
+from ...services.signals import change_log_append, send_change_signal
+
+pytestmark = pytest.mark.django_db
+
+
+def test_change_log_missed(task: Task) -> None:
+    """Test telling what a client missed since a sequence number."""
+    cache.delete(change_log_key("task", task.uuid))
+    missed, sequence = change_log_missed(
+        resource="task", uuid=task.uuid, since=1
+    )
+    assert missed == "resync"
+    assert change_log_missed(
+        resource="task", uuid=task.uuid, since=sequence
+    ) == ("up_to_date", sequence)
+    assert change_log_append(resource="task", uuid=task.uuid) == sequence + 1
+    assert change_log_missed(
+        resource="task", uuid=task.uuid, since=sequence
+    ) == ("changed", sequence + 1)
+    assert change_log_missed(
+        resource="task", uuid=task.uuid, since=sequence + 2
+    ) == ("resync", sequence + 1)
+
+
+def test_change_log_restart(task: Task) -> None:
+    """Test that sequence numbers keep increasing when the log is lost."""
+    sequence = change_log_append(resource="task", uuid=task.uuid)
+    cache.delete(change_log_key("task", task.uuid))
+    assert change_log_sequence_get(resource="task", uuid=task.uuid) > sequence
+
+
+def test_change_log_expiry(
+    task: Task, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that clients resync once a sequence number has expired."""
+    sequence = change_log_append(resource="task", uuid=task.uuid)
+    later = time.time() + CHANGE_LOG_TIMEOUT + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    missed, latest = change_log_missed(
+        resource="task", uuid=task.uuid, since=sequence
+    )
+    assert missed == "resync"
+    assert latest > sequence
+
+
+def test_send_change_signal(task: Task) -> None:
+    """Test that change signals are logged until the resource is gone."""
+    sequence = change_log_sequence_get(resource="task", uuid=task.uuid)
+    send_change_signal("changed", task)
+    assert change_log_missed(
+        resource="task", uuid=task.uuid, since=sequence
+    ) == ("changed", sequence + 1)
+    send_change_signal("gone", task)
+    assert cache.get(change_log_key("task", task.uuid)) is None
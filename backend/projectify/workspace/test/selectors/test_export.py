@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test workspace export selectors."""
+
+import csv
+import io
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import pytest
+
+from projectify.lib import json
+
+from ...models.chat_message import ChatMessage
+from ...models.project import Project
+from ...models.sub_task import SubTask
+from ...models.task import Task
+from ...models.task_label import TaskLabel
+from ...models.workspace import Workspace
+from ...selectors.export import (
+    EXPORT_TASK_COLUMNS,
+    workspace_export,
+    workspace_export_records,
+    workspace_export_task_rows,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_workspace_export_records(
+    workspace: Workspace,
+    task_label: TaskLabel,
+    sub_task: SubTask,
+    chat_message: ChatMessage,
+    unrelated_task: Task,
+) -> None:
+    """Test that every record of a workspace is exported once."""
+    task = task_label.task
+    records = list(workspace_export_records(workspace=workspace))
+    assert list(dict.fromkeys(r["type"] for r in records)) == [
+        "workspace",
+        "team_member",
+        "label",
+        "project",
+        "section",
+        "task",
+        "task_label",
+        "sub_task",
+        "chat_message",
+    ]
+    by_type = {r["type"]: r for r in records}
+    assert by_type["workspace"]["uuid"] == workspace.uuid
+    assert by_type["task"]["uuid"] == task.uuid
+    assert by_type["task"]["section_uuid"] == task.section.uuid
+    assert by_type["task_label"] == {
+        "type": "task_label",
+        "task_uuid": task.uuid,
+        "label_uuid": task_label.label.uuid,
+    }
+    assert by_type["sub_task"]["uuid"] == sub_task.uuid
+    assert by_type["chat_message"]["uuid"] == chat_message.uuid
+
+
+def test_workspace_export_records_deleted_project(
+    workspace: Workspace, project: Project, task: Task
+) -> None:
+    """Test that projects pending deletion are left out."""
+    project.deleted = project.created
+    project.save()
+    types = {r["type"] for r in workspace_export_records(workspace=workspace)}
+    assert types == {"workspace", "team_member"}
+
+
+def test_workspace_export_task_rows(
+    workspace: Workspace, task_label: TaskLabel, sub_task: SubTask
+) -> None:
+    """Test that tasks are exported with labels and sub task counts."""
+    task = task_label.task
+    (row,) = workspace_export_task_rows(workspace=workspace)
+    assert tuple(row) == EXPORT_TASK_COLUMNS
+    assert row["title"] == task.title
+    assert row["labels"] == task_label.label.name
+    assert row["assignee"] == (
+        task.assignee.user.email if task.assignee else None
+    )
+    assert row["sub_tasks_total"] == 1
+
+
+def test_workspace_export(workspace: Workspace, task: Task) -> None:
+    """Test that both formats can be parsed back."""
+    jsonl = b"".join(
+        workspace_export(workspace=workspace, file_format="jsonl")
+    )
+    records = [json.loads(line) for line in jsonl.splitlines()]
+    assert records[0]["uuid"] == str(workspace.uuid)
+    text = b"".join(
+        workspace_export(workspace=workspace, file_format="csv")
+    ).decode()
+    (row,) = csv.DictReader(io.StringIO(text))
+    assert row["number"] == str(task.number)
+
+
+def test_exportworkspace_command(
+    workspace: Workspace, task: Task, tmp_path: Path
+) -> None:
+    """Test exporting a workspace to a file."""
+    output = tmp_path / "export.csv"
+    call_command(
+        "exportworkspace",
+        str(workspace.uuid),
+        file_format="csv",
+        output=str(output),
+    )
+    assert task.title in output.read_text()
+    with pytest.raises(CommandError):
+        call_command("exportworkspace", str(task.uuid))
@@ -12,6 +12,7 @@ from ...models.team_member import TeamMember
 from ...selectors.project import (
     project_find_by_project_uuid,
     project_find_by_workspace_uuid,
+    project_workspace_pk_find_by_project_uuid,
 )
 
 # So apparently this is also possible:
@@ -100,3 +101,30 @@ def test_project_find_by_project_uuid(
         who=team_member.user,
         archived=True,
     )
+
+
+def test_project_workspace_pk_find_by_project_uuid(
+    project: Project,
+    team_member: TeamMember,
+    unrelated_team_member: TeamMember,
+) -> None:
+    """Test finding a project's workspace pk for a user."""
+    assert (
+        project_workspace_pk_find_by_project_uuid(
+            project_uuid=project.uuid, who=team_member.user
+        )
+        == project.workspace_id
+    )
+    assert (
+        project_workspace_pk_find_by_project_uuid(
+            project_uuid=project.uuid, who=unrelated_team_member.user
+        )
+        is None
+    )
+    project_archive(who=team_member.user, project=project, archived=True)
+    assert (
+        project_workspace_pk_find_by_project_uuid(
+            project_uuid=project.uuid, who=team_member.user
+        )
+        is None
+    )
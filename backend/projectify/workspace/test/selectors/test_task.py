@@ -3,12 +3,25 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Test task selectors."""
 
+from datetime import datetime, timedelta
+from typing import Optional
+
 import pytest
 
 from projectify.user.models import User
+from projectify.workspace.models.const import TeamMemberRoles
+from projectify.workspace.models.section import Section
 from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
 from projectify.workspace.models.workspace import Workspace
-from projectify.workspace.selectors.task import task_find_by_task_uuid
+from projectify.workspace.selectors.task import (
+    task_find_assigned_to_user,
+    task_find_by_task_uuid,
+    task_workspace_pk_find_by_task_uuid,
+)
+from projectify.workspace.services.project import project_archive
+from projectify.workspace.services.task import task_create
+from projectify.workspace.services.workspace import workspace_add_user
 from pytest_types import DjangoAssertNumQueries
 
 
@@ -32,3 +45,78 @@ def test_task_find_by_task_uuid(
             task_find_by_task_uuid(who=meddling_user, task_uuid=task.uuid)
             is None
         )
+
+
+@pytest.mark.django_db
+def test_task_workspace_pk_find_by_task_uuid(
+    workspace: Workspace,
+    task: Task,
+    user: User,
+    meddling_user: User,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test that only the workspace pk is fetched."""
+    with django_assert_num_queries(1):
+        assert (
+            task_workspace_pk_find_by_task_uuid(who=user, task_uuid=task.uuid)
+            == workspace.pk
+        )
+    assert (
+        task_workspace_pk_find_by_task_uuid(
+            who=meddling_user, task_uuid=task.uuid
+        )
+        is None
+    )
+
+
+@pytest.mark.django_db
+def test_task_find_assigned_to_user(
+    user: User,
+    team_member: TeamMember,
+    section: Section,
+    unrelated_section: Section,
+    unrelated_team_member: TeamMember,
+    now: datetime,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test finding assigned tasks across workspaces."""
+    other_team_member = workspace_add_user(
+        workspace=unrelated_section.project.workspace,
+        user=user,
+        role=TeamMemberRoles.CONTRIBUTOR,
+    )
+
+    def create(
+        section: Section,
+        assignee: TeamMember,
+        due_date: Optional[datetime] = None,
+    ) -> Task:
+        return task_create(
+            who=assignee.user,
+            section=section,
+            title="Assigned",
+            assignee=assignee,
+            due_date=due_date,
+        )
+
+    later = create(section, team_member, due_date=now + timedelta(days=2))
+    undated = create(section, team_member)
+    sooner = create(
+        unrelated_section, other_team_member, due_date=now + timedelta(days=1)
+    )
+    create(unrelated_section, unrelated_team_member)
+    with django_assert_num_queries(1):
+        tasks = list(task_find_assigned_to_user(who=user))
+        assert all(
+            t.section.project.title and t.workspace.title for t in tasks
+        )
+    assert tasks == [sooner, later, undated]
+    assert list(
+        task_find_assigned_to_user(who=user, order_by="-due_date")
+    ) == [
+        later,
+        sooner,
+        undated,
+    ]
+    project_archive(who=user, project=section.project, archived=True)
+    assert list(task_find_assigned_to_user(who=user)) == [sooner]
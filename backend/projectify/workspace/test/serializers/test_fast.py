@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test that fast representations match their serializers."""
+
+from typing import Union
+
+from django.utils import timezone
+
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from ...models.chat_message import ChatMessage
+from ...models.label import Label
+from ...models.project import Project
+from ...models.sub_task import SubTask
+from ...models.task import Task
+from ...models.team_member import TeamMember
+from ...models.team_member_invite import TeamMemberInvite
+from ...models.workspace import Workspace
+from ...selectors.project import (
+    ProjectDetailQuerySet,
+    project_find_by_project_uuid,
+)
+from ...selectors.quota import workspace_get_all_quotas
+from ...selectors.task import TaskDetailQuerySet, task_find_by_task_uuid
+from ...selectors.workspace import (
+    WorkspaceDetailQuerySet,
+    workspace_find_by_workspace_uuid,
+)
+from ...serializers.project import ProjectDetailSerializer
+from ...serializers.task_detail import TaskDetailSerializer
+from ...serializers.workspace import WorkspaceDetailSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+def assert_parity(
+    serializer: Union[
+        WorkspaceDetailSerializer,
+        ProjectDetailSerializer,
+        TaskDetailSerializer,
+    ],
+) -> None:
+    """Assert that the fast and the generic representation are the same."""
+    # None of the serializers' bases override to_representation
+    expected = serializers.ModelSerializer.to_representation(
+        serializer, serializer.instance
+    )
+    actual = serializer.data
+    assert actual == expected
+    # Also compare field order
+    renderer = JSONRenderer()
+    assert renderer.render(actual) == renderer.render(expected)
+
+
+@pytest.fixture
+def populated(
+    task: Task,
+    other_task: Task,
+    team_member: TeamMember,
+    other_team_member: TeamMember,
+    team_member_invite: TeamMemberInvite,
+    archived_project: Project,
+    labels: list[Label],
+    sub_task: SubTask,
+    chat_message: ChatMessage,
+) -> Task:
+    """Return a task in a workspace with a bit of everything."""
+    del other_task, other_team_member, team_member_invite, archived_project
+    del sub_task
+    task.assignee = team_member
+    task.save()
+    task.labels.set(labels[:2])
+    # Chat messages outlive their authors
+    ChatMessage.objects.create(task=task, text="Orphaned", author=None)
+    chat_message.refresh_from_db()
+    return task
+
+
+@pytest.mark.parametrize("tz", ["UTC", "Asia/Tokyo"])
+def test_workspace_detail(
+    populated: Task, workspace: Workspace, team_member: TeamMember, tz: str
+) -> None:
+    """Test WorkspaceDetailSerializer with and without quota."""
+    del populated
+    instance = workspace_find_by_workspace_uuid(
+        who=team_member.user,
+        workspace_uuid=workspace.uuid,
+        qs=WorkspaceDetailQuerySet,
+    )
+    assert instance
+    with timezone.override(tz):
+        assert_parity(WorkspaceDetailSerializer(instance))
+        instance.quota = workspace_get_all_quotas(instance)
+        assert_parity(WorkspaceDetailSerializer(instance))
+
+
+@pytest.mark.parametrize("tz", ["UTC", "Asia/Tokyo"])
+def test_project_detail(
+    populated: Task, project: Project, team_member: TeamMember, tz: str
+) -> None:
+    """Test ProjectDetailSerializer."""
+    del populated
+    instance = project_find_by_project_uuid(
+        who=team_member.user,
+        project_uuid=project.uuid,
+        qs=ProjectDetailQuerySet,
+    )
+    assert instance
+    instance.workspace.quota = workspace_get_all_quotas(instance.workspace)
+    with timezone.override(tz):
+        assert_parity(ProjectDetailSerializer(instance))
+
+
+@pytest.mark.parametrize("tz", ["UTC", "Asia/Tokyo"])
+def test_task_detail(
+    populated: Task, other_task: Task, team_member: TeamMember, tz: str
+) -> None:
+    """Test TaskDetailSerializer with a full and an empty task."""
+    for task in populated, other_task:
+        instance = task_find_by_task_uuid(
+            who=team_member.user, task_uuid=task.uuid, qs=TaskDetailQuerySet
+        )
+        assert instance
+        with timezone.override(tz):
+            assert_parity(TaskDetailSerializer(instance))
@@ -5,9 +5,21 @@
 
 import pytest
 
+from projectify.workspace.models.chat_message import ChatMessage
 from projectify.workspace.models.project import Project
+from projectify.workspace.models.sub_task import SubTask
+from projectify.workspace.models.task import Task
+from projectify.workspace.models.task_label import TaskLabel
 from projectify.workspace.models.team_member import TeamMember
-from projectify.workspace.services.project import project_archive
+from projectify.workspace.selectors.project import project_find_by_project_uuid
+from projectify.workspace.selectors.quota import get_workspace_resource_count
+from projectify.workspace.selectors.task import task_find_by_task_uuid
+from projectify.workspace.services import project as project_services
+from projectify.workspace.services.project import (
+    project_archive,
+    project_delete,
+)
+from pytest_types import DjangoCaptureOnCommitCallbacks
 
 
 @pytest.mark.django_db
@@ -30,3 +42,40 @@ def test_unarchive(project: Project, team_member: TeamMember) -> None:
         who=team_member.user,
     )
     assert project.archived is None
+
+
+@pytest.mark.django_db
+def test_delete(
+    project: Project,
+    task: Task,
+    other_task: Task,
+    task_label: TaskLabel,
+    sub_task: SubTask,
+    chat_message: ChatMessage,
+    team_member: TeamMember,
+    monkeypatch: pytest.MonkeyPatch,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    """Test that deleted projects are hidden, then purged in batches."""
+    del sub_task, chat_message
+    workspace = project.workspace
+    assert get_workspace_resource_count("TaskLabel", workspace) == 1
+    monkeypatch.setattr(project_services, "PROJECT_PURGE_BATCH_SIZE", 1)
+    user = team_member.user
+    # The project is purged once the transaction commits
+    with django_capture_on_commit_callbacks(execute=True):
+        project_delete(who=user, project=project)
+        assert (
+            project_find_by_project_uuid(who=user, project_uuid=project.uuid)
+            is None
+        )
+        assert task_find_by_task_uuid(who=user, task_uuid=task.uuid) is None
+        # Until it is purged, its tasks' labels don't count for the quota
+        assert TaskLabel.objects.filter(pk=task_label.pk).exists()
+        assert get_workspace_resource_count("TaskLabel", workspace) == 0
+        assert Task.objects.filter(pk=other_task.pk).exists()
+    assert not Project.objects.filter(pk=project.pk).exists()
+    assert not Task.objects.filter(pk__in=(task.pk, other_task.pk)).exists()
+    assert not SubTask.objects.exists()
+    assert not ChatMessage.objects.exists()
+    assert not TaskLabel.objects.exists()
@@ -322,3 +322,39 @@ def test_create_and_change_order(
     )
     assert new_order[1] == b.uuid, new_order
     assert new_order[3] == a.uuid, new_order
+
+
+def test_sub_task_counts(
+    sub_tasks: Sequence[SubTask], task: Task, team_member: TeamMember
+) -> None:
+    """Test that tasks count their sub tasks."""
+    task.refresh_from_db()
+    assert task.sub_tasks_total == 5
+    assert task.sub_tasks_done == 0
+    assert task.sub_task_progress == 0.0
+    a, b, c, _d, _e = sub_tasks
+    sub_task_update_many(
+        create_sub_tasks=[{"title": "new", "done": True, "_order": 3}],
+        update_sub_tasks=[
+            {"uuid": sub_task.uuid, "title": "", "done": True, "_order": i}
+            for i, sub_task in enumerate((a, b, c))
+        ],
+        sub_tasks=sub_tasks,
+        who=team_member.user,
+        task=task,
+    )
+    task.refresh_from_db()
+    assert task.sub_tasks_total == 4
+    assert task.sub_tasks_done == 4
+    assert task.sub_task_progress == 1.0
+    sub_task_update_many(
+        create_sub_tasks=[],
+        update_sub_tasks=[],
+        sub_tasks=list(task.subtask_set.all()),
+        who=team_member.user,
+        task=task,
+    )
+    task.refresh_from_db()
+    assert task.sub_tasks_total == 0
+    assert task.sub_tasks_done == 0
+    assert task.sub_task_progress is None
@@ -4,6 +4,7 @@
 """Test task services."""
 
 from datetime import datetime
+from typing import Union
 
 import pytest
 from rest_framework import exceptions
@@ -17,8 +18,14 @@ from ...models.sub_task import SubTask
 from ...models.task import Task
 from ...models.team_member import TeamMember
 from ...models.workspace import Workspace
+from ...selectors.change_log import change_log_missed, change_log_sequence_get
+from ...services import task as task_services
 from ...services.task import (
     task_assign_labels,
+    task_bulk_assign,
+    task_bulk_delete,
+    task_bulk_label,
+    task_bulk_move_to_section,
     task_create,
     task_create_nested,
     task_move_after,
@@ -317,3 +324,142 @@ def test_moving_task_to_empty_section(
     ]
     task.refresh_from_db()
     assert task._order == 0
+
+
+def test_bulk_move_to_section(
+    section: Section,
+    other_section: Section,
+    task: Task,
+    other_task: Task,
+    team_member: TeamMember,
+) -> None:
+    """Test that moved tasks keep their order, in front of other tasks."""
+    other_section_task = task_create(
+        who=team_member.user, title="don't care", section=other_section
+    )
+    task_bulk_move_to_section(
+        who=team_member.user,
+        tasks=[other_task, task],
+        section=other_section,
+    )
+    assert list(other_section.task_set.all()) == [
+        task,
+        other_task,
+        other_section_task,
+    ]
+    assert not section.task_set.exists()
+
+
+def test_bulk_move_to_unrelated_section(
+    task: Task, unrelated_section: Section, team_member: TeamMember
+) -> None:
+    """Test that tasks can't be moved to another workspace."""
+    with pytest.raises(exceptions.ValidationError):
+        task_bulk_move_to_section(
+            who=team_member.user, tasks=[task], section=unrelated_section
+        )
+
+
+def test_bulk_move_from_several_projects(
+    task: Task,
+    unrelated_task: Task,
+    section: Section,
+    team_member: TeamMember,
+) -> None:
+    """Test that only tasks of one project can be changed together."""
+    with pytest.raises(exceptions.ValidationError):
+        task_bulk_move_to_section(
+            who=team_member.user, tasks=[task, unrelated_task], section=section
+        )
+
+
+def test_bulk_assign(
+    task: Task,
+    other_task: Task,
+    team_member: TeamMember,
+    unrelated_team_member: TeamMember,
+) -> None:
+    """Test assigning and unassigning tasks."""
+    tasks = [task, other_task]
+    task_bulk_assign(who=team_member.user, tasks=tasks, assignee=team_member)
+    assert Task.objects.filter(assignee=team_member).count() == 2
+    task_bulk_assign(who=team_member.user, tasks=tasks, assignee=None)
+    assert Task.objects.filter(assignee__isnull=True).count() == 2
+    with pytest.raises(exceptions.ValidationError):
+        task_bulk_assign(
+            who=team_member.user, tasks=tasks, assignee=unrelated_team_member
+        )
+
+
+def test_bulk_label(
+    task: Task,
+    other_task: Task,
+    labels: list[Label],
+    unrelated_label: Label,
+    team_member: TeamMember,
+) -> None:
+    """Test adding and removing labels."""
+    a, b, c, _d, _e = labels
+    task_assign_labels(task=task, labels=[a])
+    task_bulk_label(
+        who=team_member.user, tasks=[task, other_task], add=[a, b], remove=[]
+    )
+    assert set(task.labels.all()) == {a, b}
+    assert set(other_task.labels.all()) == {a, b}
+    task_bulk_label(
+        who=team_member.user, tasks=[task, other_task], add=[c], remove=[a]
+    )
+    assert set(task.labels.all()) == {b, c}
+    assert set(other_task.labels.all()) == {b, c}
+    with pytest.raises(exceptions.ValidationError):
+        task_bulk_label(
+            who=team_member.user,
+            tasks=[task],
+            add=[unrelated_label],
+            remove=[],
+        )
+
+
+def test_bulk_delete(
+    task: Task, other_task: Task, sub_task: SubTask, team_member: TeamMember
+) -> None:
+    """Test deleting tasks."""
+    task_bulk_delete(who=team_member.user, tasks=[task, other_task])
+    assert not Task.objects.filter(pk__in=[task.pk, other_task.pk]).exists()
+    assert not SubTask.objects.filter(pk=sub_task.pk).exists()
+
+
+def test_bulk_signals(
+    project: Project,
+    task: Task,
+    other_task: Task,
+    team_member: TeamMember,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the project and every task are notified."""
+    sequence = change_log_sequence_get(resource="task", uuid=task.uuid)
+    task_bulk_assign(who=team_member.user, tasks=[task], assignee=team_member)
+    # Clients resuming from before the change learn about it
+    assert change_log_missed(
+        resource="task", uuid=task.uuid, since=sequence
+    ) == ("changed", sequence + 1)
+    sent: list[tuple[str, Union[Project, Task]]] = []
+    monkeypatch.setattr(
+        task_services,
+        "send_change_signal",
+        lambda kind, object: sent.append((kind, object)),
+    )
+    tasks = [task, other_task]
+    task_bulk_assign(who=team_member.user, tasks=tasks, assignee=None)
+    assert sent == [
+        ("changed", project),
+        ("changed", task),
+        ("changed", other_task),
+    ]
+    sent.clear()
+    task_bulk_delete(who=team_member.user, tasks=tasks)
+    assert sent == [
+        ("changed", project),
+        ("gone", task),
+        ("gone", other_task),
+    ]
@@ -16,8 +16,10 @@ from projectify.workspace.models.workspace import Workspace
 from projectify.workspace.services.team_member import team_member_delete
 from projectify.workspace.services.team_member_invite import (
     team_member_invite_create,
+    team_member_invite_create_many,
     team_member_invite_delete,
 )
+from pytest_types import Mailbox
 
 from ...exceptions import UserAlreadyAdded, UserAlreadyInvited
 
@@ -256,3 +258,112 @@ class TestAddOrInviteTeamMember:
         # Now, no new invites are created, so the count shall stay the same
         assert TeamMemberInvite.objects.count() == 1
         assert UserInvite.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestTeamMemberInviteCreateMany:
+    """Test team_member_invite_create_many."""
+
+    def test_create_many(
+        self,
+        workspace: Workspace,
+        team_member: TeamMember,
+        unrelated_user: User,
+        mailoutbox: Mailbox,
+    ) -> None:
+        """Test adding, inviting and skipping in one go."""
+        team_member_invite_create(
+            who=team_member.user,
+            workspace=workspace,
+            email_or_user="invited@example.com",
+        )
+        mailoutbox_count = len(mailoutbox)
+        members = workspace.teammember_set.count()
+        results = team_member_invite_create_many(
+            who=team_member.user,
+            workspace=workspace,
+            emails=[
+                "new@example.com",
+                unrelated_user.email,
+                team_member.user.email,
+                "invited@example.com",
+                "new@example.com",
+            ],
+        )
+        assert results == {
+            "new@example.com": "invited",
+            unrelated_user.email: "added",
+            team_member.user.email: "already_added",
+            "invited@example.com": "already_invited",
+        }
+        assert workspace.teammember_set.count() == members + 1
+        assert workspace.teammemberinvite_set.count() == 2
+        assert len(mailoutbox) == mailoutbox_count + 1
+        assert mailoutbox[-1].to == ["new@example.com"]
+        # Invitees join once they sign up
+        user_create(email="new@example.com")
+        assert workspace.teammember_set.count() == members + 2
+
+    def test_existing_user_invite(
+        self,
+        workspace: Workspace,
+        team_member: TeamMember,
+        unrelated_workspace: Workspace,
+        unrelated_user: User,
+    ) -> None:
+        """Test that user invites from other workspaces are reused."""
+        team_member_invite_create(
+            who=unrelated_user,
+            workspace=unrelated_workspace,
+            email_or_user="hello@example.com",
+        )
+        results = team_member_invite_create_many(
+            who=team_member.user,
+            workspace=workspace,
+            emails=["hello@example.com"],
+        )
+        assert results == {"hello@example.com": "invited"}
+        assert UserInvite.objects.count() == 1
+        assert TeamMemberInvite.objects.count() == 2
+
+    def test_quota(
+        self, workspace: Workspace, team_member: TeamMember
+    ) -> None:
+        """Test that nobody is invited if not everyone fits."""
+        with pytest.raises(serializers.ValidationError) as error:
+            team_member_invite_create_many(
+                who=team_member.user,
+                workspace=workspace,
+                emails=[f"user{i}@example.com" for i in range(10)],
+            )
+        assert error.match("10 seats")
+        assert UserInvite.objects.count() == 0
+        assert TeamMemberInvite.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_redeem_invites_to_many_workspaces(
+    faker: Faker,
+    user: User,
+    workspace: Workspace,
+    unrelated_user: User,
+    unrelated_workspace: Workspace,
+) -> None:
+    """Test that signing up adds a user to every workspace at once."""
+    email = faker.email()
+    team_member_invite_create(
+        who=user, workspace=workspace, email_or_user=email
+    )
+    team_member_invite_create(
+        who=unrelated_user, workspace=unrelated_workspace, email_or_user=email
+    )
+    new_user = user_create(email=email)
+    assert workspace.users.filter(pk=new_user.pk).exists()
+    assert unrelated_workspace.users.filter(pk=new_user.pk).exists()
+    assert not TeamMemberInvite.objects.filter(redeemed=False).exists()
+    assert not TeamMemberInvite.objects.filter(
+        redeemed_when__isnull=True
+    ).exists()
+    user_invite = UserInvite.objects.get(email=email)
+    assert user_invite.redeemed
+    assert user_invite.user == new_user
@@ -7,7 +7,7 @@
 # - replace .disconnect() calls with clean_up_communicator
 # - put instance .delete() calls in each fixture
 import logging
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Mapping
 from typing import Any, Union, cast
 from unittest import mock
 
@@ -19,10 +19,12 @@ from channels.testing import WebsocketCommunicator
 
 from projectify.asgi import websocket_application
 from projectify.corporate.services.stripe import customer_activate_subscription
+from projectify.lib import metrics
 from projectify.user.models import User
 from projectify.user.models.user_invite import UserInvite
 from projectify.user.services.internal import user_create
 from projectify.workspace.consumers import (
+    ChangeConsumer,
     ClientResponse,
     ClientResponseSerializer,
 )
@@ -34,6 +36,7 @@ from ..models.section import Section
 from ..models.task import Task
 from ..models.team_member import TeamMember
 from ..models.workspace import Workspace
+from ..selectors.change_log import change_log_sequence_get
 from ..selectors.team_member import team_member_find_for_workspace
 from ..services.chat_message import chat_message_create
 from ..services.label import label_create, label_delete, label_update
@@ -67,6 +70,7 @@ from ..services.workspace import (
     workspace_delete,
     workspace_update,
 )
+from ..types import ConsumerEvent, Resource
 
 logger = logging.getLogger(__name__)
 
@@ -207,12 +211,44 @@ async def expect_change(
         "uuid": has_uuid.uuid,
         "resource": resource,
         "content": mock.ANY,
+        "sequence": mock.ANY,
     }
     content = json_cast.get("content")
     assert content is not None, json_cast
     return content
 
 
+async def expect_coalesced_change(
+    communicator: WebsocketCommunicator, has_uuid: HasUuid
+) -> Any:
+    """
+    Test that changes are received up to the newest one.
+
+    The send queue coalesces changes that happen in quick succession, so
+    one or more changes can arrive. Return the newest content.
+    """
+    match has_uuid:
+        case Workspace():
+            resource: Resource = "workspace"
+        case Project():
+            resource = "project"
+        case Task():
+            resource = "task"
+    latest = await database_sync_to_async(change_log_sequence_get)(
+        resource=resource, uuid=has_uuid.uuid
+    )
+    while True:
+        serializer = ClientResponseSerializer(
+            data=await communicator.receive_json_from()
+        )
+        serializer.is_valid(raise_exception=True)
+        response = cast(ClientResponse, serializer.validated_data)
+        assert response["kind"] == "changed", response
+        assert response["uuid"] == has_uuid.uuid, response
+        if response["sequence"] == latest:
+            return response["content"]
+
+
 async def expect_gone(
     communicator: WebsocketCommunicator, resource: HasUuid
 ) -> None:
@@ -273,6 +309,7 @@ async def make_communicator(
         "kind": "subscribed",
         "uuid": resource.uuid,
         "resource": resource_str,
+        "sequence": mock.ANY,
     }, data
     return communicator
 
@@ -352,6 +389,27 @@ class TestWorkspace:
         await expect_gone(workspace_communicator, workspace)
         await clean_up_communicator(workspace_communicator)
 
+    async def test_instrumentation(
+        self,
+        settings: Any,
+        workspace: Workspace,
+        team_member: TeamMember,
+        workspace_communicator: WebsocketCommunicator,
+    ) -> None:
+        """Test that change events are measured."""
+        settings.INSTRUMENTATION = True
+        metrics.reset()
+        await database_sync_to_async(workspace_update)(
+            workspace=workspace, who=team_member.user, title="Measured"
+        )
+        await expect_change(workspace_communicator, workspace)
+        # Measurements are recorded after the response has been sent
+        assert await workspace_communicator.receive_nothing()
+        stats = metrics.snapshot()[("ws", "change workspace")]
+        assert stats.count == 1
+        assert stats.queries > 0
+        assert stats.serializer_time > 0
+
 
 class TestTeamMember:
     """Test consumer behavior for TeamMember changes."""
@@ -585,12 +643,12 @@ class TestTask:
             who=team_member.user,
             task=task,
         )
+        # XXX task and project signals fire several times here, for some
+        # reason, and the send queue coalesces some of them
         await expect_gone(task_communicator, task)
-        await expect_gone(task_communicator, task)
-        # XXX project signal fires three times here, for some reason
-        assert await expect_change(project_communicator, project)
-        assert await expect_change(project_communicator, project)
-        assert await expect_change(project_communicator, project)
+        while not await task_communicator.receive_nothing():
+            await expect_gone(task_communicator, task)
+        assert await expect_coalesced_change(project_communicator, project)
 
         # Ideally, a task consumer will disconnect when a task is deleted
         await clean_up_communicator(task_communicator)
@@ -628,14 +686,9 @@ class TestTaskLabel:
             labels=[],
             sub_tasks={"create_sub_tasks": [], "update_sub_tasks": []},
         )
-        assert await expect_change(task_communicator, task)
-        # XXX There are extra messages, for some reason
-        assert await expect_change(task_communicator, task)
-        assert await expect_change(task_communicator, task)
-        # XXX there are extra messages here
-        assert await expect_change(project_communicator, project)
-        assert await expect_change(project_communicator, project)
-        assert await expect_change(project_communicator, project)
+        # Several changes are sent, depending on how many are coalesced
+        assert await expect_coalesced_change(task_communicator, task)
+        assert await expect_coalesced_change(project_communicator, project)
 
         await project_communicator.disconnect()
         await task_communicator.disconnect()
@@ -698,6 +751,90 @@ class TestSubTask:
         await task_communicator.disconnect()
 
 
+class TestResume:
+    """Test subscribing again after reconnecting."""
+
+    async def receive(
+        self, communicator: WebsocketCommunicator
+    ) -> ClientResponse:
+        """Receive a response."""
+        serializer = ClientResponseSerializer(
+            data=await communicator.receive_json_from()
+        )
+        serializer.is_valid(raise_exception=True)
+        return cast(ClientResponse, serializer.validated_data)
+
+    async def unsubscribe(
+        self, communicator: WebsocketCommunicator, task: Task
+    ) -> None:
+        """Unsubscribe from task."""
+        await communicator.send_json_to(
+            {
+                "action": "unsubscribe",
+                "resource": "task",
+                "uuid": str(task.uuid),
+            }
+        )
+        response = await self.receive(communicator)
+        assert response["kind"] == "unsubscribed"
+
+    async def subscribe(
+        self, communicator: WebsocketCommunicator, task: Task, since: int
+    ) -> int:
+        """Subscribe to task since a sequence number, return the latest."""
+        await communicator.send_json_to(
+            {
+                "action": "subscribe",
+                "resource": "task",
+                "uuid": str(task.uuid),
+                "since": since,
+            }
+        )
+        response = await self.receive(communicator)
+        assert response["kind"] == "subscribed"
+        return response["sequence"]
+
+    async def test_resume(
+        self,
+        team_member: TeamMember,
+        task: Task,
+        task_communicator: WebsocketCommunicator,
+    ) -> None:
+        """Test that only missed changes are sent."""
+        sequence = await database_sync_to_async(change_log_sequence_get)(
+            resource="task", uuid=task.uuid
+        )
+        # Nothing missed
+        await self.unsubscribe(task_communicator, task)
+        assert await self.subscribe(task_communicator, task, sequence) == (
+            sequence
+        )
+        assert await task_communicator.receive_nothing() is True
+
+        # Missed a change
+        await self.unsubscribe(task_communicator, task)
+        await database_sync_to_async(task_update_nested)(
+            who=team_member.user,
+            task=task,
+            title="Changed while away",
+            labels=[],
+        )
+        new_sequence = await self.subscribe(task_communicator, task, sequence)
+        assert new_sequence > sequence
+        content = await expect_change(task_communicator, task)
+        assert content["title"] == "Changed while away"
+
+        # A sequence number the log doesn't know about
+        await self.unsubscribe(task_communicator, task)
+        await self.subscribe(task_communicator, task, new_sequence + 1)
+        assert await self.receive(task_communicator) == {
+            "kind": "resync",
+            "resource": "task",
+            "uuid": task.uuid,
+            "sequence": new_sequence,
+        }
+
+
 class TestChatMessage:
     """Test consumer behavior for chat messages."""
 
@@ -707,12 +844,175 @@ class TestChatMessage:
         task: Task,
         task_communicator: WebsocketCommunicator,
     ) -> None:
-        """Assert event is fired when chat message is saved or deleted."""
+        """Assert the new chat message is sent when it is saved."""
         await database_sync_to_async(chat_message_create)(
             who=team_member.user, task=task, text="Hello world"
         )
-        assert await expect_change(task_communicator, task)
+        # Only the new chat message is sent, not the whole task
+        json = await task_communicator.receive_json_from()
+        assert json == {
+            "kind": "chat_message",
+            "resource": "task",
+            "uuid": str(task.uuid),
+            "content": {
+                "created": mock.ANY,
+                "modified": mock.ANY,
+                "uuid": mock.ANY,
+                "text": "Hello world",
+                "author": {
+                    "user": {
+                        "email": team_member.user.email,
+                        "preferred_name": team_member.user.preferred_name,
+                        "profile_picture": None,
+                    },
+                    "uuid": str(team_member.uuid),
+                    "role": team_member.role,
+                },
+            },
+            "sequence": mock.ANY,
+        }
         # TODO chat messages are not supported right now,
         # so no chat_message_delete service exists, and we don't have to delete
         # it either
         await task_communicator.disconnect()
+
+
+class TestSubscriptionLimit:
+    """Test limiting subscriptions per connection."""
+
+    async def test_too_many_subscriptions(
+        self,
+        settings: Any,
+        project: Project,
+        task: Task,
+        project_communicator: WebsocketCommunicator,
+    ) -> None:
+        """Test that subscribing beyond the limit is refused."""
+        settings.WEBSOCKET_MAX_SUBSCRIPTIONS = 1
+        await project_communicator.send_json_to(
+            {"action": "subscribe", "resource": "task", "uuid": str(task.uuid)}
+        )
+        assert await project_communicator.receive_json_from() == {
+            "kind": "too_many_subscriptions",
+            "resource": "task",
+            "uuid": str(task.uuid),
+        }
+        # Resubscribing to a resource does not count against the limit
+        await project_communicator.send_json_to(
+            {
+                "action": "subscribe",
+                "resource": "project",
+                "uuid": str(project.uuid),
+            }
+        )
+        assert await project_communicator.receive_json_from() == {
+            "kind": "already_subscribed",
+            "resource": "project",
+            "uuid": str(project.uuid),
+        }
+
+    async def test_subscription_metrics(
+        self, user: User, project: Project
+    ) -> None:
+        """Test that subscriptions are accounted for."""
+        metrics.reset()
+        communicator = await make_communicator(project, user)
+        stats = metrics.subscription_snapshot()
+        assert stats.count == 1
+        assert stats.size > 0
+        await clean_up_communicator(communicator)
+        assert metrics.subscription_snapshot().count == 0
+
+
+class TestSendQueue:
+    """Test queueing events for slow clients."""
+
+    def change(self, uuid: str, kind: str = "changed") -> ConsumerEvent:
+        """Return a change event for a task."""
+        return cast(
+            ConsumerEvent,
+            {"type": "change", "resource": "task", "uuid": uuid, "kind": kind},
+        )
+
+    async def test_coalesce(self) -> None:
+        """Test that a newer change replaces a queued one."""
+        metrics.reset()
+        consumer = ChangeConsumer()
+        first = self.change("a")
+        newer = self.change("a")
+        consumer.send_queue_put(first)
+        consumer.send_queue_put(self.change("b"))
+        consumer.send_queue_put(newer)
+        assert list(consumer.send_queue.values()) == [newer, self.change("b")]
+        assert consumer.send_queue["change", "task", "a"] is newer
+        consumer.send_queue_clear()
+        stats = metrics.send_queue_snapshot()
+        assert stats.depth == 0
+        assert stats.max_depth == 2
+        assert stats.coalesced == 1
+
+    async def test_overflow(self) -> None:
+        """Test that a full queue is replaced by resync markers."""
+        metrics.reset()
+        consumer = ChangeConsumer()
+        consumer.send_queue_capacity = 2
+        consumer.send_queue_put(self.change("a"))
+        consumer.send_queue_put(self.change("b", "gone"))
+        consumer.send_queue_put(self.change("c"))
+        assert list(consumer.send_queue.values()) == [
+            {"type": "resync", "resource": "task", "uuid": "a"},
+            self.change("b", "gone"),
+            {"type": "resync", "resource": "task", "uuid": "c"},
+        ]
+        consumer.send_queue_clear()
+        stats = metrics.send_queue_snapshot()
+        assert stats.depth == 0
+        assert stats.overflows == 1
+
+    async def test_send_failed(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that the connection is closed when sending fails."""
+        metrics.reset()
+        consumer = ChangeConsumer()
+        sent: list[Mapping[str, Any]] = []
+
+        def change(event: ConsumerEvent) -> None:
+            raise ValueError("Can't send")
+
+        setattr(consumer, "base_send", sent.append)
+        setattr(consumer, "change", change)
+        consumer.send_queue_put(self.change("a"))
+        consumer.send_queue_put(self.change("b"))
+        assert consumer.send_queue_task is not None
+        with pytest.raises(ValueError):
+            await consumer.send_queue_task
+        assert consumer.send_queue_close_task is not None
+        await consumer.send_queue_close_task
+        assert sent == [{"type": "websocket.close", "code": 1011}]
+        assert not consumer.send_queue
+        assert metrics.send_queue_snapshot().depth == 0
+        assert "Sending queued events failed" in caplog.text
+
+    async def test_resync(
+        self,
+        task: Task,
+        team_member: TeamMember,
+        task_communicator: WebsocketCommunicator,
+    ) -> None:
+        """Test that a resync marker tells the client to fetch again."""
+        await task_communicator.send_input(
+            {"type": "resync", "resource": "task", "uuid": str(task.uuid)}
+        )
+        response = await task_communicator.receive_json_from()
+        assert response == {
+            "kind": "resync",
+            "resource": "task",
+            "uuid": str(task.uuid),
+            "sequence": await database_sync_to_async(change_log_sequence_get)(
+                resource="task", uuid=task.uuid
+            ),
+        }
+        await database_sync_to_async(task_update_nested)(
+            who=team_member.user, task=task, title="Queued", labels=[]
+        )
+        content = await expect_change(task_communicator, task)
+        assert content["title"] == "Queued"
@@ -235,3 +235,53 @@ class Test0060AlterWorkspaceUserRole:
             )
         )
         assert roles == ["CONTRIBUTOR", "OWNER", "MAINTAINER", "OBSERVER"]
+
+
+class Test0066TaskSubTaskCounts:
+    """Test migration 0066, which stores sub task counts on tasks."""
+
+    def test(self, migrator: Any) -> None:
+        """Test that existing sub tasks are counted."""
+        old_state = migrator.apply_initial_migration(
+            ("workspace", "0065_workspace_title")
+        )
+        Workspace = old_state.apps.get_model("workspace", "Workspace")
+        Project = old_state.apps.get_model("workspace", "Project")
+        Section = old_state.apps.get_model("workspace", "Section")
+        Task = old_state.apps.get_model("workspace", "Task")
+        SubTask = old_state.apps.get_model("workspace", "SubTask")
+        workspace = Workspace.objects.create(title="", description="")
+        project = Project.objects.create(
+            title="", description="", workspace=workspace
+        )
+        section = Section.objects.create(
+            title="", description="", project=project
+        )
+        # The second task has no sub tasks
+        task, _ = (
+            Task.objects.create(
+                title="",
+                description="",
+                section=section,
+                workspace=workspace,
+                number=number,
+            )
+            for number in (1, 2)
+        )
+        SubTask.objects.bulk_create(
+            [
+                SubTask(
+                    title="", description="", task=task, done=done, _order=i
+                )
+                for i, done in enumerate((True, False, False))
+            ]
+        )
+
+        new_state = migrator.apply_tested_migration(
+            ("workspace", "0066_task_sub_task_counts")
+        )
+        Task = new_state.apps.get_model("workspace", "Task")
+        counts = Task.objects.order_by("number").values_list(
+            "sub_tasks_total", "sub_tasks_done"
+        )
+        assert list(counts) == [(3, 1), (0, 0)]
@@ -0,0 +1,545 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test that workspace views and services stay within their query budget."""
+
+from collections.abc import Callable
+
+from django.db import transaction
+from django.test.client import Client
+from django.urls import reverse
+
+import pytest
+from rest_framework.test import APIClient
+
+from projectify.lib.pytest_query_budget import QueryScaling
+from projectify.user.models.user_invite import UserInvite
+from projectify.user.services.internal import user_create
+from projectify.user.services.user_invite import user_invite_redeem_many
+from projectify.workspace.models.label import Label
+from projectify.workspace.models.project import Project
+from projectify.workspace.models.section import Section
+from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.models.team_member_invite import TeamMemberInvite
+from projectify.workspace.models.workspace import Workspace
+from projectify.workspace.selectors.export import workspace_export_records
+from projectify.workspace.services.chat_message import chat_message_create
+from projectify.workspace.services.label import label_create
+from projectify.workspace.services.project import project_create
+from projectify.workspace.services.section import section_create
+from projectify.workspace.services.sub_task import sub_task_create
+from projectify.workspace.services.task import (
+    task_assign_labels,
+    task_bulk_assign,
+    task_bulk_delete,
+    task_bulk_label,
+    task_bulk_move_to_section,
+    task_create,
+    task_move_after,
+)
+from projectify.workspace.services.team_member_invite import (
+    team_member_invite_create_many,
+)
+from projectify.workspace.services.workspace import workspace_create
+from projectify.workspace.views.chat_message import ChatMessageList
+from projectify.workspace.views.project import (
+    ProjectReadUpdateDelete,
+    project_detail_view,
+)
+from projectify.workspace.views.task import (
+    TaskAssignedList,
+    TaskBulkAssign,
+    TaskBulkDelete,
+    TaskBulkLabel,
+    TaskBulkMoveToSection,
+    TaskRetrieveUpdateDelete,
+    task_detail,
+    task_move,
+)
+from projectify.workspace.views.workspace import (
+    BulkInviteUsersToWorkspace,
+    WorkspaceReadUpdate,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def add_tasks(section: Section, team_member: TeamMember, n: int) -> None:
+    """Add n tasks with a label, a sub task and an assignee each."""
+    for i in range(n):
+        task = task_create(
+            who=team_member.user,
+            section=section,
+            title=f"Task {i}",
+            assignee=team_member,
+        )
+        label = label_create(
+            who=team_member.user,
+            workspace=section.project.workspace,
+            name=f"Label {task.number}",
+            color=0,
+        )
+        task_assign_labels(task=task, labels=[label])
+        sub_task_create(
+            who=team_member.user, task=task, title="Sub task", done=False
+        )
+
+
+def add_task_details(task: Task, team_member: TeamMember, n: int) -> None:
+    """Add n labels, sub tasks and chat messages to a task."""
+    labels = list(task.labels.all())
+    for i in range(n):
+        labels.append(
+            label_create(
+                who=team_member.user,
+                workspace=task.workspace,
+                name=f"Label {len(labels)}",
+                color=0,
+            )
+        )
+        sub_task_create(
+            who=team_member.user, task=task, title=f"Sub task {i}", done=False
+        )
+        chat_message_create(who=team_member.user, task=task, text="Hello")
+    task_assign_labels(task=task, labels=labels)
+
+
+def test_project_read(
+    query_scaling: QueryScaling,
+    rest_user_client: APIClient,
+    project: Project,
+    section: Section,
+    team_member: TeamMember,
+) -> None:
+    """Test project detail API with a growing number of tasks."""
+    url = reverse(
+        "workspace:projects:read-update-delete", args=(project.uuid,)
+    )
+    query_scaling(
+        ProjectReadUpdateDelete.get,
+        populate=lambda n: add_tasks(section, team_member, n),
+        run=lambda: rest_user_client.get(url),
+    )
+
+
+# The dashboard templates use variables that are not always defined
+@pytest.mark.ignore_template_errors
+def test_project_detail_view(
+    query_scaling: QueryScaling,
+    user_client: Client,
+    project: Project,
+    section: Section,
+    team_member: TeamMember,
+) -> None:
+    """Test project detail page with a growing number of tasks."""
+    url = reverse("dashboard:projects:detail", args=(project.uuid,))
+    query_scaling(
+        project_detail_view,
+        populate=lambda n: add_tasks(section, team_member, n),
+        run=lambda: user_client.get(url),
+    )
+
+
+def test_workspace_read(
+    query_scaling: QueryScaling,
+    rest_user_client: APIClient,
+    workspace: Workspace,
+    team_member: TeamMember,
+) -> None:
+    """Test workspace detail API with a growing number of projects."""
+    url = reverse("workspace:workspaces:read-update", args=(workspace.uuid,))
+
+    def populate(n: int) -> None:
+        for i in range(n):
+            project_create(
+                who=team_member.user, workspace=workspace, title=f"P {i}"
+            )
+            label_create(
+                who=team_member.user,
+                workspace=workspace,
+                name=f"Label {Label.objects.count()}",
+                color=0,
+            )
+
+    query_scaling(
+        WorkspaceReadUpdate.get,
+        populate=populate,
+        run=lambda: rest_user_client.get(url),
+    )
+
+
+def test_task_read(
+    query_scaling: QueryScaling,
+    rest_user_client: APIClient,
+    task: Task,
+    team_member: TeamMember,
+) -> None:
+    """Test task detail API with growing labels, sub tasks and chat."""
+    url = reverse("workspace:tasks:read-update-delete", args=(task.uuid,))
+    query_scaling(
+        TaskRetrieveUpdateDelete.get,
+        populate=lambda n: add_task_details(task, team_member, n),
+        run=lambda: rest_user_client.get(url),
+    )
+
+
+def test_chat_message_list(
+    query_scaling: QueryScaling,
+    rest_user_client: APIClient,
+    task: Task,
+    team_member: TeamMember,
+) -> None:
+    """Test listing chat messages with a growing number of authors."""
+    url = reverse("workspace:tasks:chat-messages", args=(task.uuid,))
+    query_scaling(
+        ChatMessageList.get,
+        populate=lambda n: add_task_details(task, team_member, n),
+        run=lambda: rest_user_client.get(url),
+    )
+
+
+# The dashboard templates use variables that are not always defined
+@pytest.mark.ignore_template_errors
+def test_task_detail(
+    query_scaling: QueryScaling,
+    user_client: Client,
+    task: Task,
+    team_member: TeamMember,
+) -> None:
+    """Test task detail page with growing labels, sub tasks and chat."""
+    url = reverse("dashboard:tasks:detail", args=(task.uuid,))
+    query_scaling(
+        task_detail,
+        populate=lambda n: add_task_details(task, team_member, n),
+        run=lambda: user_client.get(url),
+    )
+
+
+def test_task_move(
+    query_scaling: QueryScaling,
+    user_client: Client,
+    task: Task,
+    section: Section,
+    team_member: TeamMember,
+) -> None:
+    """Test moving a task on the project page with a growing section."""
+    url = reverse("dashboard:tasks:move", args=(task.uuid,))
+    query_scaling(
+        task_move,
+        populate=lambda n: add_tasks(section, team_member, n),
+        run=lambda: user_client.post(
+            url, {"up": "up"}, headers={"HX-Request": "true"}
+        ),
+    )
+
+
+def test_task_assigned_list(
+    query_scaling: QueryScaling,
+    rest_user_client: APIClient,
+    section: Section,
+    team_member: TeamMember,
+) -> None:
+    """Test listing assigned tasks with a growing number of tasks."""
+    url = reverse("workspace:tasks:assigned")
+    query_scaling(
+        TaskAssignedList.get,
+        populate=lambda n: add_tasks(section, team_member, n),
+        run=lambda: rest_user_client.get(url),
+    )
+
+
+def test_task_move_after(
+    query_scaling: QueryScaling,
+    task: Task,
+    section: Section,
+    team_member: TeamMember,
+) -> None:
+    """Test moving a task between sections with a growing number of tasks."""
+    other_section = section_create(
+        who=team_member.user, project=section.project, title="Other"
+    )
+
+    def run() -> None:
+        after = other_section if task.section == section else section
+        task_move_after(who=team_member.user, task=task, after=after)
+
+    query_scaling(
+        task_move_after,
+        populate=lambda n: add_tasks(section, team_member, n),
+        run=run,
+    )
+
+
+def test_workspace_export_records(
+    query_scaling: QueryScaling,
+    section: Section,
+    task: Task,
+    team_member: TeamMember,
+) -> None:
+    """Test exporting a workspace with a growing number of tasks."""
+
+    def populate(n: int) -> None:
+        add_tasks(section, team_member, n)
+        for _ in range(n):
+            chat_message_create(who=team_member.user, task=task, text="Hi")
+
+    query_scaling(
+        workspace_export_records,
+        populate=populate,
+        run=lambda: list(
+            workspace_export_records(workspace=section.project.workspace)
+        ),
+    )
+
+
+def rolled_back(run: Callable[[], object]) -> Callable[[], None]:
+    """Return run, undoing its changes so that it can be repeated."""
+
+    def wrapper() -> None:
+        with transaction.atomic():
+            run()
+            transaction.set_rollback(True)
+
+    return wrapper
+
+
+class TestTaskBulk:
+    """Test bulk task services and views with a growing number of tasks."""
+
+    @pytest.fixture
+    def tasks(self) -> list[Task]:
+        """Return the tasks that populate adds."""
+        return []
+
+    @pytest.fixture
+    def populate(
+        self, section: Section, team_member: TeamMember, tasks: list[Task]
+    ) -> Callable[[int], None]:
+        """Return a function adding n tasks to section."""
+
+        def populate(n: int) -> None:
+            add_tasks(section, team_member, n)
+            tasks[:] = Task.objects.filter(section=section).select_related(
+                "section__project__workspace"
+            )
+
+        return populate
+
+    def post(
+        self, client: APIClient, name: str, tasks: list[Task], **data: object
+    ) -> Callable[[], None]:
+        """Return a function posting tasks' uuids and data to a bulk view."""
+
+        def post() -> None:
+            response = client.post(
+                reverse(f"workspace:tasks:{name}"),
+                data={
+                    "task_uuids": [str(task.uuid) for task in tasks],
+                    **data,
+                },
+                format="json",
+            )
+            assert response.status_code == 204, response.data
+
+        return post
+
+    def test_move_to_section(
+        self,
+        query_scaling: QueryScaling,
+        rest_user_client: APIClient,
+        populate: Callable[[int], None],
+        tasks: list[Task],
+        section: Section,
+        team_member: TeamMember,
+    ) -> None:
+        """Test moving all tasks to another section."""
+        other_section = section_create(
+            who=team_member.user, project=section.project, title="Other"
+        )
+        query_scaling(
+            task_bulk_move_to_section,
+            populate=populate,
+            run=rolled_back(
+                lambda: task_bulk_move_to_section(
+                    who=team_member.user, tasks=tasks, section=other_section
+                )
+            ),
+        )
+        query_scaling(
+            TaskBulkMoveToSection.post,
+            populate=populate,
+            run=rolled_back(
+                self.post(
+                    rest_user_client,
+                    "bulk-move-to-section",
+                    tasks,
+                    section_uuid=str(other_section.uuid),
+                )
+            ),
+        )
+
+    def test_assign(
+        self,
+        query_scaling: QueryScaling,
+        rest_user_client: APIClient,
+        populate: Callable[[int], None],
+        tasks: list[Task],
+        team_member: TeamMember,
+    ) -> None:
+        """Test unassigning all tasks."""
+        query_scaling(
+            task_bulk_assign,
+            populate=populate,
+            run=rolled_back(
+                lambda: task_bulk_assign(
+                    who=team_member.user, tasks=tasks, assignee=None
+                )
+            ),
+        )
+        query_scaling(
+            TaskBulkAssign.post,
+            populate=populate,
+            run=rolled_back(
+                self.post(
+                    rest_user_client,
+                    "bulk-assign",
+                    tasks,
+                    assignee_uuid=str(team_member.uuid),
+                )
+            ),
+        )
+
+    def test_label(
+        self,
+        query_scaling: QueryScaling,
+        rest_user_client: APIClient,
+        populate: Callable[[int], None],
+        tasks: list[Task],
+        workspace: Workspace,
+        team_member: TeamMember,
+    ) -> None:
+        """Test adding and removing labels on all tasks."""
+        add, remove = (
+            [
+                label_create(
+                    who=team_member.user,
+                    workspace=workspace,
+                    name=f"Bulk {i}",
+                    color=0,
+                )
+            ]
+            for i in range(2)
+        )
+        query_scaling(
+            task_bulk_label,
+            populate=populate,
+            run=rolled_back(
+                lambda: task_bulk_label(
+                    who=team_member.user, tasks=tasks, add=add, remove=remove
+                )
+            ),
+        )
+        query_scaling(
+            TaskBulkLabel.post,
+            populate=populate,
+            run=rolled_back(
+                self.post(
+                    rest_user_client,
+                    "bulk-label",
+                    tasks,
+                    add_label_uuids=[str(label.uuid) for label in add],
+                    remove_label_uuids=[str(label.uuid) for label in remove],
+                )
+            ),
+        )
+
+    def test_delete(
+        self,
+        query_scaling: QueryScaling,
+        rest_user_client: APIClient,
+        populate: Callable[[int], None],
+        tasks: list[Task],
+        team_member: TeamMember,
+    ) -> None:
+        """Test deleting all tasks."""
+        query_scaling(
+            task_bulk_delete,
+            populate=populate,
+            run=rolled_back(
+                lambda: task_bulk_delete(who=team_member.user, tasks=tasks)
+            ),
+        )
+        query_scaling(
+            TaskBulkDelete.post,
+            populate=populate,
+            run=rolled_back(self.post(rest_user_client, "bulk-delete", tasks)),
+        )
+
+
+def test_team_member_invite_create_many(
+    query_scaling: QueryScaling,
+    rest_user_client: APIClient,
+    workspace: Workspace,
+    team_member: TeamMember,
+) -> None:
+    """Test inviting a growing number of new and registered users."""
+    customer = workspace.customer
+    customer.seats = 100
+    customer.save()
+    emails: list[str] = []
+
+    def populate(n: int) -> None:
+        for _ in range(n):
+            i = len(emails)
+            emails.append(f"new-{i}@example.com")
+            emails.append(user_create(email=f"user-{i}@example.com").email)
+
+    def post() -> None:
+        response = rest_user_client.post(
+            url, {"emails": emails}, format="json"
+        )
+        assert response.status_code == 201, response.data
+
+    query_scaling(
+        team_member_invite_create_many,
+        populate=populate,
+        run=rolled_back(
+            lambda: team_member_invite_create_many(
+                who=team_member.user, workspace=workspace, emails=emails
+            )
+        ),
+    )
+    url = reverse(
+        "workspace:workspaces:bulk-invite-team-members",
+        args=(workspace.uuid,),
+    )
+    query_scaling(
+        BulkInviteUsersToWorkspace.post,
+        populate=populate,
+        run=rolled_back(post),
+    )
+
+
+def test_user_invite_redeem_many(
+    query_scaling: QueryScaling, team_member: TeamMember
+) -> None:
+    """Test redeeming invites to a growing number of workspaces."""
+    invitee = user_create(email="invitee@example.com")
+
+    def populate(n: int) -> None:
+        for i in range(n):
+            workspace = workspace_create(
+                title=f"Workspace {i}", owner=team_member.user
+            )
+            # Invites from before invitee signed up
+            user_invite = UserInvite.objects.create(email=invitee.email)
+            TeamMemberInvite.objects.create(
+                workspace=workspace, user_invite=user_invite
+            )
+
+    query_scaling(
+        user_invite_redeem_many,
+        populate=populate,
+        run=rolled_back(lambda: user_invite_redeem_many(user=invitee)),
+    )
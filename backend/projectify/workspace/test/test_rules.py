@@ -18,7 +18,10 @@ from projectify.workspace.models.team_member import TeamMember
 from projectify.workspace.models.workspace import Workspace
 from projectify.workspace.services.chat_message import chat_message_create
 from projectify.workspace.services.label import label_create
-from projectify.workspace.services.project import project_create
+from projectify.workspace.services.project import (
+    project_create,
+    project_delete,
+)
 from projectify.workspace.services.section import section_create
 from projectify.workspace.services.sub_task import sub_task_create
 from projectify.workspace.services.task import task_create
@@ -251,7 +254,7 @@ class TestTrialRules:
         assert validate_perm("workspace.create_project", user, workspace)
         customer_cancel_subscription(customer=workspace.customer)
         assert validate_perm("workspace.create_project", user, workspace)
-        project_create(
+        project = project_create(
             workspace=workspace,
             title="project",
             who=team_member.user,
@@ -262,6 +265,9 @@ class TestTrialRules:
             workspace,
             raise_exception=False,
         )
+        # Deleted projects don't count, even before they are purged
+        project_delete(who=team_member.user, project=project)
+        assert validate_perm("workspace.create_project", user, workspace)
 
     def test_create_section(
         self,
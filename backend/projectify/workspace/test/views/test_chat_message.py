@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test chat message views."""
+
+from django.urls import reverse
+
+import pytest
+from rest_framework.test import APIClient
+
+from projectify.workspace.models.chat_message import ChatMessage
+from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.selectors.task import CHAT_MESSAGE_WINDOW
+from projectify.workspace.services.chat_message import chat_message_create
+from pytest_types import DjangoAssertNumQueries
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def chat_messages(task: Task, team_member: TeamMember) -> list[ChatMessage]:
+    """Create more chat messages than fit into a task detail."""
+    return [
+        chat_message_create(
+            who=team_member.user, task=task, text=f"Message {i}"
+        )
+        for i in range(CHAT_MESSAGE_WINDOW + 5)
+    ]
+
+
+class TestChatMessageList:
+    """Test listing a task's chat messages."""
+
+    @pytest.fixture
+    def resource_url(self, task: Task) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:tasks:chat-messages", args=(task.uuid,))
+
+    def test_authenticated_user(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        chat_messages: list[ChatMessage],
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test paging through all chat messages, newest first."""
+        with django_assert_num_queries(2):
+            response = rest_user_client.get(resource_url)
+        assert response.status_code == 200, response.data
+        first = response.data["results"]
+        assert len(first) == CHAT_MESSAGE_WINDOW
+        assert first[0]["text"] == chat_messages[-1].text
+        assert response.data["previous"] is None
+        response = rest_user_client.get(response.data["next"])
+        assert response.status_code == 200, response.data
+        assert [
+            m["text"] for m in reversed(first + response.data["results"])
+        ] == [m.text for m in chat_messages]
+        assert response.data["next"] is None
+
+    def test_unrelated_user(
+        self,
+        rest_meddling_client: APIClient,
+        resource_url: str,
+    ) -> None:
+        """Test that other users can't list chat messages."""
+        response = rest_meddling_client.get(resource_url)
+        assert response.status_code == 404, response.data
+
+
+def test_task_detail_window(
+    rest_user_client: APIClient,
+    task: Task,
+    chat_messages: list[ChatMessage],
+) -> None:
+    """Test that task details only contain the latest chat messages."""
+    response = rest_user_client.get(
+        reverse("workspace:tasks:read-update-delete", args=(task.uuid,))
+    )
+    assert response.status_code == 200, response.data
+    assert [m["text"] for m in response.data["chat_messages"]] == [
+        m.text for m in chat_messages[-CHAT_MESSAGE_WINDOW:]
+    ]
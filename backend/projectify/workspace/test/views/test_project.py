@@ -5,6 +5,7 @@
 
 from unittest.mock import ANY
 
+from django.test import Client
 from django.urls import reverse
 from django.utils.timezone import now
 
@@ -24,7 +25,98 @@ from projectify.workspace.selectors.project import (
 )
 from projectify.workspace.services.project import project_archive
 from projectify.workspace.services.sub_task import sub_task_create
-from pytest_types import DjangoAssertNumQueries
+from projectify.workspace.services.task import (
+    task_create_nested,
+    task_update_nested,
+)
+from pytest_types import DjangoAssertNumQueries, DjangoCaptureOnCommitCallbacks
+
+
+# HTML
+@pytest.mark.django_db
+class TestProjectDetailView:
+    """Test the project page."""
+
+    @pytest.fixture
+    def resource_url(self, project: Project) -> str:
+        """Return URL to this view."""
+        return reverse("dashboard:projects:detail", args=(project.uuid,))
+
+    # The dashboard templates use variables that are not always defined
+    @pytest.mark.ignore_template_errors
+    def test_htmx(
+        self,
+        user_client: Client,
+        resource_url: str,
+        team_member: TeamMember,
+        task: Task,
+    ) -> None:
+        """Test that HTMX receives the page without the dashboard."""
+        del team_member
+        response = user_client.get(resource_url)
+        assert response.status_code == 200
+        assert "dashboard_base.html" in {t.name for t in response.templates}
+        response = user_client.get(
+            resource_url, headers={"HX-Request": "true"}
+        )
+        assert response.status_code == 200
+        assert "dashboard_base.html" not in {
+            t.name for t in response.templates
+        }
+        assert task.title in response.content.decode()
+        assert "HX-Request" in response["Vary"]
+        assert "HX-Target" in response["Vary"]
+
+    def test_htmx_section(
+        self,
+        user_client: Client,
+        resource_url: str,
+        team_member: TeamMember,
+        section: Section,
+        task: Task,
+        unrelated_section: Section,
+    ) -> None:
+        """Test that only the section HTMX targets is rendered."""
+        del team_member
+        headers = {"HX-Request": "true", "HX-Target": str(section.uuid)}
+        response = user_client.get(resource_url, headers=headers)
+        assert response.status_code == 200
+        assert [t.name for t in response.templates] == [
+            "workspace/project_detail/section.html",
+            "workspace/project_detail/task.html",
+        ]
+        assert f'id="task-{task.uuid}"' in response.content.decode()
+        # Sections of other projects can't be targeted
+        headers["HX-Target"] = str(unrelated_section.uuid)
+        response = user_client.get(resource_url, headers=headers)
+        assert response.status_code == 404
+
+    # The dashboard templates use variables that are not always defined
+    @pytest.mark.ignore_template_errors
+    def test_section_cache(
+        self,
+        user_client: Client,
+        resource_url: str,
+        team_member: TeamMember,
+        task: Task,
+        django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    ) -> None:
+        """Test that sections are rendered again only once they change."""
+        response = user_client.get(resource_url)
+        assert task.title in response.content.decode()
+        # Not changed through a service, so the section keeps its version
+        Task.objects.filter(pk=task.pk).update(title="Behind the cache")
+        response = user_client.get(resource_url)
+        assert "Behind the cache" not in response.content.decode()
+        with django_capture_on_commit_callbacks(execute=True):
+            task_update_nested(
+                who=team_member.user,
+                task=task,
+                title="Updated",
+                labels=[],
+            )
+        response = user_client.get(resource_url)
+        assert "Updated" in response.content.decode()
 
 
 # Create
@@ -103,7 +195,8 @@ class TestProjectReadUpdateDelete:
         task.save()
         # Gone up from 7 -> 12 since we prefetch workspace details too
         # Gone up from 11 -> 14, since we fetch workspace quota
-        with django_assert_num_queries(14):
+        # Gone up from 14 -> 15, since we check access to compute the ETag
+        with django_assert_num_queries(15):
             response = rest_user_client.get(resource_url)
             assert response.status_code == 200, response.data
         assert response.data == {
@@ -204,12 +297,53 @@ class TestProjectReadUpdateDelete:
             archived=True,
         )
 
-        with django_assert_num_queries(5):
+        # Gone up from 5 -> 6, since the project is only marked as deleted
+        # inside a transaction and purged in the background
+        with django_assert_num_queries(6):
             response = rest_user_client.delete(resource_url)
             assert (
                 response.status_code == status.HTTP_204_NO_CONTENT
             ), response.data
 
+    def test_not_modified(
+        self,
+        rest_user_client: APIClient,
+        rest_meddling_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+        section: Section,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    ) -> None:
+        """Test that an unchanged project is not fetched again."""
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 200, response.data
+        etag = response["ETag"]
+        with django_assert_num_queries(1):
+            response = rest_user_client.get(
+                resource_url, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        # Access is checked before answering with 304
+        response = rest_meddling_client.get(
+            resource_url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 404, response.data
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task_create_nested(
+                who=team_member.user,
+                section=section,
+                title="New",
+                sub_tasks={"create_sub_tasks": [], "update_sub_tasks": []},
+                labels=[],
+            )
+        response = rest_user_client.get(resource_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, response.data
+        assert response["ETag"] != etag
+
 
 # Read (list)
 @pytest.mark.django_db
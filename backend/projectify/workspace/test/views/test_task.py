@@ -5,6 +5,7 @@
 
 from uuid import uuid4
 
+from django.test import Client
 from django.urls import reverse
 
 import pytest
@@ -14,7 +15,10 @@ from rest_framework.test import APIClient
 
 from projectify.workspace.models.section import Section
 from projectify.workspace.models.task import Task
-from pytest_types import DjangoAssertNumQueries
+from projectify.workspace.services.label import label_update
+from projectify.workspace.services.project import project_delete
+from projectify.workspace.services.task import task_create
+from pytest_types import DjangoAssertNumQueries, DjangoCaptureOnCommitCallbacks
 
 from ... import models
 
@@ -37,6 +41,85 @@ class UnauthenticatedTestMixin:
         assert response.status_code == 403, response.data
 
 
+# HTML
+@pytest.mark.django_db
+class TestTaskMove:
+    """Test moving a task on the project page."""
+
+    def test_move(
+        self,
+        user_client: Client,
+        section: Section,
+        task: Task,
+        other_task: Task,
+        team_member: models.TeamMember,
+    ) -> None:
+        """Test that HTMX receives the section, everything else a redirect."""
+        del team_member
+        url = reverse("dashboard:tasks:move", args=(task.uuid,))
+        response = user_client.post(url, {"down": "down"})
+        assert response.status_code == 302
+        assert response["Location"] == reverse(
+            "dashboard:projects:detail", args=(section.project.uuid,)
+        )
+        assert list(section.task_set.all()) == [other_task, task]
+        response = user_client.post(
+            url, {"up": "up"}, headers={"HX-Request": "true"}
+        )
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert content.index(f"task-{task.uuid}") < content.index(
+            f"task-{other_task.uuid}"
+        )
+
+
+@pytest.mark.django_db
+class TestTaskDetailView:
+    """Test the task pages."""
+
+    # The dashboard templates use variables that are not always defined
+    @pytest.mark.ignore_template_errors
+    @pytest.mark.parametrize("name", ["detail", "update"])
+    def test_vary(
+        self,
+        user_client: Client,
+        task: Task,
+        team_member: models.TeamMember,
+        name: str,
+    ) -> None:
+        """Test that full pages and HTMX partials are cached apart."""
+        del team_member
+        url = reverse(f"dashboard:tasks:{name}", args=(task.uuid,))
+        response = user_client.get(url, headers={"HX-Request": "true"})
+        assert response.status_code == 200
+        assert "dashboard_base.html" not in {
+            t.name for t in response.templates
+        }
+        assert "HX-Request" in response["Vary"]
+        assert "HX-Target" in response["Vary"]
+
+
+@pytest.mark.django_db
+class TestTaskCreateView:
+    """Test the task creation page."""
+
+    # The dashboard templates use variables that are not always defined
+    @pytest.mark.ignore_template_errors
+    def test_deleted_projects(
+        self,
+        user_client: Client,
+        section: Section,
+        team_member: models.TeamMember,
+        archived_project: models.Project,
+    ) -> None:
+        """Test that the sidebar only lists projects that are not deleted."""
+        project_delete(who=team_member.user, project=archived_project)
+        url = reverse("dashboard:sections:create-task", args=(section.uuid,))
+        response = user_client.get(url)
+        assert response.status_code == 200
+        assert list(response.context["projects"]) == [section.project]
+
+
 # Create
 @pytest.mark.django_db
 class TestTaskCreate(UnauthenticatedTestMixin):
@@ -196,12 +279,40 @@ class TestTaskRetrieveUpdateDestroy(UnauthenticatedTestMixin):
         django_assert_num_queries: DjangoAssertNumQueries,
     ) -> None:
         """Test retrieving when authenticated."""
-        with django_assert_num_queries(4):
+        with django_assert_num_queries(5):
             response = rest_user_client.get(resource_url)
             assert response.status_code == 200, response.data
 
         assert response.data["uuid"] == str(task.uuid)
 
+    def test_not_modified(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        label: models.Label,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    ) -> None:
+        """Test that an unchanged task is not fetched again."""
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 200, response.data
+        etag = response["ETag"]
+        with django_assert_num_queries(1):
+            response = rest_user_client.get(
+                resource_url, HTTP_IF_NONE_MATCH=f"W/{etag}"
+            )
+        assert response.status_code == 304
+
+        # Labels are shown in task details, and belong to the workspace
+        with django_capture_on_commit_callbacks(execute=True):
+            label_update(
+                who=team_member.user, label=label, name="Renamed", color=0
+            )
+        response = rest_user_client.get(resource_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, response.data
+        assert response["ETag"] != etag
+
     def test_update(
         self,
         rest_user_client: APIClient,
@@ -275,6 +386,60 @@ class TestTaskRetrieveUpdateDestroy(UnauthenticatedTestMixin):
             assert response.status_code == 404, response.content
 
 
+@pytest.mark.django_db
+class TestTaskAssignedList:
+    """Test listing tasks assigned to the user."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to resource."""
+        return reverse("workspace:tasks:assigned")
+
+    def test_authenticated(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        section: Section,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test listing assigned tasks."""
+        task = task_create(
+            who=team_member.user,
+            section=section,
+            title="Mine",
+            assignee=team_member,
+        )
+        task_create(who=team_member.user, section=section, title="Nobody's")
+        with django_assert_num_queries(2):
+            response = rest_user_client.get(
+                resource_url, {"order_by": "-due_date"}
+            )
+            assert response.status_code == 200, response.data
+        assert response.data["count"] == 1
+        (result,) = response.data["results"]
+        assert result["uuid"] == str(task.uuid)
+        assert result["section"] == {
+            "uuid": str(section.uuid),
+            "title": section.title,
+        }
+        assert result["workspace"]["uuid"] == str(task.workspace.uuid)
+
+    def test_invalid_order(
+        self, rest_user_client: APIClient, resource_url: str
+    ) -> None:
+        """Test that only due dates can be sorted by."""
+        response = rest_user_client.get(resource_url, {"order_by": "title"})
+        assert response.status_code == 400, response.data
+
+    def test_unauthenticated(
+        self, rest_client: APIClient, resource_url: str
+    ) -> None:
+        """Test that anonymous users have no tasks."""
+        response = rest_client.get(resource_url)
+        assert response.status_code == 403, response.data
+
+
 # RPC
 @pytest.mark.django_db
 class TestMoveTaskToSection:
@@ -337,3 +502,206 @@ class TestTaskMoveAfterTask:
                 data={"task_uuid": str(other_task.uuid)},
             )
             assert response.status_code == status.HTTP_200_OK, response.data
+
+
+# Bulk
+@pytest.mark.django_db
+class TestTaskBulkMoveToSection:
+    """Test moving several tasks to a section."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:tasks:bulk-move-to-section")
+
+    def test_simple(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        other_section: Section,
+        task: Task,
+        other_task: Task,
+    ) -> None:
+        """Test moving tasks."""
+        with django_assert_num_queries(9):
+            response = rest_user_client.post(
+                resource_url,
+                data={
+                    "task_uuids": [str(task.uuid), str(other_task.uuid)],
+                    "section_uuid": str(other_section.uuid),
+                },
+            )
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert list(other_section.task_set.all()) == [task, other_task]
+
+    def test_unrelated_task(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        other_section: Section,
+        task: Task,
+        unrelated_task: Task,
+    ) -> None:
+        """Test that nothing is moved if any task can't be found."""
+        response = rest_user_client.post(
+            resource_url,
+            data={
+                "task_uuids": [str(task.uuid), str(unrelated_task.uuid)],
+                "section_uuid": str(other_section.uuid),
+            },
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert not other_section.task_set.exists()
+
+
+@pytest.mark.django_db
+class TestTaskBulkAssign:
+    """Test assigning several tasks."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:tasks:bulk-assign")
+
+    def test_simple(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        task: Task,
+        other_task: Task,
+        team_member: models.TeamMember,
+    ) -> None:
+        """Test assigning and unassigning tasks."""
+        task_uuids = [str(task.uuid), str(other_task.uuid)]
+        with django_assert_num_queries(6):
+            response = rest_user_client.post(
+                resource_url,
+                data={
+                    "task_uuids": task_uuids,
+                    "assignee_uuid": str(team_member.uuid),
+                },
+            )
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert Task.objects.filter(assignee=team_member).count() == 2
+        response = rest_user_client.post(
+            resource_url,
+            data={"task_uuids": task_uuids, "assignee_uuid": None},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Task.objects.filter(assignee=team_member).exists()
+
+    def test_unrelated_assignee(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+        unrelated_team_member: models.TeamMember,
+    ) -> None:
+        """Test that team members of other workspaces can't be assigned."""
+        response = rest_user_client.post(
+            resource_url,
+            data={
+                "task_uuids": [str(task.uuid)],
+                "assignee_uuid": str(unrelated_team_member.uuid),
+            },
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestTaskBulkLabel:
+    """Test labeling several tasks."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:tasks:bulk-label")
+
+    def test_simple(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        task: Task,
+        other_task: Task,
+        task_label: models.TaskLabel,
+        labels: list[models.Label],
+    ) -> None:
+        """Test adding and removing labels."""
+        with django_assert_num_queries(9):
+            response = rest_user_client.post(
+                resource_url,
+                data={
+                    "task_uuids": [str(task.uuid), str(other_task.uuid)],
+                    "add_label_uuids": [str(label.uuid) for label in labels],
+                    "remove_label_uuids": [str(task_label.label.uuid)],
+                },
+            )
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert set(task.labels.all()) == set(labels)
+        assert set(other_task.labels.all()) == set(labels)
+
+    def test_unrelated_label(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+        unrelated_label: models.Label,
+    ) -> None:
+        """Test that labels of other workspaces can't be added."""
+        response = rest_user_client.post(
+            resource_url,
+            data={
+                "task_uuids": [str(task.uuid)],
+                "add_label_uuids": [str(unrelated_label.uuid)],
+            },
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "add_label_uuids" in response.data["details"], response.data
+
+
+@pytest.mark.django_db
+class TestTaskBulkDelete:
+    """Test deleting several tasks."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:tasks:bulk-delete")
+
+    def test_simple(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        task: Task,
+        other_task: Task,
+    ) -> None:
+        """Test deleting tasks."""
+        with django_assert_num_queries(9):
+            response = rest_user_client.post(
+                resource_url,
+                data={"task_uuids": [str(task.uuid), str(other_task.uuid)]},
+            )
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Task.objects.filter(
+            pk__in=[task.pk, other_task.pk]
+        ).exists()
+
+    def test_too_many_tasks(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+    ) -> None:
+        """Test that at most 500 tasks can be changed at once."""
+        response = rest_user_client.post(
+            resource_url,
+            data={"task_uuids": [str(uuid4()) for _ in range(501)]},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "task_uuids" in response.data["details"], response.data
+        assert Task.objects.filter(pk=task.pk).exists()
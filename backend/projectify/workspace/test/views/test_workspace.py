@@ -4,26 +4,47 @@
 """Test workspace CRUD views."""
 
 import unittest.mock
+from collections.abc import AsyncIterable
 
 from django.contrib.auth.models import AbstractBaseUser, AbstractUser
 from django.core.files import File
-from django.urls import reverse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test.client import AsyncClient
+from django.urls import resolve, reverse
 
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from projectify.corporate.services.stripe import customer_cancel_subscription
+from projectify.lib import json
 from projectify.user.models.user import User
+from projectify.user.services.user import user_update
 from projectify.workspace.services.team_member_invite import (
     team_member_invite_create,
 )
-from pytest_types import DjangoAssertNumQueries, Headers
+from pytest_types import (
+    DjangoAssertNumQueries,
+    DjangoCaptureOnCommitCallbacks,
+    Headers,
+    Mailbox,
+)
 
 from ...models.const import TeamMemberRoles
 from ...models.project import Project
+from ...models.task import Task
 from ...models.team_member import TeamMember
+from ...models.team_member_invite import TeamMemberInvite
 from ...models.workspace import Workspace
+from ...views.workspace import WorkspaceReadUpdate
+
+
+async def collect(response: StreamingHttpResponse) -> bytes:
+    """Read a streaming response, which must be asynchronous under ASGI."""
+    chunks = response.streaming_content
+    assert isinstance(chunks, AsyncIterable)
+    return b"".join([chunk async for chunk in chunks])
 
 
 # Create
@@ -130,7 +151,8 @@ class TestWorkspaceReadUpdate:
         # Went up from 5 to 7, since we now return the quota for remaining
         # seats
         # One more for user invites
-        with django_assert_num_queries(8):
+        # One more for computing the ETag
+        with django_assert_num_queries(9):
             response = rest_user_client.get(resource_url)
             assert response.status_code == 200, response.data
         assert response.data == {
@@ -177,7 +199,7 @@ class TestWorkspaceReadUpdate:
     ) -> None:
         """Assert that trial limits are annotated correctly."""
         customer_cancel_subscription(customer=workspace.customer)
-        with django_assert_num_queries(13):
+        with django_assert_num_queries(15):
             response = rest_user_client.get(resource_url)
         assert response.status_code == 200, response.data
         assert response.data == {
@@ -262,6 +284,137 @@ class TestWorkspaceReadUpdate:
         workspace.refresh_from_db()
         assert workspace.title == "New title"
 
+    def test_not_modified(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        workspace: Workspace,
+        team_member: TeamMember,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    ) -> None:
+        """Test that an unchanged workspace is not fetched again."""
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 200, response.data
+        etag = response["ETag"]
+        assert response["Cache-Control"] == "private, no-cache"
+        with django_assert_num_queries(1):
+            response = rest_user_client.get(
+                resource_url, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        # Changing the user's name must change the workspace's ETag
+        with django_capture_on_commit_callbacks(execute=True):
+            user_update(
+                who=team_member.user,
+                user=team_member.user,
+                preferred_name="Someone else",
+            )
+        response = rest_user_client.get(resource_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, response.data
+        assert response["ETag"] != etag
+
+    def test_async_dispatch(
+        self,
+        resource_url: str,
+        user: AbstractBaseUser,
+        workspace: Workspace,
+        team_member: TeamMember,
+    ) -> None:
+        """Test reading and writing through the async request handler."""
+        view = resolve(resource_url).func
+        assert iscoroutinefunction(view)
+        assert getattr(view, "cls") is WorkspaceReadUpdate
+        client = AsyncClient()
+
+        async def get() -> HttpResponse:
+            return await client.get(resource_url)
+
+        async def put() -> HttpResponse:
+            return await client.put(
+                resource_url,
+                {"title": "Renamed"},
+                content_type="application/json",
+            )
+
+        response = async_to_sync(get)()
+        assert response.status_code == 403, response.content
+        client.force_login(user)
+        response = async_to_sync(get)()
+        assert response.status_code == 200, response.content
+        assert json.loads(response.content)["uuid"] == str(workspace.uuid)
+        response = async_to_sync(put)()
+        assert response.status_code == 200, response.content
+        workspace.refresh_from_db()
+        assert workspace.title == "Renamed"
+
+
+@pytest.mark.django_db
+class TestWorkspaceExport:
+    """Test WorkspaceExport."""
+
+    @pytest.fixture
+    def resource_url(self, workspace: Workspace) -> str:
+        """Return URL to resource."""
+        return reverse("workspace:workspaces:export", args=(workspace.uuid,))
+
+    def test_jsonl(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        workspace: Workspace,
+        task: Task,
+        team_member: TeamMember,
+    ) -> None:
+        """Test streaming all records as JSON lines."""
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert response["Content-Disposition"] == (
+            f'attachment; filename="{workspace.uuid}.jsonl"'
+        )
+        assert isinstance(response, StreamingHttpResponse)
+        content = async_to_sync(collect)(response)
+        records = [json.loads(line) for line in content.splitlines()]
+        assert {r["type"] for r in records} >= {"workspace", "task"}
+
+    def test_csv(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+        team_member: TeamMember,
+    ) -> None:
+        """Test streaming tasks as CSV."""
+        response = rest_user_client.get(resource_url, {"file_format": "csv"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        assert isinstance(response, StreamingHttpResponse)
+        content = async_to_sync(collect)(response)
+        assert task.title in content.decode()
+
+    def test_invalid_format(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that unknown formats are rejected."""
+        response = rest_user_client.get(resource_url, {"file_format": "xlsx"})
+        assert response.status_code == 400, response.data
+
+    def test_unrelated_user(
+        self,
+        rest_meddling_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that other users can't export the workspace."""
+        response = rest_meddling_client.get(resource_url)
+        assert response.status_code == 404, response.data
+
 
 # Delete
 
@@ -476,3 +629,60 @@ class TestInviteUserToWorkspace:
             "details": {"email": "User with this email was never invited"},
             "general": None,
         }
+
+
+@pytest.mark.django_db
+class TestBulkInviteUsersToWorkspace:
+    """Test BulkInviteUsersToWorkspace."""
+
+    @pytest.fixture
+    def resource_url(self, workspace: Workspace) -> str:
+        """Return URL to this view."""
+        return reverse(
+            "workspace:workspaces:bulk-invite-team-members",
+            args=(workspace.uuid,),
+        )
+
+    def test_invite(
+        self,
+        resource_url: str,
+        rest_user_client: APIClient,
+        workspace: Workspace,
+        team_member: TeamMember,
+        other_user: User,
+        mailoutbox: Mailbox,
+    ) -> None:
+        """Test inviting new users, an existing user and a team member."""
+        response = rest_user_client.post(
+            resource_url,
+            {
+                "emails": [
+                    "taro@yamamoto.jp",
+                    "hanako@yamamoto.jp",
+                    other_user.email,
+                    team_member.user.email,
+                ]
+            },
+            format="json",
+        )
+        assert response.status_code == 201, response.data
+        assert response.data == [
+            {"email": "taro@yamamoto.jp", "result": "invited"},
+            {"email": "hanako@yamamoto.jp", "result": "invited"},
+            {"email": other_user.email, "result": "added"},
+            {"email": team_member.user.email, "result": "already_added"},
+        ]
+        assert workspace.teammemberinvite_set.count() == 2
+        assert len(mailoutbox) == 2
+
+    def test_invalid_email(
+        self, resource_url: str, rest_user_client: APIClient
+    ) -> None:
+        """Test that nobody is invited if an email is invalid."""
+        response = rest_user_client.post(
+            resource_url,
+            {"emails": ["taro@yamamoto.jp", "hanako"]},
+            format="json",
+        )
+        assert response.status_code == 400, response.data
+        assert TeamMemberInvite.objects.count() == 0
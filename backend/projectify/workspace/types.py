@@ -4,7 +4,7 @@
 """Shared type definitions in workspace app."""
 
 from dataclasses import dataclass
-from typing import Literal, Optional, TypedDict
+from typing import Any, Literal, NotRequired, Optional, TypedDict
 
 from projectify.corporate.types import WorkspaceFeatures
 
@@ -16,6 +16,27 @@ class ConsumerEvent(TypedDict):
     resource: Literal["workspace", "project", "task"]
     uuid: str
     kind: Literal["changed", "gone"]
+    # Sequence number in the resource's change log, only when changed
+    sequence: NotRequired[int]
+
+
+class ChatMessageEvent(TypedDict):
+    """Contains a new chat message to send to a task's subscribers."""
+
+    type: Literal["chat_message"]
+    uuid: str
+    # A task detail chat message, see ChatMessageBaseSerializer
+    content: dict[str, Any]
+    # Sequence number in the task's change log
+    sequence: int
+
+
+class ResyncEvent(TypedDict):
+    """Queued by a consumer for resources whose events it had to drop."""
+
+    type: Literal["resync"]
+    resource: Literal["workspace", "project", "task"]
+    uuid: str
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -45,3 +66,6 @@ class WorkspaceQuota:
 
 
 Resource = Literal["workspace", "project", "task"]
+
+# What inviting an email address to a workspace did
+InviteResult = Literal["added", "invited", "already_added", "already_invited"]
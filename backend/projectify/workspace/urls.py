@@ -18,7 +18,13 @@ from projectify.workspace.views.section import (
     SectionReadUpdateDelete,
 )
 
+from .views.chat_message import ChatMessageList
 from .views.task import (
+    TaskAssignedList,
+    TaskBulkAssign,
+    TaskBulkDelete,
+    TaskBulkLabel,
+    TaskBulkMoveToSection,
     TaskCreate,
     TaskMoveAfterTask,
     TaskMoveToSection,
@@ -26,10 +32,12 @@ from .views.task import (
 )
 from .views.team_member import TeamMemberReadUpdateDelete
 from .views.workspace import (
+    BulkInviteUsersToWorkspace,
     InviteUserToWorkspace,
     UninviteUserFromWorkspace,
     UserWorkspaces,
     WorkspaceCreate,
+    WorkspaceExport,
     WorkspacePictureUploadView,
     WorkspaceReadUpdate,
 )
@@ -68,11 +76,21 @@ workspace_patterns = (
         InviteUserToWorkspace.as_view(),
         name="invite-team-member",
     ),
+    path(
+        "<uuid:workspace_uuid>/bulk-invite-team-members",
+        BulkInviteUsersToWorkspace.as_view(),
+        name="bulk-invite-team-members",
+    ),
     path(
         "<uuid:workspace_uuid>/uninvite-team-member",
         UninviteUserFromWorkspace.as_view(),
         name="uninvite-team-member",
     ),
+    path(
+        "<uuid:workspace_uuid>/export",
+        WorkspaceExport.as_view(),
+        name="export",
+    ),
     # Related
     # Archived projects
     path(
@@ -140,6 +158,12 @@ task_patterns = (
         TaskCreate.as_view(),
         name="create",
     ),
+    # Read
+    path(
+        "assigned",
+        TaskAssignedList.as_view(),
+        name="assigned",
+    ),
     # Read, Update, Delete
     path(
         "<uuid:task_uuid>",
@@ -148,6 +172,26 @@ task_patterns = (
         name="read-update-delete",
     ),
     # RPC
+    path(
+        "bulk/move-to-section",
+        TaskBulkMoveToSection.as_view(),
+        name="bulk-move-to-section",
+    ),
+    path(
+        "bulk/assign",
+        TaskBulkAssign.as_view(),
+        name="bulk-assign",
+    ),
+    path(
+        "bulk/label",
+        TaskBulkLabel.as_view(),
+        name="bulk-label",
+    ),
+    path(
+        "bulk/delete",
+        TaskBulkDelete.as_view(),
+        name="bulk-delete",
+    ),
     path(
         "<uuid:task_uuid>/move-to-section",
         TaskMoveToSection.as_view(),
@@ -158,6 +202,12 @@ task_patterns = (
         TaskMoveAfterTask.as_view(),
         name="move-after-task",
     ),
+    # Chat messages
+    path(
+        "<uuid:task_uuid>/chat-messages",
+        ChatMessageList.as_view(),
+        name="chat-messages",
+    ),
 )
 
 label_patterns = (
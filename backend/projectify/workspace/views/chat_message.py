@@ -1,31 +1,77 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 #
-# SPDX-FileCopyrightText: 2023 JWP Consulting GK
+# SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """
 Chat message views.
 
-Chat messages will not be in the initial release. Therefore, there will be
-no replacement DRF views here and the mutations can just be deleted.
+A task's detail only contains its latest chat messages, see
+projectify.workspace.selectors.task.CHAT_MESSAGE_WINDOW. Clients page
+through the rest here.
+"""
 
-Maybe some brief remarks here would be good to show which permission checks
-were done so far.
+from uuid import UUID
 
-This is the previous mutation we have had:
-@strawberry.field
-def add_chat_message(
-    self, info: GraphQLResolveInfo, input: AddChatMessageInput
-) -> types.ChatMessage:
-    qs = models.Task.objects.filter_for_user_and_uuid(
-        info.context.user,
-        input.task_uuid,
-    )
-    task = get_object_or_404(qs)
-    assert info.context.user.has_perm(
-        "workspace.create_chat_message", task
-    )
-    chat_message = task.add_chat_message(
-        text=input.text,
-        author=info.context.user,
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from projectify.lib.query_budget import query_budget
+from projectify.lib.schema import extend_schema
+from projectify.workspace.selectors.chat_message import (
+    chat_message_find_for_task,
+)
+from projectify.workspace.selectors.task import (
+    CHAT_MESSAGE_WINDOW,
+    task_find_by_task_uuid,
+)
+from projectify.workspace.serializers.base import ChatMessageBaseSerializer
+
+
+class ChatMessagePagination(CursorPagination):
+    """Page through chat messages, newest first."""
+
+    page_size = CHAT_MESSAGE_WINDOW
+    ordering = ("-created", "-pk")
+
+
+# Read
+class ChatMessageList(APIView):
+    """List a task's chat messages."""
+
+    class ChatMessageListQuerySerializer(serializers.Serializer):
+        """Accept the cursor of the page to return."""
+
+        cursor = serializers.CharField(required=False)
+
+    class ChatMessagePageSerializer(serializers.Serializer):
+        """Serialize a page of chat messages."""
+
+        next = serializers.URLField(allow_null=True)
+        previous = serializers.URLField(allow_null=True)
+        results = ChatMessageBaseSerializer(many=True)
+
+    @extend_schema(
+        parameters=[ChatMessageListQuerySerializer],
+        responses={200: ChatMessagePageSerializer},
     )
-    return chat_message
-"""
+    @query_budget(2)
+    def get(self, request: Request, task_uuid: UUID) -> Response:
+        """Handle GET."""
+        task = task_find_by_task_uuid(who=request.user, task_uuid=task_uuid)
+        if task is None:
+            raise NotFound(
+                _("Task with uuid {task_uuid} not found").format(
+                    task_uuid=task_uuid
+                )
+            )
+        paginator = ChatMessagePagination()
+        page = paginator.paginate_queryset(
+            chat_message_find_for_task(task=task), request, view=self
+        )
+        serializer = ChatMessageBaseSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
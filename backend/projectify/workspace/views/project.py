@@ -6,19 +6,29 @@
 from uuid import UUID
 
 from django.http import Http404, HttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import render
 from django.utils.translation import gettext_lazy as _
 
+from asgiref.sync import sync_to_async
 from rest_framework import serializers, status
 from rest_framework.exceptions import NotFound
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from projectify.lib.conditional import etag_matches, not_modified, with_etag
 from projectify.lib.error_schema import DeriveSchema
+from projectify.lib.query_budget import query_budget
 from projectify.lib.schema import extend_schema
 from projectify.lib.types import AuthenticatedHttpRequest
-from projectify.lib.views import platform_view
+from projectify.lib.views import (
+    AsyncReadAPIView,
+    dashboard_base_template,
+    htmx_target_uuid,
+    platform_view,
+    vary_on_htmx,
+)
 from projectify.workspace.models import Project
 from projectify.workspace.selectors.project import (
     ProjectDetailQuerySet,
@@ -26,6 +36,10 @@ from projectify.workspace.selectors.project import (
     project_find_by_workspace_uuid,
 )
 from projectify.workspace.selectors.quota import workspace_get_all_quotas
+from projectify.workspace.selectors.version import (
+    resource_etag_find,
+    section_versions_get,
+)
 from projectify.workspace.selectors.workspace import (
     workspace_find_by_workspace_uuid,
 )
@@ -37,23 +51,41 @@ from projectify.workspace.services.project import (
     project_delete,
     project_update,
 )
+from projectify.workspace.views.section import section_partial
 
 
 # HTML
 @platform_view
+@vary_on_htmx
+@query_budget(17)
 def project_detail_view(
     request: AuthenticatedHttpRequest, project_uuid: UUID
 ) -> HttpResponse:
-    """Show project details."""
+    """Show project details, or only the section that HTMX targets."""
+    section_uuid = htmx_target_uuid(request)
+    if section_uuid is not None:
+        return section_partial(
+            request, section_uuid=section_uuid, project_uuid=project_uuid
+        )
     project = project_find_by_project_uuid(
         who=request.user, project_uuid=project_uuid, qs=ProjectDetailQuerySet
     )
     if project is None:
         raise Http404(_("No project found for this uuid"))
     project.workspace.quota = workspace_get_all_quotas(project.workspace)
+    sections = project.section_set.all()
+    versions = section_versions_get(section_ids=[s.pk for s in sections])
+    for section in sections:
+        section.version = versions[section.pk]
+    # Sections are cached with their forms' CSRF tokens, which are only
+    # valid for the secret they were made with. Making sure that there is
+    # a secret lets them be cached per secret, and so per session.
+    get_token(request)
     context = {
         "object": project,
         "labels": list(project.workspace.label_set.values()),
+        "base_template": dashboard_base_template(request),
+        "csrf_secret": request.META["CSRF_COOKIE"],
     }
     return render(request, "workspace/project_detail.html", context)
 
@@ -104,24 +136,34 @@ class ProjectCreate(APIView):
 
 
 # Read + Update + Delete
-class ProjectReadUpdateDelete(APIView):
+class ProjectReadUpdateDelete(AsyncReadAPIView):
     """Project retrieve view."""
 
     @extend_schema(
-        responses={200: ProjectDetailSerializer},
+        responses={200: ProjectDetailSerializer, 304: None},
     )
-    def get(self, request: Request, project_uuid: UUID) -> Response:
+    @query_budget(15)
+    async def get(self, request: Request, project_uuid: UUID) -> Response:
         """Handle GET."""
-        project = project_find_by_project_uuid(
+        etag = await sync_to_async(resource_etag_find)(
+            who=request.user, resource="project", uuid=project_uuid
+        )
+        if etag is None:
+            raise NotFound(_("No project found for this uuid"))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        project = await sync_to_async(project_find_by_project_uuid)(
             who=request.user,
             project_uuid=project_uuid,
             qs=ProjectDetailQuerySet,
         )
         if project is None:
             raise NotFound(_("No project found for this uuid"))
-        project.workspace.quota = workspace_get_all_quotas(project.workspace)
+        project.workspace.quota = await sync_to_async(
+            workspace_get_all_quotas
+        )(project.workspace)
         serializer = ProjectDetailSerializer(instance=project)
-        return Response(serializer.data)
+        return with_etag(Response(serializer.data), etag)
 
     class ProjectUpdateSerializer(serializers.ModelSerializer[Project]):
         """Serializer for PUT."""
@@ -3,8 +3,11 @@
 # SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """Section views."""
 
+from typing import Optional
 from uuid import UUID
 
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers, status
@@ -15,6 +18,7 @@ from rest_framework.views import APIView
 
 from projectify.lib.error_schema import DeriveSchema
 from projectify.lib.schema import extend_schema
+from projectify.lib.types import AuthenticatedHttpRequest
 from projectify.workspace.models import Section
 from projectify.workspace.selectors.project import project_find_by_project_uuid
 from projectify.workspace.selectors.section import (
@@ -30,6 +34,34 @@ from projectify.workspace.services.section import (
 )
 
 
+# HTML
+def section_partial(
+    request: AuthenticatedHttpRequest,
+    section_uuid: UUID,
+    project_uuid: Optional[UUID] = None,
+) -> HttpResponse:
+    """
+    Render a single section of the project page.
+
+    HTMX swaps it in for the section on the page, so that a change to a
+    section's tasks doesn't re-render the whole project.
+    """
+    qs = SectionDetailQuerySet
+    if project_uuid is not None:
+        qs = qs.filter(project__uuid=project_uuid)
+    section = section_find_for_user_and_uuid(
+        user=request.user, section_uuid=section_uuid, qs=qs
+    )
+    if section is None:
+        raise Http404(_("Section not found"))
+    return render(
+        request,
+        "workspace/project_detail/section.html",
+        {"section": section},
+    )
+
+
+# Create
 class SectionCreate(APIView):
     """Create a section."""
 
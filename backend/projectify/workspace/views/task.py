@@ -4,7 +4,7 @@
 """Task CRUD views."""
 
 import logging
-from typing import Any, Literal, Optional, Union
+from typing import Any, Literal, Optional, Sequence, Union
 from uuid import UUID
 
 from django import forms
@@ -16,28 +16,44 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.http import require_http_methods, require_POST
 
+from asgiref.sync import sync_to_async
 from rest_framework import serializers, status
 from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from projectify.lib.conditional import etag_matches, not_modified, with_etag
 from projectify.lib.error_schema import DeriveSchema
+from projectify.lib.query_budget import query_budget
 from projectify.lib.schema import extend_schema
 from projectify.lib.types import AuthenticatedHttpRequest
-from projectify.lib.views import platform_view
+from projectify.lib.views import (
+    AsyncReadAPIView,
+    dashboard_base_template,
+    platform_view,
+    vary_on_htmx,
+)
 from projectify.workspace.models.label import Label
 from projectify.workspace.models.section import Section
 from projectify.workspace.models.task import Task
 from projectify.workspace.models.workspace import Workspace
+from projectify.workspace.selectors.project import (
+    project_find_by_workspace_uuid,
+)
 from projectify.workspace.selectors.section import (
     SectionDetailQuerySet,
     section_find_for_user_and_uuid,
 )
 from projectify.workspace.selectors.task import (
     TaskDetailQuerySet,
+    task_find_assigned_to_user,
     task_find_by_task_uuid,
+    task_find_by_task_uuids,
 )
+from projectify.workspace.selectors.version import resource_etag_find
+from projectify.workspace.serializers.task import TaskAssignedSerializer
 from projectify.workspace.serializers.task_detail import (
     TaskCreateSerializer,
     TaskDetailSerializer,
@@ -49,12 +65,17 @@ from projectify.workspace.services.sub_task import (
     ValidatedDatumWithUuid,
 )
 from projectify.workspace.services.task import (
+    task_bulk_assign,
+    task_bulk_delete,
+    task_bulk_label,
+    task_bulk_move_to_section,
     task_create_nested,
     task_delete,
     task_move_after,
     task_move_in_direction,
     task_update_nested,
 )
+from projectify.workspace.views.section import section_partial
 
 logger = logging.getLogger(__name__)
 
@@ -156,6 +177,9 @@ def task_create(
     )
     if section is None:
         raise Http404(_("Section not found"))
+    projects = project_find_by_workspace_uuid(
+        who=request.user, workspace_uuid=section.project.workspace.uuid
+    )
     if request.method == "GET":
         return render(
             request,
@@ -164,6 +188,7 @@ def task_create(
                 "form": TaskCreateForm(workspace=section.project.workspace),
                 "formset": TaskCreateSubTaskForms(),
                 "section": section,
+                "projects": projects,
             },
         )
     form = TaskCreateForm(section.project.workspace, request.POST)
@@ -173,7 +198,12 @@ def task_create(
         return render(
             request,
             "workspace/task_create.html",
-            {"form": form, "formset": formset, "section": section},
+            {
+                "form": form,
+                "formset": formset,
+                "section": section,
+                "projects": projects,
+            },
             status=400,
         )
 
@@ -199,6 +229,8 @@ def task_create(
 
 
 @platform_view
+@vary_on_htmx
+@query_budget(8)
 def task_detail(
     request: AuthenticatedHttpRequest, task_uuid: UUID
 ) -> HttpResponse:
@@ -208,7 +240,10 @@ def task_detail(
     )
     if task is None:
         raise Http404(_(f"Could not find task with uuid {task_uuid}"))
-    context = {"task": task}
+    context = {
+        "task": task,
+        "base_template": dashboard_base_template(request),
+    }
     return render(request, "workspace/task_detail.html", context)
 
 
@@ -258,6 +293,7 @@ def determine_action(
 
 
 @platform_view
+@vary_on_htmx
 @require_http_methods(["GET", "POST"])
 def task_update_view(
     request: AuthenticatedHttpRequest, task_uuid: UUID
@@ -287,7 +323,12 @@ def task_update_view(
         logger.info("Adding sub task")
         form = TaskUpdateForm(data=post, workspace=workspace)
         formset = TaskUpdateSubTaskForms(data=post)
-        context = {"form": form, "task": task, "formset": formset}
+        context = {
+            "form": form,
+            "task": task,
+            "formset": formset,
+            "base_template": dashboard_base_template(request),
+        }
         return render(request, "workspace/task_update.html", context)
 
     task_initial = {
@@ -305,7 +346,12 @@ def task_update_view(
     if action == "get":
         form = TaskUpdateForm(initial=task_initial, workspace=workspace)
         formset = TaskUpdateSubTaskForms(initial=sub_tasks_initial)
-        context = {"form": form, "task": task, "formset": formset}
+        context = {
+            "form": form,
+            "task": task,
+            "formset": formset,
+            "base_template": dashboard_base_template(request),
+        }
         return render(request, "workspace/task_update.html", context)
 
     form = TaskUpdateForm(
@@ -318,7 +364,12 @@ def task_update_view(
     )
     formset.full_clean()
     if not form.is_valid() or not formset.is_valid():
-        context = {"form": form, "task": task, "formset": formset}
+        context = {
+            "form": form,
+            "task": task,
+            "formset": formset,
+            "base_template": dashboard_base_template(request),
+        }
         return render(request, "workspace/task_update.html", context)
 
     cleaned_data = form.cleaned_data
@@ -372,12 +423,25 @@ class TaskMoveForm(forms.Form):
     down = forms.CharField(required=False)
 
 
+@platform_view
 @require_POST
+@query_budget(19)
 def task_move(
     request: AuthenticatedHttpRequest, task_uuid: UUID
 ) -> HttpResponse:
-    """Move a task depending on form input."""
-    task = get_object(request, task_uuid)
+    """
+    Move a task depending on form input.
+
+    HTMX requests receive the task's section, everything else is redirected
+    to the project.
+    """
+    task = task_find_by_task_uuid(
+        who=request.user,
+        task_uuid=task_uuid,
+        qs=Task.objects.select_related("section__project__workspace"),
+    )
+    if task is None:
+        raise Http404(_(f"Could not find task with uuid {task_uuid}"))
     form = TaskMoveForm(request.POST)
     if not form.is_valid():
         # TODO
@@ -396,13 +460,9 @@ def task_move(
     )
 
     if request.htmx:
-        return render(
-            request,
-            "workspace/project_detail/section.html",
-            {"section": task.section},
-        )
+        return section_partial(request, section_uuid=task.section.uuid)
 
-    return redirect("workspace:projects:view", task.section.project.uuid)
+    return redirect("dashboard:projects:detail", task.section.project.uuid)
 
 
 # Create
@@ -446,18 +506,78 @@ class TaskCreate(APIView):
         )
 
 
+# Read
+class TaskAssignedPagination(PageNumberPagination):
+    """Page through assigned tasks."""
+
+    page_size = 50
+
+
+class TaskAssignedList(APIView):
+    """List the tasks assigned to the user, in all workspaces."""
+
+    class TaskAssignedListQuerySerializer(serializers.Serializer):
+        """Accept the page and the sort order."""
+
+        page = serializers.IntegerField(required=False, min_value=1)
+        order_by = serializers.ChoiceField(
+            choices=["due_date", "-due_date"], default="due_date"
+        )
+
+    class TaskAssignedPageSerializer(serializers.Serializer):
+        """Serialize a page of assigned tasks."""
+
+        count = serializers.IntegerField()
+        next = serializers.URLField(allow_null=True)
+        previous = serializers.URLField(allow_null=True)
+        results = TaskAssignedSerializer(many=True)
+
+    @extend_schema(
+        parameters=[TaskAssignedListQuerySerializer],
+        responses={200: TaskAssignedPageSerializer},
+    )
+    @query_budget(2)
+    def get(self, request: Request) -> Response:
+        """Handle GET."""
+        query = self.TaskAssignedListQuerySerializer(data=request.GET)
+        query.is_valid(raise_exception=True)
+        paginator = TaskAssignedPagination()
+        page = paginator.paginate_queryset(
+            task_find_assigned_to_user(
+                who=request.user,
+                order_by=query.validated_data["order_by"],
+            ),
+            request,
+            view=self,
+        )
+        serializer = TaskAssignedSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 # Read + Update + Delete
-class TaskRetrieveUpdateDelete(APIView):
+class TaskRetrieveUpdateDelete(AsyncReadAPIView):
     """Retrieve a task."""
 
     @extend_schema(
-        responses={200: TaskDetailSerializer},
+        responses={200: TaskDetailSerializer, 304: None},
     )
-    def get(self, request: Request, task_uuid: UUID) -> Response:
+    @query_budget(5)
+    async def get(self, request: Request, task_uuid: UUID) -> Response:
         """Handle GET."""
-        instance = get_object(request, task_uuid)
+        etag = await sync_to_async(resource_etag_find)(
+            who=request.user, resource="task", uuid=task_uuid
+        )
+        if etag is None:
+            raise NotFound(
+                _("Task with uuid {task_uuid} not found").format(
+                    task_uuid=task_uuid
+                )
+            )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        instance = await sync_to_async(get_object)(request, task_uuid)
         serializer = TaskDetailSerializer(instance=instance)
-        return Response(data=serializer.data)
+        return with_etag(Response(data=serializer.data), etag)
 
     @extend_schema(
         request=TaskUpdateSerializer,
@@ -591,3 +711,148 @@ class TaskMoveAfterTask(APIView):
         )
         output_serializer = TaskDetailSerializer(instance=task)
         return Response(output_serializer.data, status=status.HTTP_200_OK)
+
+
+# Bulk
+def get_objects(request: Request, task_uuids: Sequence[UUID]) -> list[Task]:
+    """Get tasks for user and uuids, unless any of them is missing."""
+    tasks = task_find_by_task_uuids(who=request.user, task_uuids=task_uuids)
+    if len(tasks) != len(set(task_uuids)):
+        raise NotFound(_("Not all tasks for these UUIDs were found"))
+    return tasks
+
+
+def get_labels(
+    workspace: Workspace, label_uuids: Sequence[UUID], field: str
+) -> list[Label]:
+    """Get this workspace's labels for uuids, unless any of them is missing."""
+    labels = list(workspace.label_set.filter(uuid__in=label_uuids))
+    if len(labels) != len(set(label_uuids)):
+        raise serializers.ValidationError(
+            {field: _("Not all labels for these UUIDs were found")}
+        )
+    return labels
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """Accept the uuids of the tasks to change."""
+
+    task_uuids = serializers.ListField(
+        child=serializers.UUIDField(), min_length=1, max_length=500
+    )
+
+
+class TaskBulkMoveToSection(APIView):
+    """Move several tasks to the beginning of a section."""
+
+    class TaskBulkMoveToSectionSerializer(TaskBulkSerializer):
+        """Accept the target section uuid."""
+
+        section_uuid = serializers.UUIDField()
+
+    @extend_schema(
+        request=TaskBulkMoveToSectionSerializer,
+        responses={204: None, 400: DeriveSchema},
+    )
+    @query_budget(12)
+    def post(self, request: Request) -> Response:
+        """Process the request."""
+        user = request.user
+        serializer = self.TaskBulkMoveToSectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        tasks = get_objects(request, data["task_uuids"])
+        section = section_find_for_user_and_uuid(
+            section_uuid=data["section_uuid"],
+            user=user,
+        )
+        if section is None:
+            raise serializers.ValidationError(
+                {"section_uuid": _("No section was found for the given uuid")}
+            )
+        task_bulk_move_to_section(who=user, tasks=tasks, section=section)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskBulkAssign(APIView):
+    """Assign several tasks to a team member, or unassign them."""
+
+    class TaskBulkAssignSerializer(TaskBulkSerializer):
+        """Accept the assignee's team member uuid, or null to unassign."""
+
+        assignee_uuid = serializers.UUIDField(allow_null=True)
+
+    @extend_schema(
+        request=TaskBulkAssignSerializer,
+        responses={204: None, 400: DeriveSchema},
+    )
+    @query_budget(9)
+    def post(self, request: Request) -> Response:
+        """Process the request."""
+        serializer = self.TaskBulkAssignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        tasks = get_objects(request, data["task_uuids"])
+        assignee_uuid: Optional[UUID] = data["assignee_uuid"]
+        assignee = None
+        if assignee_uuid is not None:
+            workspace = tasks[0].section.project.workspace
+            assignee = workspace.teammember_set.filter(
+                uuid=assignee_uuid
+            ).first()
+            if assignee is None:
+                raise serializers.ValidationError(
+                    {"assignee_uuid": _("The assignee could not be found")}
+                )
+        task_bulk_assign(who=request.user, tasks=tasks, assignee=assignee)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskBulkLabel(APIView):
+    """Add labels to and remove labels from several tasks."""
+
+    class TaskBulkLabelSerializer(TaskBulkSerializer):
+        """Accept the uuids of the labels to add and remove."""
+
+        add_label_uuids = serializers.ListField(
+            child=serializers.UUIDField(), default=list
+        )
+        remove_label_uuids = serializers.ListField(
+            child=serializers.UUIDField(), default=list
+        )
+
+    @extend_schema(
+        request=TaskBulkLabelSerializer,
+        responses={204: None, 400: DeriveSchema},
+    )
+    @query_budget(11)
+    def post(self, request: Request) -> Response:
+        """Process the request."""
+        serializer = self.TaskBulkLabelSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        tasks = get_objects(request, data["task_uuids"])
+        workspace = tasks[0].section.project.workspace
+        add = get_labels(workspace, data["add_label_uuids"], "add_label_uuids")
+        remove = get_labels(
+            workspace, data["remove_label_uuids"], "remove_label_uuids"
+        )
+        task_bulk_label(who=request.user, tasks=tasks, add=add, remove=remove)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskBulkDelete(APIView):
+    """Delete several tasks."""
+
+    @extend_schema(
+        request=TaskBulkSerializer,
+        responses={204: None, 400: DeriveSchema},
+    )
+    @query_budget(12)
+    def post(self, request: Request) -> Response:
+        """Process the request."""
+        serializer = TaskBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tasks = get_objects(request, serializer.validated_data["task_uuids"])
+        task_bulk_delete(who=request.user, tasks=tasks)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -3,13 +3,15 @@
 # SPDX-FileCopyrightText: 2023, 2024 JWP Consulting GK
 """Workspace CRUD views."""
 
+from typing import get_args
 from uuid import UUID
 
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 
+from asgiref.sync import sync_to_async
 from django_ratelimit.decorators import ratelimit
 from rest_framework import parsers, serializers, views
 from rest_framework.exceptions import NotFound
@@ -21,10 +23,13 @@ from rest_framework.status import (
     HTTP_204_NO_CONTENT,
 )
 
+from projectify.lib.conditional import etag_matches, not_modified, with_etag
 from projectify.lib.error_schema import DeriveSchema
-from projectify.lib.schema import extend_schema
+from projectify.lib.query_budget import query_budget
+from projectify.lib.schema import OpenApiResponse, extend_schema
+from projectify.lib.streaming import aiter_sync
 from projectify.lib.types import AuthenticatedHttpRequest
-from projectify.lib.views import platform_view
+from projectify.lib.views import AsyncReadAPIView, platform_view
 from projectify.workspace.selectors.project import (
     project_find_by_workspace_uuid,
 )
@@ -32,6 +37,8 @@ from projectify.workspace.selectors.quota import workspace_get_all_quotas
 
 from ..exceptions import UserAlreadyAdded, UserAlreadyInvited
 from ..models import Workspace
+from ..selectors.export import workspace_export
+from ..selectors.version import resource_etag_find
 from ..selectors.workspace import (
     WorkspaceDetailQuerySet,
     workspace_find_by_workspace_uuid,
@@ -41,9 +48,11 @@ from ..serializers.base import WorkspaceBaseSerializer
 from ..serializers.workspace import WorkspaceDetailSerializer
 from ..services.team_member_invite import (
     team_member_invite_create,
+    team_member_invite_create_many,
     team_member_invite_delete,
 )
 from ..services.workspace import workspace_create, workspace_update
+from ..types import InviteResult
 
 
 # HTML
@@ -106,7 +115,7 @@ class WorkspaceCreate(views.APIView):
 
 
 # Read
-class UserWorkspaces(views.APIView):
+class UserWorkspaces(AsyncReadAPIView):
     """List all workspaces for a user."""
 
     class UserWorkspaceSerializer(serializers.ModelSerializer[Workspace]):
@@ -119,9 +128,12 @@ class UserWorkspaces(views.APIView):
             model = Workspace
 
     @extend_schema(responses={200: UserWorkspaceSerializer(many=True)})
-    def get(self, request: Request) -> Response:
+    async def get(self, request: Request) -> Response:
         """Handle GET."""
-        workspaces = workspace_find_for_user(who=request.user)
+        workspaces = [
+            workspace
+            async for workspace in workspace_find_for_user(who=request.user)
+        ]
         serializer = self.UserWorkspaceSerializer(
             instance=workspaces, many=True
         )
@@ -129,24 +141,36 @@ class UserWorkspaces(views.APIView):
 
 
 # Read + Update
-class WorkspaceReadUpdate(views.APIView):
+class WorkspaceReadUpdate(AsyncReadAPIView):
     """Workspace read and update view."""
 
     @extend_schema(
-        responses={200: WorkspaceDetailSerializer},
+        responses={200: WorkspaceDetailSerializer, 304: None},
     )
-    def get(self, request: Request, workspace_uuid: UUID) -> Response:
+    @query_budget(9)
+    async def get(self, request: Request, workspace_uuid: UUID) -> Response:
         """Handle GET."""
-        workspace = workspace_find_by_workspace_uuid(
+        etag = await sync_to_async(resource_etag_find)(
+            who=request.user, resource="workspace", uuid=workspace_uuid
+        )
+        if etag is None:
+            raise NotFound(_("Could not find workspace with this UUID"))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        workspace = await sync_to_async(workspace_find_by_workspace_uuid)(
             who=request.user,
             workspace_uuid=workspace_uuid,
             qs=WorkspaceDetailQuerySet,
         )
         if workspace is None:
             raise NotFound(_("Could not find workspace with this UUID"))
-        workspace.quota = workspace_get_all_quotas(workspace)
+        workspace.quota = await sync_to_async(workspace_get_all_quotas)(
+            workspace
+        )
         serializer = WorkspaceDetailSerializer(instance=workspace)
-        return Response(status=HTTP_200_OK, data=serializer.data)
+        return with_etag(
+            Response(status=HTTP_200_OK, data=serializer.data), etag
+        )
 
     class WorkspaceUpdateSerializer(serializers.ModelSerializer[Workspace]):
         """Accept title, description."""
@@ -182,6 +206,56 @@ class WorkspaceReadUpdate(views.APIView):
         return Response(status=HTTP_200_OK, data=serializer.data)
 
 
+class WorkspaceExport(views.APIView):
+    """Export a whole workspace."""
+
+    CONTENT_TYPES = {
+        "jsonl": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+
+    class WorkspaceExportQuerySerializer(serializers.Serializer):
+        """Accept the file format, JSON lines by default."""
+
+        file_format = serializers.ChoiceField(
+            choices=["jsonl", "csv"], default="jsonl"
+        )
+
+    @extend_schema(
+        parameters=[WorkspaceExportQuerySerializer],
+        responses={
+            200: OpenApiResponse(
+                description="JSON lines with all records, or CSV with "
+                "one row per task"
+            )
+        },
+    )
+    @method_decorator(ratelimit(key="user", rate="10/h"))
+    def get(
+        self, request: Request, workspace_uuid: UUID
+    ) -> StreamingHttpResponse:
+        """Handle GET."""
+        serializer = self.WorkspaceExportQuerySerializer(data=request.GET)
+        serializer.is_valid(raise_exception=True)
+        file_format = serializer.validated_data["file_format"]
+        workspace = workspace_find_by_workspace_uuid(
+            who=request.user, workspace_uuid=workspace_uuid
+        )
+        if workspace is None:
+            raise NotFound(_("Could not find workspace with this UUID"))
+        # Rows are only read while the response is sent
+        chunks = workspace_export(workspace=workspace, file_format=file_format)
+        return StreamingHttpResponse(
+            aiter_sync(chunks),
+            content_type=self.CONTENT_TYPES[file_format],
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="{workspace.uuid}.{file_format}"'
+                )
+            },
+        )
+
+
 # Delete
 
 
@@ -270,6 +344,60 @@ class InviteUserToWorkspace(views.APIView):
         return Response(data=serializer.data, status=HTTP_201_CREATED)
 
 
+class BulkInviteUsersToWorkspace(views.APIView):
+    """Invite several users to a workspace at once."""
+
+    class BulkInviteUsersToWorkspaceSerializer(serializers.Serializer):
+        """Accept emails."""
+
+        emails = serializers.ListField(
+            child=serializers.EmailField(), min_length=1, max_length=500
+        )
+
+    class BulkInviteResultSerializer(serializers.Serializer):
+        """Tell what happened for one email."""
+
+        email = serializers.EmailField()
+        result = serializers.ChoiceField(
+            choices=list(get_args(InviteResult)), read_only=True
+        )
+
+    @extend_schema(
+        request=BulkInviteUsersToWorkspaceSerializer,
+        responses={
+            201: BulkInviteResultSerializer(many=True),
+            400: DeriveSchema,
+        },
+    )
+    @method_decorator(ratelimit(key="user", rate="5/h"))
+    @query_budget(18)
+    def post(self, request: Request, workspace_uuid: UUID) -> Response:
+        """Handle POST."""
+        workspace = workspace_find_by_workspace_uuid(
+            workspace_uuid=workspace_uuid, who=request.user
+        )
+        if workspace is None:
+            raise NotFound(_("No workspace found for this UUID"))
+
+        serializer = self.BulkInviteUsersToWorkspaceSerializer(
+            data=request.data
+        )
+        serializer.is_valid(raise_exception=True)
+        results = team_member_invite_create_many(
+            who=request.user,
+            workspace=workspace,
+            emails=serializer.validated_data["emails"],
+        )
+        response_serializer = self.BulkInviteResultSerializer(
+            [
+                {"email": email, "result": result}
+                for email, result in results.items()
+            ],
+            many=True,
+        )
+        return Response(data=response_serializer.data, status=HTTP_201_CREATED)
+
+
 class UninviteUserFromWorkspace(views.APIView):
     """Remove a user invitation."""
 
@@ -14,3 +14,6 @@ DjangoAssertNumQueries = Callable[
     [int], contextlib.AbstractContextManager[None]
 ]
 Mailbox = Sequence[EmailMessage]
+DjangoCaptureOnCommitCallbacks = Callable[
+    ..., contextlib.AbstractContextManager[list[Callable[[], Any]]]
+]
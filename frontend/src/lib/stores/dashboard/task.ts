@@ -56,4 +56,12 @@ export const currentTask = createWsStore<TaskDetail>(
         }
         return undefined;
     },
+    (task, content) => {
+        // Chat messages are ordered oldest first
+        type ChatMessage = TaskDetail["chat_messages"][number];
+        return {
+            ...task,
+            chat_messages: [...task.chat_messages, content as ChatMessage],
+        };
+    },
 );
@@ -27,7 +27,13 @@ function makeAbsoluteUrl(url: string): string {
 type EventListener = (resp: WsResponse) => void;
 
 type WsRequest =
-    | { action: "subscribe"; resource: SubscriptionType; uuid: string }
+    | {
+          action: "subscribe";
+          resource: SubscriptionType;
+          uuid: string;
+          // The last sequence number seen, when subscribing again
+          since?: number;
+      }
     | { action: "unsubscribe"; resource: SubscriptionType; uuid: string };
 type WsResponse =
     | {
@@ -35,17 +41,33 @@ type WsResponse =
               | "already_subscribed"
               | "not_subscribed"
               | "not_found"
+              | "too_many_subscriptions"
               | "gone"
-              | "subscribed"
               | "unsubscribed";
           resource: SubscriptionType;
           uuid: string;
       }
+    | {
+          // resync means that the resource has to be fetched again
+          kind: "subscribed" | "resync";
+          resource: SubscriptionType;
+          uuid: string;
+          sequence: number;
+      }
     | {
           kind: "changed";
           resource: SubscriptionType;
           uuid: string;
           content: unknown;
+          sequence?: number;
+      }
+    | {
+          // A new chat message for a task
+          kind: "chat_message";
+          resource: "task";
+          uuid: string;
+          content: unknown;
+          sequence: number;
       };
 
 type ConnectionState =
@@ -219,6 +241,7 @@ async function subscribeToResource(
     resource: Resource,
     listener: EventListener,
     reconnect: Reconnector,
+    since?: number,
 ): Promise<AsyncUnsubscriber> {
     let state:
         | "subscribing"
@@ -227,7 +250,7 @@ async function subscribeToResource(
         | "unsubscribed" = "subscribing";
     const messageListener: Listener = {
         resource,
-        kind: ["gone", "changed"],
+        kind: ["gone", "changed", "resync", "chat_message"],
         callback: listener,
         reconnect,
     };
@@ -254,7 +277,7 @@ async function subscribeToResource(
         }
         state = "unsubscribed";
     };
-    sendWs({ action: "subscribe", ...resource });
+    sendWs({ action: "subscribe", ...resource, since });
 
     const established = new Promise<AsyncUnsubscriber>((resolve, reject) => {
         const establishedConnectionCb = (response: WsResponse) => {
@@ -266,9 +289,23 @@ async function subscribeToResource(
                 );
                 return;
             }
+            if (response.kind === "too_many_subscriptions") {
+                reject(
+                    new Error(
+                        `Too many subscriptions to subscribe to ${JSON.stringify(
+                            resource,
+                        )}`,
+                    ),
+                );
+                return;
+            }
             if (response.kind === "already_subscribed") {
                 console.info("Already subscribed to resource", resource);
             }
+            if (response.kind === "subscribed") {
+                // Pass on the sequence number
+                listener(response);
+            }
 
             console.debug(
                 "Subscribed to resource",
@@ -283,7 +320,12 @@ async function subscribeToResource(
         };
         const subscribedListener: Listener = {
             resource,
-            kind: ["not_found", "already_subscribed", "subscribed"],
+            kind: [
+                "not_found",
+                "too_many_subscriptions",
+                "already_subscribed",
+                "subscribed",
+            ],
             callback: establishedConnectionCb,
             reconnect() {
                 reject(
@@ -328,12 +370,16 @@ type WsStoreState<T> =
 export function createWsStore<T extends HasUuid>(
     resource: SubscriptionType,
     getter: RepoGetter<T>,
+    // Fold a chat message sent for this resource into its current value
+    onChatMessage?: (value: T, content: unknown) => T,
 ): WsResource<T> {
     type State = WsStoreState<T>;
     let state: State = { kind: "start" };
+    // Latest sequence number seen for the current uuid
+    let sequence: number | undefined = undefined;
     const loadMutex = new Mutex();
 
-    const { subscribe, set } = writable<WsResourceContainer<T>>(
+    const { subscribe, set, update } = writable<WsResourceContainer<T>>(
         {
             or: (t: T) => t,
             orPromise: (t: Promise<T>) => t,
@@ -349,6 +395,7 @@ export function createWsStore<T extends HasUuid>(
             value: undefined,
         });
         state = { kind: "start" };
+        sequence = undefined;
     };
 
     const resetAndUnsubscribe = async () => {
@@ -379,18 +426,58 @@ export function createWsStore<T extends HasUuid>(
     };
 
     const onMessage: EventListener = (resp: WsResponse) => {
+        // Arrives while loading, before the state is ready
+        if (resp.kind === "subscribed") {
+            sequence = resp.sequence;
+            return;
+        }
         if (state.kind === "start") {
             throw new Error("State.kind is start");
         }
         if (resp.kind === "gone") {
             reset();
         } else if (resp.kind === "changed") {
+            sequence = resp.sequence ?? sequence;
             const value = resp.content as T;
             set({
                 or: () => value,
                 value,
                 orPromise: () => Promise.resolve(value),
             });
+        } else if (resp.kind === "chat_message") {
+            sequence = resp.sequence;
+            if (onChatMessage === undefined) {
+                return;
+            }
+            update((container) => {
+                if (container.value === undefined) {
+                    return container;
+                }
+                const value = onChatMessage(container.value, resp.content);
+                return {
+                    or: () => value,
+                    value,
+                    orPromise: () => Promise.resolve(value),
+                };
+            });
+        } else if (resp.kind === "resync") {
+            sequence = resp.sequence;
+            const { uuid } = state;
+            getter(uuid)
+                .then((value) => {
+                    if (state.kind !== "ready" || state.uuid !== uuid) {
+                        return;
+                    }
+                    set({
+                        or: (t: T) => value ?? t,
+                        value,
+                        orPromise: (t: Promise<T>) =>
+                            value ? Promise.resolve(value) : t,
+                    });
+                })
+                .catch((error: unknown) =>
+                    console.error("Error when resyncing", error),
+                );
         } else {
             throw new Error("resp.kind is not 'changed'");
         }
@@ -425,8 +512,14 @@ export function createWsStore<T extends HasUuid>(
 
         const release = await loadMutex.obtain();
         try {
+            // Only receive what changed while disconnected
             const unsubscriber = await backOff(() =>
-                subscribeToResource({ resource, uuid }, onMessage, reconnect),
+                subscribeToResource(
+                    { resource, uuid },
+                    onMessage,
+                    reconnect,
+                    sequence,
+                ),
             );
             console.debug("Reconnected to resource", resource, "uuid", uuid);
             state = { ...state, unsubscriber };
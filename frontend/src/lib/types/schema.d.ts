@@ -136,6 +136,10 @@ export interface paths {
     /** @description Delete task. */
     delete: operations["workspace_task_destroy"];
   };
+  "/workspace/task/{task_uuid}/chat-messages": {
+    /** @description Handle GET. */
+    get: operations["workspace_task_chat_messages_retrieve"];
+  };
   "/workspace/task/{task_uuid}/move-after-task": {
     /** @description Process the request. */
     post: operations["workspace_task_move_after_task_create"];
@@ -144,6 +148,26 @@ export interface paths {
     /** @description Process the request. */
     post: operations["workspace_task_move_to_section_create"];
   };
+  "/workspace/task/assigned": {
+    /** @description Handle GET. */
+    get: operations["workspace_task_assigned_retrieve"];
+  };
+  "/workspace/task/bulk/assign": {
+    /** @description Process the request. */
+    post: operations["workspace_task_bulk_assign_create"];
+  };
+  "/workspace/task/bulk/delete": {
+    /** @description Process the request. */
+    post: operations["workspace_task_bulk_delete_create"];
+  };
+  "/workspace/task/bulk/label": {
+    /** @description Process the request. */
+    post: operations["workspace_task_bulk_label_create"];
+  };
+  "/workspace/task/bulk/move-to-section": {
+    /** @description Process the request. */
+    post: operations["workspace_task_bulk_move_to_section_create"];
+  };
   "/workspace/team-member/{team_member_uuid}": {
     /** @description Handle GET. */
     get: operations["workspace_team_member_retrieve"];
@@ -166,6 +190,14 @@ export interface paths {
     /** @description Get queryset. */
     get: operations["workspace_workspace_archived_projects_list"];
   };
+  "/workspace/workspace/{workspace_uuid}/bulk-invite-team-members": {
+    /** @description Handle POST. */
+    post: operations["workspace_workspace_bulk_invite_team_members_create"];
+  };
+  "/workspace/workspace/{workspace_uuid}/export": {
+    /** @description Handle GET. */
+    get: operations["workspace_workspace_export_retrieve"];
+  };
   "/workspace/workspace/{workspace_uuid}/invite-team-member": {
     /** @description Handle POST. */
     post: operations["workspace_workspace_invite_team_member_create"];
@@ -215,6 +247,16 @@ export interface components {
       uuid: string;
       role: components["schemas"]["RoleEnum"];
     };
+    /** @description Tell what happened for one email. */
+    BulkInviteResult: {
+      /** Format: email */
+      email: string;
+      result: components["schemas"]["ResultEnum"];
+    };
+    /** @description Accept emails. */
+    BulkInviteUsersToWorkspace: {
+      emails: string[];
+    };
     /** @description Accept old and new password. */
     ChangePassword: {
       current_password: string;
@@ -231,6 +273,14 @@ export interface components {
       text: string;
       author: components["schemas"]["TeamMemberBase"];
     };
+    /** @description Serialize a page of chat messages. */
+    ChatMessagePage: {
+      /** Format: uri */
+      next: string | null;
+      /** Format: uri */
+      previous: string | null;
+      results: components["schemas"]["ChatMessageBase"][];
+    };
     /** @description Take email and password. */
     ConfirmEmail: {
       /** Format: email */
@@ -460,6 +510,14 @@ export interface components {
       /** Format: email */
       new_email: string;
     };
+    /**
+     * @description * `added` - added
+     * * `invited` - invited
+     * * `already_added` - already_added
+     * * `already_invited` - already_invited
+     * @enum {string}
+     */
+    ResultEnum: "added" | "invited" | "already_added" | "already_invited";
     /**
      * @description * `OBSERVER` - Observer
      * * `CONTRIBUTOR` - Contributor
@@ -562,6 +620,54 @@ export interface components {
      * @enum {string}
      */
     SubscriptionStatusEnum: "ACTIVE" | "UNPAID" | "CANCELLED" | "CUSTOM";
+    /** @description Serialize a task assigned to a user, across workspaces. */
+    TaskAssigned: {
+      /** Format: uuid */
+      uuid: string;
+      number: number;
+      title: string;
+      /**
+       * Format: date-time
+       * @description Due date for this task
+       */
+      due_date: string | null;
+      /** Format: double */
+      sub_task_progress: number | null;
+      section: components["schemas"]["TaskLocation"];
+      project: components["schemas"]["TaskLocation"];
+      workspace: components["schemas"]["TaskLocation"];
+    };
+    /** @description Serialize a page of assigned tasks. */
+    TaskAssignedPage: {
+      count: number;
+      /** Format: uri */
+      next: string | null;
+      /** Format: uri */
+      previous: string | null;
+      results: components["schemas"]["TaskAssigned"][];
+    };
+    /** @description Accept the uuids of the tasks to change. */
+    TaskBulk: {
+      task_uuids: string[];
+    };
+    /** @description Accept the assignee's team member uuid, or null to unassign. */
+    TaskBulkAssign: {
+      task_uuids: string[];
+      /** Format: uuid */
+      assignee_uuid: string | null;
+    };
+    /** @description Accept the uuids of the labels to add and remove. */
+    TaskBulkLabel: {
+      task_uuids: string[];
+      add_label_uuids?: string[];
+      remove_label_uuids?: string[];
+    };
+    /** @description Accept the target section uuid. */
+    TaskBulkMoveToSection: {
+      task_uuids: string[];
+      /** Format: uuid */
+      section_uuid: string;
+    };
     /** @description Serializer for creating tasks. */
     TaskCreate: {
       title: string;
@@ -579,8 +685,8 @@ export interface components {
     /**
      * @description Serialize all task details.
      *
-     * Serializes up to the workspace in one direction, and all chat messages,
-     * labels and sub task in the other direction.
+     * Serializes up to the workspace in one direction, and the latest chat
+     * messages, labels and sub task in the other direction.
      */
     TaskDetail: {
       /** Format: date-time */
@@ -634,6 +740,12 @@ export interface components {
       /** Format: uuid */
       uuid: string;
     };
+    /** @description Serialize where a task can be found, by uuid and title. */
+    TaskLocation: {
+      /** Format: uuid */
+      uuid: string;
+      title: string;
+    };
     /** @description Accept a task uuid after which this task should be moved. */
     TaskMoveAfterTask: {
       /** Format: uuid */
@@ -1698,6 +1810,9 @@ export interface operations {
           "application/json": components["schemas"]["ProjectDetail"];
         };
       };
+      304: {
+        content: never;
+      };
       403: {
         content: {
           "application/json": components["schemas"]["Forbidden"];
@@ -2130,6 +2245,9 @@ export interface operations {
           "application/json": components["schemas"]["TaskDetail"];
         };
       };
+      304: {
+        content: never;
+      };
       403: {
         content: {
           "application/json": components["schemas"]["Forbidden"];
@@ -2248,6 +2366,39 @@ export interface operations {
       };
     };
   };
+  /** @description Handle GET. */
+  workspace_task_chat_messages_retrieve: {
+    parameters: {
+      query?: {
+        cursor?: string;
+      };
+      path: {
+        task_uuid: string;
+      };
+    };
+    responses: {
+      200: {
+        content: {
+          "application/json": components["schemas"]["ChatMessagePage"];
+        };
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      404: {
+        content: {
+          "application/json": components["schemas"]["NotFound"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
   /** @description Process the request. */
   workspace_task_move_after_task_create: {
     parameters: {
@@ -2353,6 +2504,204 @@ export interface operations {
     };
   };
   /** @description Handle GET. */
+  workspace_task_assigned_retrieve: {
+    parameters: {
+      query?: {
+        /**
+         * @description * `due_date` - due_date
+         * * `-due_date` - -due_date
+         */
+        order_by?: "due_date" | "-due_date";
+        page?: number;
+      };
+    };
+    responses: {
+      200: {
+        content: {
+          "application/json": components["schemas"]["TaskAssignedPage"];
+        };
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
+  /** @description Process the request. */
+  workspace_task_bulk_assign_create: {
+    requestBody: {
+      content: {
+        "application/json": components["schemas"]["TaskBulkAssign"];
+        "application/x-www-form-urlencoded": components["schemas"]["TaskBulkAssign"];
+        "multipart/form-data": components["schemas"]["TaskBulkAssign"];
+      };
+    };
+    responses: {
+      /** @description No response body */
+      204: {
+        content: never;
+      };
+      400: {
+        content: {
+          "application/json": {
+            /** @enum {integer} */
+            code: 400;
+            /** @description Errors for TaskBulkAssignSerializer */
+            details: {
+              task_uuids?: string[];
+              assignee_uuid?: string;
+            };
+            general?: string;
+            /** @enum {string} */
+            status: "invalid";
+          };
+        };
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
+  /** @description Process the request. */
+  workspace_task_bulk_delete_create: {
+    requestBody: {
+      content: {
+        "application/json": components["schemas"]["TaskBulk"];
+        "application/x-www-form-urlencoded": components["schemas"]["TaskBulk"];
+        "multipart/form-data": components["schemas"]["TaskBulk"];
+      };
+    };
+    responses: {
+      /** @description No response body */
+      204: {
+        content: never;
+      };
+      400: {
+        content: {
+          "application/json": {
+            /** @enum {integer} */
+            code: 400;
+            /** @description Errors for TaskBulkSerializer */
+            details: {
+              task_uuids?: string[];
+            };
+            general?: string;
+            /** @enum {string} */
+            status: "invalid";
+          };
+        };
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
+  /** @description Process the request. */
+  workspace_task_bulk_label_create: {
+    requestBody: {
+      content: {
+        "application/json": components["schemas"]["TaskBulkLabel"];
+        "application/x-www-form-urlencoded": components["schemas"]["TaskBulkLabel"];
+        "multipart/form-data": components["schemas"]["TaskBulkLabel"];
+      };
+    };
+    responses: {
+      /** @description No response body */
+      204: {
+        content: never;
+      };
+      400: {
+        content: {
+          "application/json": {
+            /** @enum {integer} */
+            code: 400;
+            /** @description Errors for TaskBulkLabelSerializer */
+            details: {
+              task_uuids?: string[];
+              add_label_uuids?: string[];
+              remove_label_uuids?: string[];
+            };
+            general?: string;
+            /** @enum {string} */
+            status: "invalid";
+          };
+        };
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
+  /** @description Process the request. */
+  workspace_task_bulk_move_to_section_create: {
+    requestBody: {
+      content: {
+        "application/json": components["schemas"]["TaskBulkMoveToSection"];
+        "application/x-www-form-urlencoded": components["schemas"]["TaskBulkMoveToSection"];
+        "multipart/form-data": components["schemas"]["TaskBulkMoveToSection"];
+      };
+    };
+    responses: {
+      /** @description No response body */
+      204: {
+        content: never;
+      };
+      400: {
+        content: {
+          "application/json": {
+            /** @enum {integer} */
+            code: 400;
+            /** @description Errors for TaskBulkMoveToSectionSerializer */
+            details: {
+              task_uuids?: string[];
+              section_uuid?: string;
+            };
+            general?: string;
+            /** @enum {string} */
+            status: "invalid";
+          };
+        };
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
+  /** @description Handle GET. */
   workspace_team_member_retrieve: {
     parameters: {
       path: {
@@ -2520,6 +2869,9 @@ export interface operations {
           "application/json": components["schemas"]["WorkspaceDetail"];
         };
       };
+      304: {
+        content: never;
+      };
       403: {
         content: {
           "application/json": components["schemas"]["Forbidden"];
@@ -2621,6 +2973,94 @@ export interface operations {
     };
   };
   /** @description Handle POST. */
+  workspace_workspace_bulk_invite_team_members_create: {
+    parameters: {
+      path: {
+        workspace_uuid: string;
+      };
+    };
+    requestBody: {
+      content: {
+        "application/json": components["schemas"]["BulkInviteUsersToWorkspace"];
+        "application/x-www-form-urlencoded": components["schemas"]["BulkInviteUsersToWorkspace"];
+        "multipart/form-data": components["schemas"]["BulkInviteUsersToWorkspace"];
+      };
+    };
+    responses: {
+      201: {
+        content: {
+          "application/json": components["schemas"]["BulkInviteResult"][];
+        };
+      };
+      400: {
+        content: {
+          "application/json": {
+            /** @enum {integer} */
+            code: 400;
+            /** @description Errors for BulkInviteUsersToWorkspaceSerializer */
+            details: {
+              emails?: string[];
+            };
+            general?: string;
+            /** @enum {string} */
+            status: "invalid";
+          };
+        };
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      404: {
+        content: {
+          "application/json": components["schemas"]["NotFound"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
+  /** @description Handle GET. */
+  workspace_workspace_export_retrieve: {
+    parameters: {
+      query?: {
+        /**
+         * @description * `jsonl` - jsonl
+         * * `csv` - csv
+         */
+        file_format?: "jsonl" | "csv";
+      };
+      path: {
+        workspace_uuid: string;
+      };
+    };
+    responses: {
+      /** @description JSON lines with all records, or CSV with one row per task */
+      200: {
+        content: never;
+      };
+      403: {
+        content: {
+          "application/json": components["schemas"]["Forbidden"];
+        };
+      };
+      404: {
+        content: {
+          "application/json": components["schemas"]["NotFound"];
+        };
+      };
+      500: {
+        content: {
+          "application/json": components["schemas"]["InternalServerError"];
+        };
+      };
+    };
+  };
+  /** @description Handle POST. */
   workspace_workspace_invite_team_member_create: {
     parameters: {
       path: {